@@ -0,0 +1,301 @@
+import logging
+import time
+import typing
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from ParadoxTrading.Benchmark.SimFetch import SimFetch
+from ParadoxTrading.Engine import EventType, MarketEvent, SettlementEvent, \
+    SignalType, StrategyAbstract
+from ParadoxTrading.EngineExt.Futures import BacktestEngine, \
+    BacktestMarketSupply, BarBacktestExecution, BarPortfolio, \
+    TickBacktestExecution, TickPortfolio
+from ParadoxTrading.Fetch.ChineseFutures import RegisterInstrument
+from ParadoxTrading.Indicator import EMA
+
+
+class RangeStrategy(StrategyAbstract):
+    """
+    the strategy of samples/backtest/futures_tick_backtest.py, signals
+    are sent as strength: 1 long, -1 short and 0 empty
+    """
+
+    def __init__(self, _product: str = 'rb'):
+        super().__init__('range_{}'.format(_product))
+
+        self.addMarketRegister(
+            RegisterInstrument(_product),
+            ['lastprice', 'askprice', 'bidprice']
+        )
+        self.ask_ema: EMA = EMA(60, _use_key='askprice')
+        self.bid_ema: EMA = EMA(60, _use_key='bidprice')
+        self.last_status: int = SignalType.EMPTY
+        self.empty_time: datetime = None
+
+        self.addPickleKey('last_status')
+
+    def deal(self, _market_event: MarketEvent):
+        if self.empty_time is None:
+            self.empty_time = datetime.strptime(
+                self.engine.getTradingDay(), '%Y%m%d'
+            ) + timedelta(hours=14, minutes=45)
+
+        if self.engine.getDatetime() > self.empty_time:
+            if self.last_status != SignalType.EMPTY:
+                self.addEvent(_market_event.symbol, 0)
+                self.last_status = SignalType.EMPTY
+            return
+
+        data = _market_event.data
+        lastprice = data['lastprice'][0]
+        ask_ema_value = self.ask_ema.addOne(data).getLastData()['ema'][0]
+        bid_ema_value = self.bid_ema.addOne(data).getLastData()['ema'][0]
+
+        if len(self.ask_ema) < 60:
+            return
+
+        if self.last_status == SignalType.EMPTY:
+            if lastprice > ask_ema_value:
+                self.addEvent(_market_event.symbol, 1)
+                self.last_status = SignalType.LONG
+            if lastprice < bid_ema_value:
+                self.addEvent(_market_event.symbol, -1)
+                self.last_status = SignalType.SHORT
+        elif self.last_status == SignalType.LONG:
+            if lastprice < bid_ema_value:
+                self.addEvent(_market_event.symbol, -1)
+                self.last_status = SignalType.SHORT
+        elif self.last_status == SignalType.SHORT:
+            if lastprice > ask_ema_value:
+                self.addEvent(_market_event.symbol, 1)
+                self.last_status = SignalType.LONG
+        else:
+            raise Exception('unknown last status')
+
+    def settlement(self, _settlement_event: SettlementEvent):
+        self.last_status: int = SignalType.EMPTY
+        self.empty_time: datetime = None
+
+
+class MAStrategy(StrategyAbstract):
+    """
+    the strategy of samples/backtest/futures_bar_backtest.py, signals
+    are sent as strength like RangeStrategy
+    """
+
+    def __init__(self, _product: str = 'rb'):
+        super().__init__('ma_{}'.format(_product))
+
+        self.addMarketRegister(
+            RegisterInstrument(_product), ['closeprice']
+        )
+        self.ema: EMA = EMA(20)
+        self.last_status: int = SignalType.EMPTY
+        self.empty_time: datetime = None
+
+        self.addPickleKey('ema', 'last_status')
+
+    def deal(self, _market_event: MarketEvent):
+        if self.empty_time is None:
+            self.empty_time = datetime.strptime(
+                self.engine.getTradingDay(), '%Y%m%d'
+            ) + timedelta(hours=14, minutes=45)
+
+        if self.engine.getDatetime() > self.empty_time:
+            if self.last_status != SignalType.EMPTY:
+                self.addEvent(_market_event.symbol, 0)
+                self.last_status = SignalType.EMPTY
+            return
+
+        data = _market_event.data
+        closeprice = data['closeprice'][0]
+        ema_value = self.ema.addOne(data).getLastData()['ema'][0]
+
+        if len(self.ema) < 10:
+            return
+
+        if self.last_status == SignalType.EMPTY:
+            if closeprice > ema_value:
+                self.addEvent(_market_event.symbol, 1)
+                self.last_status = SignalType.LONG
+            if closeprice < ema_value:
+                self.addEvent(_market_event.symbol, -1)
+                self.last_status = SignalType.SHORT
+        elif self.last_status == SignalType.LONG:
+            if closeprice < ema_value:
+                self.addEvent(_market_event.symbol, -1)
+                self.last_status = SignalType.SHORT
+        elif self.last_status == SignalType.SHORT:
+            if closeprice > ema_value:
+                self.addEvent(_market_event.symbol, 1)
+                self.last_status = SignalType.LONG
+        else:
+            raise Exception('unknown last status')
+
+    def settlement(self, _settlement_event: SettlementEvent):
+        self.ema = EMA(20)
+        self.last_status: int = SignalType.EMPTY
+        self.empty_time: datetime = None
+
+
+class ComponentTimer:
+    """
+    wrap methods of engine components and sum their self time, time
+    spent in a wrapped method called by another one is only counted once
+    """
+
+    def __init__(self):
+        self.cost_dict: typing.Dict[str, float] = defaultdict(float)
+        self.count_dict: typing.Dict[str, int] = defaultdict(int)
+        # time spent in children of each active call
+        self.stack: typing.List[float] = []
+
+    def wrap(self, _obj, _method: str, _component: str):
+        func = getattr(_obj, _method)
+
+        def wrapper(*args, **kwargs):
+            self.stack.append(0.0)
+            begin = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                total = time.perf_counter() - begin
+                child = self.stack.pop()
+                self.cost_dict[_component] += total - child
+                self.count_dict[_component] += 1
+                if self.stack:
+                    self.stack[-1] += total
+
+        setattr(_obj, _method, wrapper)
+
+
+def _peak_rss() -> typing.Union[None, int]:
+    """
+    peak resident memory of this process in KB, None if unknown
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    import sys
+
+    ret = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        # bytes on mac, KB on linux
+        ret //= 1024
+    return ret
+
+
+# kind -> (data type of market fetcher, strategy, portfolio, execution)
+BACKTEST_KINDS = {
+    'tick': (
+        'tick', RangeStrategy,
+        lambda f: TickPortfolio(f, 50_0000, 0.15, 'closeprice'),
+        lambda: TickBacktestExecution(3e-4),
+    ),
+    'bar': (
+        'min', MAStrategy,
+        lambda f: BarPortfolio(f, 50_0000, 0.15),
+        lambda: BarBacktestExecution(5e-4),
+    ),
+}
+
+
+def runBacktest(
+        _kind: str = 'tick',
+        _begin_day: str = '20170103', _end_day: str = '20170110',
+        _tick_per_day: int = 10000, _bar_per_day: int = 360,
+        _products: typing.Sequence[str] = ('rb',),
+) -> typing.Dict[str, typing.Any]:
+    """
+    run a sample strategy through BacktestEngine with SimFetch,
+    and measure the throughput. Synthetic data is generated when first
+    fetched, that time is reported as 'fetch' and not counted in
+    events per second.
+
+    :param _kind: 'tick' or 'bar'
+    :param _begin_day: begin day of backtest
+    :param _end_day: end day of backtest(excluded)
+    :param _tick_per_day: ticks of each instrument each day
+    :param _bar_per_day: bars of each instrument each day
+    :param _products: one strategy for each product
+    :return: result dict
+    """
+    data_type, strategy_cls, portfolio_func, execution_func = \
+        BACKTEST_KINDS[_kind]
+    kwargs = dict(
+        _begin_day=_begin_day[:4] + '0101',
+        _end_day=str(int(_end_day[:4]) + 1) + '1231',
+        _tick_per_day=_tick_per_day, _bar_per_day=_bar_per_day,
+    )
+    fetcher = SimFetch(data_type, **kwargs)
+    fetcher_day = SimFetch('day', **kwargs)
+
+    market_supply = BacktestMarketSupply(_begin_day, _end_day, fetcher)
+    portfolio = portfolio_func(fetcher_day)
+    execution = execution_func()
+    strategy_list = [strategy_cls(p) for p in _products]
+    engine = BacktestEngine(
+        market_supply, execution, portfolio, strategy_list
+    )
+
+    timer = ComponentTimer()
+    for f in (fetcher, fetcher_day):
+        timer.wrap(f, 'fetchData', 'fetch')
+        timer.wrap(f, 'fetchSymbol', 'fetch')
+    timer.wrap(market_supply, 'updateData', 'market_supply')
+    for s in strategy_list:
+        timer.wrap(s, 'deal', 'strategy')
+        timer.wrap(s, 'settlement', 'strategy')
+    for method in (
+            'dealSignal', 'dealFill', 'dealSettlement', 'dealMarket'
+    ):
+        timer.wrap(portfolio, method, 'portfolio')
+    timer.wrap(execution, 'matchMarket', 'execution')
+    timer.wrap(execution, 'dealOrderEvent', 'execution')
+
+    event_count: typing.Dict[str, int] = defaultdict(int)
+    add_event = engine.addEvent
+    add_market_event = market_supply.addMarketEvent
+
+    def count_event(_event):
+        event_count[EventType.toStr(_event.type)] += 1
+        add_event(_event)
+
+    def count_market(_symbol, _data):
+        # one market data may become several market events
+        event_count['TICK'] += 1
+        return add_market_event(_symbol, _data)
+
+    engine.addEvent = count_event
+    market_supply.addMarketEvent = count_market
+
+    level = logging.getLogger().level
+    logging.getLogger().setLevel(logging.WARNING)
+    try:
+        begin = time.perf_counter()
+        engine.run()
+        total = time.perf_counter() - begin
+    finally:
+        logging.getLogger().setLevel(level)
+
+    component_dict = dict(timer.cost_dict)
+    component_dict['engine'] = total - sum(timer.cost_dict.values())
+    cost = total - timer.cost_dict['fetch']
+    ticks = event_count.pop('TICK', 0)
+    events = sum(event_count.values())
+    return {
+        'kind': _kind,
+        'begin_day': _begin_day,
+        'end_day': _end_day,
+        # key used by compareResult
+        'best': cost,
+        'total': total,
+        'events': events,
+        'ticks': ticks,
+        'event_count': dict(event_count),
+        'events_per_sec': events / cost,
+        'ticks_per_sec': ticks / cost,
+        'component': component_dict,
+        'peak_rss_kb': _peak_rss(),
+    }
@@ -0,0 +1,367 @@
+import gc
+import statistics
+import time
+import typing
+import warnings
+
+import ParadoxTrading.Indicator
+from ParadoxTrading.Indicator.CachedIndicator import CachedIndicator
+from ParadoxTrading.Benchmark.SimData import simMinData, simTickData
+from ParadoxTrading.Engine import SignalType
+from ParadoxTrading.Fetch.BinaryCopy import decodeBinaryCopy, \
+    encodeBinaryCopy
+from ParadoxTrading.Indicator.Bar.BarIndicatorAbstract import \
+    BarIndicatorAbstract
+from ParadoxTrading.Indicator.IndicatorAbstract import IndicatorAbstract
+from ParadoxTrading.Indicator.Stop.StopIndicatorAbstract import \
+    StopIndicatorAbstract
+from ParadoxTrading.Utils import DataStruct, SplitIntoMinute
+
+# args to create each general indicator, every indicator exported by
+# ParadoxTrading.Indicator must have an entry here
+INDICATOR_ARGS: typing.Dict[str, tuple] = {
+    'ATR': (20,), 'AdaBBands': (20, 'closeprice'), 'AdaKalman': (),
+    'BBands': (), 'BIAS': (20,), 'CCI': (20,), 'Diff': ('closeprice',),
+    'EFF': (20,), 'EMA': (20,), 'FastBBands': (), 'FastMA': (20,),
+    'FastSTD': (20,), 'FastVolatility': (20,), 'GARCH': (), 'KDJ': (),
+    'Kalman': (), 'LogReturn': (), 'MA': (20,), 'MACD': (), 'MAX': (20,),
+    'MIN': (20,), 'Momentum': (20,), 'Plunge': (), 'RSI': (20,),
+    'ReturnRate': (), 'SAR': (), 'STD': (20,), 'SharpRate': (20,),
+    'SimMA': (20,), 'Volatility': (20,), 'ZigZag': (0.01,),
+}
+# GARCH refits the model every 60 points, too slow for big sizes
+INDICATOR_MAX_SIZE: typing.Dict[str, int] = {
+    'GARCH': 2000,
+}
+# stop indicators: (extra column, its const value, whether addOne takes
+# the extra data, kwargs), rates are wide enough so that they never stop
+STOP_ARGS: typing.Dict[str, typing.Tuple[str, float, bool, dict]] = {
+    'ATRConstStop': ('atr', 10.0, False, {'_rate': 200}),
+    'ATRTrailingStop': ('atr', 10.0, True, {'_rate': 200}),
+    'RateConstStop': (None, None, False, {'_stop_rate': 0.9}),
+    'RateTrailingStop': (None, None, False, {'_stop_rate': 0.9}),
+    'StepDrawdownStop': (None, None, False, {'_init_stop': 0.9}),
+    'VolatilityTrailingStop': ('volatility', 0.01, True, {'_rate': 90}),
+}
+# rows per bar fed into bar indicators
+BAR_LENGTH = 5
+
+
+class MicroCase:
+    """
+    one micro benchmark, setup is called before each run and not timed
+
+    :param _name: name of case, like 'DataStruct.addDict'
+    :param _setup: func(size) -> state
+    :param _run: func(state), the timed part
+    :param _max_size: skip sizes greater than it
+    """
+
+    def __init__(
+            self, _name: str,
+            _setup: typing.Callable[[int], typing.Any],
+            _run: typing.Callable[[typing.Any], typing.Any],
+            _max_size: int = None
+    ):
+        self.name = _name
+        self.setup = _setup
+        self.run = _run
+        self.max_size = _max_size
+
+    def measure(self, _size: int, _repeat: int) -> typing.List[float]:
+        """
+        run case _repeat times, return seconds of each run
+        """
+        ret = []
+        for _ in range(_repeat):
+            state = self.setup(_size)
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                begin = time.perf_counter()
+                self.run(state)
+                ret.append(time.perf_counter() - begin)
+            finally:
+                if gc_enabled:
+                    gc.enable()
+        return ret
+
+
+class _DataCache:
+    """
+    synthetic data is deterministic, so create it once for each size
+    """
+
+    def __init__(self):
+        self.tick_dict: typing.Dict[int, DataStruct] = {}
+        self.min_dict: typing.Dict[int, DataStruct] = {}
+        self.min_rows_dict: typing.Dict[int, typing.List[DataStruct]] = {}
+
+    def tick(self, _size: int) -> DataStruct:
+        try:
+            return self.tick_dict[_size]
+        except KeyError:
+            self.tick_dict[_size] = simTickData(_size)
+            return self.tick_dict[_size]
+
+    def bar(self, _size: int) -> DataStruct:
+        try:
+            return self.min_dict[_size]
+        except KeyError:
+            self.min_dict[_size] = simMinData(_size)
+            return self.min_dict[_size]
+
+    def barRows(self, _size: int) -> typing.List[DataStruct]:
+        """
+        bars split into single row datastructs, the way market events
+        feed indicators
+        """
+        try:
+            return self.min_rows_dict[_size]
+        except KeyError:
+            self.min_rows_dict[_size] = list(self.bar(_size))
+            return self.min_rows_dict[_size]
+
+
+def _datastruct_cases(_cache: _DataCache) -> typing.List[MicroCase]:
+    def rows_setup(_size):
+        data = _cache.tick(_size)
+        return data.getColumnNames(), data.toRows()[0]
+
+    def add_dict_run(_state):
+        keys, dicts = _state
+        data = DataStruct(keys, 'happentime')
+        for d in dicts:
+            data.addDict(d)
+
+    def add_row_run(_state):
+        keys, rows = _state
+        data = DataStruct(keys, 'happentime')
+        for row in rows:
+            data.addRow(row, keys)
+
+    def iloc_run(_data):
+        for i in range(len(_data)):
+            _data.iloc[i]
+
+    def iloc_slice_run(_data):
+        for i in range(len(_data)):
+            _data.iloc[i:i + 10]
+
+    def loc_run(_data):
+        loc = _data.loc
+        for i in _data.index():
+            loc[i]
+
+    def iter_run(_data):
+        for _ in _data:
+            pass
+
+    def to_dict_run(_data):
+        for i in range(len(_data)):
+            _data.toDict(i)
+
+    def expand_setup(_size):
+        data = _cache.tick(_size)
+        other = DataStruct(['happentime', 'signal'], 'happentime')
+        other.data['happentime'] = list(data.index())
+        other.data['signal'] = [float(i % 3) for i in range(_size)]
+        return data.clone(['lastprice']), other
+
+    return [
+        MicroCase(
+            'DataStruct.addDict',
+            lambda n: (_cache.tick(n).getColumnNames(),
+                       _cache.tick(n).toDicts()),
+            add_dict_run
+        ),
+        MicroCase('DataStruct.addRow', rows_setup, add_row_run),
+        MicroCase('DataStruct.iloc', _cache.tick, iloc_run),
+        MicroCase('DataStruct.ilocSlice', _cache.tick, iloc_slice_run),
+        MicroCase('DataStruct.loc', _cache.tick, loc_run),
+        MicroCase('DataStruct.iter', _cache.tick, iter_run),
+        MicroCase('DataStruct.toDict', _cache.tick, to_dict_run),
+        MicroCase(
+            'DataStruct.expand', expand_setup,
+            lambda s: s[0].expand(s[1])
+        ),
+        MicroCase('DataStruct.clone', _cache.tick, lambda d: d.clone()),
+        MicroCase(
+            'DataStruct.cloneColumns', _cache.tick,
+            lambda d: d.clone(['lastprice', 'askprice', 'bidprice'])
+        ),
+    ]
+
+
+def _fetch_cases(_cache: _DataCache) -> typing.List[MicroCase]:
+    def copy_setup(_size):
+        data = _cache.tick(_size)
+        keys = data.getColumnNames()
+        types = []
+        for k in keys:
+            v = data[k][0]
+            if isinstance(v, str):
+                types.append('text')
+            elif isinstance(v, int):
+                types.append('int8')
+            elif isinstance(v, float):
+                types.append('float8')
+            else:
+                types.append('timestamp')
+        return encodeBinaryCopy([data[k] for k in keys], types), types
+
+    def rows_setup(_size):
+        data = _cache.tick(_size)
+        return data.getColumnNames(), data.toRows()[0]
+
+    # the old and new way fetchers turn query result into datastruct
+    return [
+        MicroCase(
+            'Fetch.fromRows', rows_setup,
+            lambda s: DataStruct(s[0], 'happentime', s[1])
+        ),
+        MicroCase(
+            'Fetch.decodeBinaryCopy', copy_setup,
+            lambda s: decodeBinaryCopy(*s)
+        ),
+    ]
+
+
+def _split_cases(_cache: _DataCache) -> typing.List[MicroCase]:
+    ret = []
+    for minute in (1, 5, 15):
+        ret.append(MicroCase(
+            'SplitIntoMinute.addMany[{}]'.format(minute),
+            _cache.tick,
+            lambda d, m=minute: SplitIntoMinute(m).addMany(d)
+        ))
+    return ret
+
+
+def _indicator_classes(
+        _base: type
+) -> typing.List[typing.Tuple[str, type]]:
+    ret = []
+    for name in sorted(dir(ParadoxTrading.Indicator)):
+        cls = getattr(ParadoxTrading.Indicator, name)
+        if isinstance(cls, type) and issubclass(cls, _base):
+            ret.append((name, cls))
+    return ret
+
+
+def _indicator_cases(_cache: _DataCache) -> typing.List[MicroCase]:
+    ret = []
+    for name, cls in _indicator_classes(IndicatorAbstract):
+        if issubclass(cls, (StopIndicatorAbstract, BarIndicatorAbstract)):
+            continue
+        if issubclass(cls, CachedIndicator):  # wrapper, not an indicator
+            continue
+        ret.append(MicroCase(
+            'Indicator.{}'.format(name),
+            lambda n, c=cls, a=INDICATOR_ARGS[name]: (
+                c(*a), _cache.barRows(n)
+            ),
+            lambda s: s[0].addMany(s[1]),
+            INDICATOR_MAX_SIZE.get(name)
+        ))
+
+    def bar_setup(_size):
+        data = _cache.bar(_size)
+        bar_list = [
+            data.iloc[i:i + BAR_LENGTH]
+            for i in range(0, len(data), BAR_LENGTH)
+        ]
+        return bar_list, [b.index()[-1] for b in bar_list]
+
+    for name, cls in _indicator_classes(BarIndicatorAbstract):
+        ret.append(MicroCase(
+            'Indicator.{}'.format(name),
+            lambda n, c=cls: (c('closeprice'), bar_setup(n)),
+            lambda s: s[0].addMany(*s[1])
+        ))
+    return ret
+
+
+def _stop_cases(_cache: _DataCache) -> typing.List[MicroCase]:
+    def stop_setup(_size, _cls, _args):
+        extra_key, extra_value, feed_extra, kwargs = _args
+        data = _cache.bar(_size)
+        price_list = _cache.barRows(_size)
+        if extra_key is None:
+            stop = _cls(price_list[0], SignalType.LONG, **kwargs)
+            return stop, [(d,) for d in price_list[1:]]
+        extra = DataStruct(['barendtime', extra_key], 'barendtime')
+        extra.data['barendtime'] = list(data.index())
+        extra.data[extra_key] = [extra_value] * len(data)
+        extra_list = list(extra)
+        stop = _cls(
+            price_list[0], extra_list[0], SignalType.LONG, **kwargs
+        )
+        if feed_extra:
+            return stop, list(zip(price_list[1:], extra_list[1:]))
+        return stop, [(d,) for d in price_list[1:]]
+
+    def stop_run(_state):
+        stop, arg_list = _state
+        for args in arg_list:
+            stop.addOne(*args)
+        assert not stop.is_stop
+
+    ret = []
+    for name, cls in _indicator_classes(StopIndicatorAbstract):
+        ret.append(MicroCase(
+            'Stop.{}'.format(name),
+            lambda n, c=cls, a=STOP_ARGS[name]: stop_setup(n, c, a),
+            stop_run
+        ))
+    return ret
+
+
+def microCases() -> typing.List[MicroCase]:
+    """
+    all micro benchmark cases
+    """
+    cache = _DataCache()
+    return _datastruct_cases(cache) + _fetch_cases(cache) + \
+        _split_cases(cache) + _indicator_cases(cache) + _stop_cases(cache)
+
+
+def runMicro(
+        _sizes: typing.Sequence[int] = (1000, 10000),
+        _repeat: int = 5,
+        _filter: str = None,
+        _verbose: bool = True,
+) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+    """
+    run micro benchmarks
+
+    :param _sizes: input rows of each case
+    :param _repeat: run each case several times, keep the best
+    :param _filter: only run cases whose name contains it
+    :param _verbose: print each result when finished
+    :return: map '{name}[{size}]' to result
+    """
+    ret = {}
+    # GARCH warns on every refit, it is noise here
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for case in microCases():
+            if _filter is not None and _filter not in case.name:
+                continue
+            for size in _sizes:
+                if case.max_size is not None and size > case.max_size:
+                    continue
+                cost_list = case.measure(size, _repeat)
+                key = '{}[{}]'.format(case.name, size)
+                ret[key] = {
+                    'name': case.name,
+                    'size': size,
+                    'best': min(cost_list),
+                    'median': statistics.median(cost_list),
+                    'per_row': min(cost_list) / size,
+                }
+                if _verbose:
+                    print('{:<50}{:>12.3f} ms'.format(
+                        key, ret[key]['best'] * 1e3
+                    ))
+    return ret
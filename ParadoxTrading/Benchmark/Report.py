@@ -0,0 +1,85 @@
+import json
+import platform
+import sys
+import typing
+from datetime import datetime
+
+
+def saveResult(
+        _path: str,
+        _result: typing.Dict[str, typing.Dict[str, typing.Any]],
+        **_meta
+):
+    """
+    write benchmark result into json file, with some info of this machine
+
+    :param _path: json file path
+    :param _result: result returned by runMicro or runBacktest
+    :param _meta: other info to store, such as sizes and repeat
+    """
+    meta = {
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    meta.update(_meta)
+    with open(_path, 'w') as f:
+        json.dump(
+            {'meta': meta, 'result': _result}, f, indent=2, sort_keys=True
+        )
+
+
+def loadResult(
+        _path: str
+) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+    """
+    read result saved by saveResult
+    """
+    with open(_path) as f:
+        return json.load(f)['result']
+
+
+def compareResult(
+        _baseline: typing.Dict[str, typing.Dict[str, typing.Any]],
+        _current: typing.Dict[str, typing.Dict[str, typing.Any]],
+        _threshold: float = 0.1,
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    compare the best time of cases in both results
+
+    :param _baseline: stored result
+    :param _current: new result
+    :param _threshold: flag case as regression if it becomes slower
+        than (1 + _threshold) times baseline
+    :return: one dict for each case in both results
+    """
+    ret = []
+    for key in sorted(_baseline.keys() & _current.keys()):
+        base = _baseline[key]['best']
+        cur = _current[key]['best']
+        ratio = cur / base if base > 0 else float('inf')
+        ret.append({
+            'case': key,
+            'baseline': base,
+            'current': cur,
+            'ratio': ratio,
+            'regression': ratio > 1 + _threshold,
+        })
+    return ret
+
+
+def formatCompare(_compare: typing.List[typing.Dict[str, typing.Any]]) -> str:
+    """
+    render compareResult() as table
+    """
+    import tabulate
+
+    return tabulate.tabulate(
+        [[
+            d['case'], d['baseline'] * 1e3, d['current'] * 1e3,
+            d['ratio'], 'REGRESSION' if d['regression'] else ''
+        ] for d in _compare],
+        headers=['case', 'baseline(ms)', 'current(ms)', 'ratio', ''],
+        floatfmt='.3f'
+    )
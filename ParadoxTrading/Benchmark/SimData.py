@@ -0,0 +1,206 @@
+import random
+import typing
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from ParadoxTrading.Utils import CommoditySim, DataStruct
+
+TICK_COLUMNS = [
+    'tradingday',
+    'lastprice', 'highestprice', 'lowestprice',
+    'volume', 'turnover', 'openinterest',
+    'upperlimitprice', 'lowerlimitprice',
+    'askprice', 'askvolume', 'bidprice', 'bidvolume',
+    'happentime',
+]
+MIN_COLUMNS = [
+    'tradingday',
+    'openprice', 'highprice', 'lowprice', 'closeprice',
+    'volume', 'turnover', 'openinterest',
+    'bartime', 'barendtime'
+]
+DAY_COLUMNS = [
+    'tradingday',
+    'openprice', 'highprice', 'lowprice', 'closeprice',
+    'settlementprice',
+    'pricediff_1', 'pricediff_2',
+    'volume', 'openinterest', 'openinterestdiff',
+    'presettlementprice',
+]
+
+
+def simPrice(
+        _length: int, _seed: int = 0, _init_price: float = 3000.0,
+        _scale: float = 0.02
+) -> typing.List[float]:
+    """
+    deterministic price path generated by CommoditySim
+
+    :param _length: how many prices
+    :param _seed: seed for numpy and random
+    :param _init_price: first price
+    :param _scale: scale sigma and noise of CommoditySim, the default
+        values are too large for tick by tick steps
+    :return: list of prices
+    """
+    np.random.seed(_seed)
+    random.seed(_seed)
+    sim = CommoditySim(
+        _init_price=_init_price, _length=_length,
+        _sigma=0.01 * _scale, _noise=0.005 * _scale
+    )
+    return [sim.step()[3] for _ in range(_length)]
+
+
+def _round_price(_price: float, _tick: float = 1.0) -> float:
+    return round(_price / _tick) * _tick
+
+
+def simTickData(
+        _length: int, _seed: int = 0,
+        _tradingday: str = '20170103',
+        _begin: datetime = None,
+        _interval: timedelta = timedelta(milliseconds=500),
+        _init_price: float = 3000.0,
+) -> DataStruct:
+    """
+    deterministic tick data with the columns of FetchInstrumentTickData
+
+    :param _length: how many ticks
+    :param _seed: random seed
+    :param _tradingday: value of tradingday column
+    :param _begin: happentime of first tick, default 9:00 of _tradingday
+    :param _interval: time between ticks
+    :param _init_price: first lastprice
+    :return: tick datastruct indexed by happentime
+    """
+    if _begin is None:
+        _begin = datetime.strptime(_tradingday, '%Y%m%d') + \
+            timedelta(hours=9)
+    prices = simPrice(_length, _seed, _init_price)
+    rand = random.Random(_seed)
+
+    upper = _round_price(_init_price * 1.1)
+    lower = _round_price(_init_price * 0.9)
+    highest = lowest = _round_price(prices[0])
+    volume = 0
+    turnover = 0.0
+    openinterest = 100000
+    rows = []
+    for i, p in enumerate(prices):
+        lastprice = _round_price(p)
+        highest = max(highest, lastprice)
+        lowest = min(lowest, lastprice)
+        inc = rand.randint(0, 50)
+        volume += inc
+        turnover += inc * lastprice
+        openinterest += rand.randint(-20, 20)
+        rows.append([
+            _tradingday,
+            lastprice, highest, lowest,
+            volume, turnover, openinterest,
+            upper, lower,
+            lastprice + 1, rand.randint(1, 500),
+            lastprice - 1, rand.randint(1, 500),
+            _begin + i * _interval,
+        ])
+    data = DataStruct(TICK_COLUMNS, 'happentime')
+    for i, k in enumerate(TICK_COLUMNS):
+        data.data[k] = [r[i] for r in rows]
+    return data
+
+
+def _ohlc_rows(
+        _length: int, _seed: int, _init_price: float, _step: int
+) -> typing.List[typing.Tuple[float, float, float, float, int]]:
+    prices = simPrice(_length * _step, _seed, _init_price)
+    rand = random.Random(_seed)
+    ret = []
+    for i in range(_length):
+        part = [_round_price(p) for p in prices[i * _step:(i + 1) * _step]]
+        ret.append((
+            part[0], max(part), min(part), part[-1],
+            rand.randint(100, 5000)
+        ))
+    return ret
+
+
+def simMinData(
+        _length: int, _seed: int = 0,
+        _tradingday: str = '20170103',
+        _begin: datetime = None,
+        _init_price: float = 3000.0,
+) -> DataStruct:
+    """
+    deterministic 1-minute bars with the columns of FetchInstrumentMinData
+
+    :return: bar datastruct indexed by barendtime
+    """
+    if _begin is None:
+        _begin = datetime.strptime(_tradingday, '%Y%m%d') + \
+            timedelta(hours=9)
+    data = DataStruct(MIN_COLUMNS, 'barendtime')
+    tmp = {k: [] for k in MIN_COLUMNS}
+    openinterest = 100000
+    for i, (o, h, l, c, v) in enumerate(
+            _ohlc_rows(_length, _seed, _init_price, 20)
+    ):
+        openinterest += v % 41 - 20
+        bartime = _begin + timedelta(minutes=i)
+        tmp['tradingday'].append(_tradingday)
+        tmp['openprice'].append(o)
+        tmp['highprice'].append(h)
+        tmp['lowprice'].append(l)
+        tmp['closeprice'].append(c)
+        tmp['volume'].append(v)
+        tmp['turnover'].append(v * c)
+        tmp['openinterest'].append(openinterest)
+        tmp['bartime'].append(bartime)
+        tmp['barendtime'].append(bartime + timedelta(minutes=1))
+    data.data = tmp
+    return data
+
+
+def simDayData(
+        _length: int, _seed: int = 0,
+        _begin_day: str = '20100104',
+        _init_price: float = 3000.0,
+) -> DataStruct:
+    """
+    deterministic day bars with the columns of FetchInstrumentDayData
+
+    :return: day datastruct indexed by tradingday
+    """
+    days = []
+    cur = datetime.strptime(_begin_day, '%Y%m%d')
+    while len(days) < _length:
+        if cur.weekday() < 5:
+            days.append(cur.strftime('%Y%m%d'))
+        cur += timedelta(days=1)
+
+    data = DataStruct(DAY_COLUMNS, 'tradingday')
+    tmp = {k: [] for k in DAY_COLUMNS}
+    openinterest = 100000
+    presettlement = _round_price(_init_price)
+    for day, (o, h, l, c, v) in zip(
+            days, _ohlc_rows(_length, _seed, _init_price, 40)
+    ):
+        settlement = _round_price((o + h + l + c) / 4)
+        diff = v % 41 - 20
+        openinterest += diff
+        tmp['tradingday'].append(day)
+        tmp['openprice'].append(o)
+        tmp['highprice'].append(h)
+        tmp['lowprice'].append(l)
+        tmp['closeprice'].append(c)
+        tmp['settlementprice'].append(settlement)
+        tmp['pricediff_1'].append(c - presettlement)
+        tmp['pricediff_2'].append(settlement - presettlement)
+        tmp['volume'].append(v)
+        tmp['openinterest'].append(openinterest)
+        tmp['openinterestdiff'].append(diff)
+        tmp['presettlementprice'].append(presettlement)
+        presettlement = settlement
+    data.data = tmp
+    return data
@@ -0,0 +1,318 @@
+import typing
+import zlib
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+from ParadoxTrading.Benchmark.SimData import DAY_COLUMNS, MIN_COLUMNS, \
+    TICK_COLUMNS, simDayData, simMinData, simTickData
+from ParadoxTrading.Fetch import FetchAbstract
+from ParadoxTrading.Fetch.ChineseFutures import RegisterInstrument
+from ParadoxTrading.Utils import DataStruct
+
+
+class SimFetch(FetchAbstract):
+    """
+    Offline fetcher for benchmarks, it works like FetchInstrumentTickData,
+    FetchInstrumentMinData and FetchInstrumentDayData, but everything is
+    generated by CommoditySim and kept in memory, so no mongodb or
+    postgresql is needed.
+
+    Trading days are the weekdays between _begin_day and _end_day.
+    Each instrument is named as product + 'yymm' and listed 12 months
+    before delivery, trading ends on the 15th of delivery month. The
+    dominant instrument is the first one in _active_months whose
+    delivery is at least 2 months later.
+
+    :param _data_type: 'tick', 'min' or 'day'
+    :param _begin_day: first day of calendar
+    :param _end_day: last day of calendar
+    :param _tick_per_day: ticks of one day, spread over 9:00 to 15:00
+    :param _bar_per_day: 1 minute bars of one day, begin at 9:00
+    :param _active_months: delivery months which can be dominant
+    :param _seed: random seed
+    """
+
+    DATA_TYPES = ('tick', 'min', 'day')
+
+    def __init__(
+            self, _data_type: str = 'tick',
+            _begin_day: str = '20170101', _end_day: str = '20181231',
+            _tick_per_day: int = 10000, _bar_per_day: int = 360,
+            _active_months: typing.Sequence[int] = (1, 5, 10),
+            _seed: int = 0
+    ):
+        super().__init__()
+        assert _data_type in self.DATA_TYPES
+
+        self.register_type = RegisterInstrument
+
+        self.data_type: str = _data_type
+        self.tick_per_day: int = _tick_per_day
+        self.bar_per_day: int = _bar_per_day
+        self.active_months: typing.List[int] = sorted(_active_months)
+        self.seed: int = _seed
+
+        if self.data_type == 'tick':
+            self.columns = TICK_COLUMNS
+            self.index_key = 'happentime'
+        elif self.data_type == 'min':
+            self.columns = MIN_COLUMNS
+            self.index_key = 'barendtime'
+        else:
+            self.columns = DAY_COLUMNS
+            self.index_key = 'tradingday'
+
+        self.tradingday_list: typing.List[str] = []
+        cur = datetime.strptime(_begin_day, '%Y%m%d')
+        end = datetime.strptime(_end_day, '%Y%m%d')
+        while cur <= end:
+            if cur.weekday() < 5:
+                self.tradingday_list.append(cur.strftime('%Y%m%d'))
+            cur += timedelta(days=1)
+
+        # instrument -> its day data over the whole calendar
+        self.day_data_dict: typing.Dict[str, DataStruct] = {}
+        # (instrument, tradingday) -> data
+        self.data_dict: typing.Dict[typing.Tuple[str, str], DataStruct] = {}
+
+    def isTradingDay(self, _tradingday: str) -> bool:
+        i = bisect_left(self.tradingday_list, _tradingday)
+        return i < len(self.tradingday_list) and \
+            self.tradingday_list[i] == _tradingday
+
+    def fetchTradingDayList(
+            self, _begin_day: str, _end_day: str
+    ) -> typing.List[str]:
+        """
+        trading days from _begin_day to _end_day(excluded)
+        """
+        return self.tradingday_list[
+               bisect_left(self.tradingday_list, _begin_day):
+               bisect_left(self.tradingday_list, _end_day)
+               ]
+
+    def productNextTradingDay(
+            self, _product: str, _tradingday: str
+    ) -> typing.Union[None, str]:
+        i = bisect_right(self.tradingday_list, _tradingday)
+        if i < len(self.tradingday_list):
+            return self.tradingday_list[i]
+        return None
+
+    @staticmethod
+    def _month_index(_tradingday: str) -> int:
+        return int(_tradingday[:4]) * 12 + int(_tradingday[4:6]) - 1
+
+    @staticmethod
+    def _instrument(_product: str, _month_index: int) -> str:
+        return '{}{:02d}{:02d}'.format(
+            _product, _month_index // 12 % 100, _month_index % 12 + 1
+        )
+
+    def _available_months(self, _tradingday: str) -> range:
+        cur = self._month_index(_tradingday)
+        if int(_tradingday[6:]) > 15:
+            # contract of this month has stopped trading
+            cur += 1
+        return range(cur, cur + 12)
+
+    def fetchAvailableInstrument(
+            self, _product: str, _tradingday: str
+    ) -> typing.List[str]:
+        if not self.isTradingDay(_tradingday):
+            return []
+        product = _product.lower()
+        return [
+            self._instrument(product, m)
+            for m in self._available_months(_tradingday)
+        ]
+
+    def instrumentIsAvailable(
+            self, _instrument: str, _tradingday: str
+    ) -> bool:
+        product = _instrument.rstrip('0123456789').lower()
+        return _instrument.lower() in self.fetchAvailableInstrument(
+            product, _tradingday
+        )
+
+    def instrumentLastTradingDay(self, _instrument: str) -> str:
+        yymm = _instrument[-4:]
+        i = bisect_right(
+            self.tradingday_list, '20{}15'.format(yymm)
+        )
+        return self.tradingday_list[i - 1]
+
+    def _active_list(self, _tradingday: str) -> typing.List[int]:
+        if not self.isTradingDay(_tradingday):
+            return []
+        first = self._month_index(_tradingday) + 2
+        return [
+            m for m in self._available_months(_tradingday)
+            if m >= first and m % 12 + 1 in self.active_months
+        ]
+
+    def fetchDominant(
+            self, _product: str, _tradingday: str
+    ) -> typing.Union[None, str]:
+        tmp = self._active_list(_tradingday)
+        if not tmp:
+            return None
+        return self._instrument(_product.lower(), tmp[0])
+
+    def fetchSubDominant(
+            self, _product: str, _tradingday: str
+    ) -> typing.Union[None, str]:
+        tmp = self._active_list(_tradingday)
+        if len(tmp) < 2:
+            return None
+        return self._instrument(_product.lower(), tmp[1])
+
+    def fetchSymbol(
+            self, _tradingday: str, _product: str = None,
+            _type: int = RegisterInstrument.DOMINANT,
+    ) -> typing.Union[None, str]:
+        assert _product is not None
+
+        product = _product.lower()
+        if _type == RegisterInstrument.DOMINANT:
+            return self.fetchDominant(product, _tradingday)
+        elif _type == RegisterInstrument.SUB_DOMINANT:
+            return self.fetchSubDominant(product, _tradingday)
+        elif _type in (
+                RegisterInstrument.BEFORE_DOMINANT,
+                RegisterInstrument.AFTER_DOMINANT
+        ):
+            dominant = self.fetchDominant(product, _tradingday)
+            if dominant is None:
+                return None
+            tmp = self.fetchAvailableInstrument(product, _tradingday)
+            tmp_index = tmp.index(dominant)
+            if _type == RegisterInstrument.BEFORE_DOMINANT:
+                tmp_index -= 1
+            else:
+                tmp_index += 1
+            if 0 <= tmp_index < len(tmp):
+                return tmp[tmp_index]
+            return None
+        elif _type in (
+                RegisterInstrument.MOST_OPENINTEREST,
+                RegisterInstrument.SECOND_OPENINTEREST,
+                RegisterInstrument.MOST_VOLUME,
+                RegisterInstrument.SECOND_VOLUME,
+        ):
+            instrument_list = self.fetchAvailableInstrument(
+                product, _tradingday
+            )
+            if not instrument_list:
+                return None
+            key = 'openinterest' if _type in (
+                RegisterInstrument.MOST_OPENINTEREST,
+                RegisterInstrument.SECOND_OPENINTEREST,
+            ) else 'volume'
+            tmp = sorted(instrument_list, key=lambda k: self._fetch_day(
+                _tradingday, k
+            )[key][0])
+            if _type in (
+                    RegisterInstrument.MOST_OPENINTEREST,
+                    RegisterInstrument.MOST_VOLUME,
+            ):
+                return tmp[-1]
+            return tmp[-2]
+        else:
+            raise Exception('unknown type')
+
+    def _seed_of(self, _symbol: str, _tradingday: str = '') -> int:
+        return zlib.crc32(
+            '{}{}{}'.format(self.seed, _symbol, _tradingday).encode()
+        )
+
+    def _get_day_data(self, _symbol: str) -> DataStruct:
+        try:
+            return self.day_data_dict[_symbol]
+        except KeyError:
+            data = simDayData(
+                len(self.tradingday_list), self._seed_of(_symbol)
+            )
+            data.data['tradingday'] = list(self.tradingday_list)
+            self.day_data_dict[_symbol] = data
+            return data
+
+    def _fetch_day(
+            self, _tradingday: str, _symbol: str
+    ) -> typing.Union[None, DataStruct]:
+        day_data = self._get_day_data(_symbol.lower())
+        i = bisect_left(self.tradingday_list, _tradingday)
+        if i == len(self.tradingday_list) or \
+                self.tradingday_list[i] != _tradingday:
+            return None
+        return day_data.iloc[i:i + 1]
+
+    def _project(
+            self, _data: DataStruct, _columns: typing.Sequence[str]
+    ) -> DataStruct:
+        """
+        keep _columns, index and tradingday of _data, like the
+        projection of FetchBase
+        """
+        if _columns is None:
+            return _data
+        wanted = set(_columns)
+        wanted.update((self.index_key, 'tradingday'))
+        columns = [c for c in self.columns if c in wanted]
+        ret = DataStruct(columns, self.index_key)
+        ret.data = {k: list(_data.data[k]) for k in columns}
+        return ret
+
+    def fetchData(
+            self, _tradingday: str, _symbol: str,
+            _columns: typing.Sequence[str] = None, **kwargs
+    ) -> typing.Union[None, DataStruct]:
+        assert isinstance(_symbol, str)
+        symbol = _symbol.lower()
+        if not self.instrumentIsAvailable(symbol, _tradingday):
+            return None
+        if self.data_type == 'day':
+            data = self._fetch_day(_tradingday, symbol)
+            return None if data is None else self._project(data, _columns)
+
+        key = (symbol, _tradingday)
+        try:
+            return self._project(self.data_dict[key], _columns)
+        except KeyError:
+            pass
+
+        # intraday data starts from the pre settlement price
+        init_price = self._fetch_day(
+            _tradingday, symbol
+        )['presettlementprice'][0]
+        begin = datetime.strptime(_tradingday, '%Y%m%d') + \
+            timedelta(hours=9)
+        if self.data_type == 'tick':
+            data = simTickData(
+                self.tick_per_day, self._seed_of(symbol, _tradingday),
+                _tradingday, begin,
+                timedelta(hours=6) / self.tick_per_day, init_price
+            )
+        else:
+            data = simMinData(
+                self.bar_per_day, self._seed_of(symbol, _tradingday),
+                _tradingday, begin, init_price
+            )
+        self.data_dict[key] = data
+        return self._project(data, _columns)
+
+    def fetchDayData(
+            self, _begin_day: str, _end_day: str, _symbol: str,
+            _columns: typing.Sequence[str] = None, **kwargs
+    ) -> DataStruct:
+        """
+        get the data from _begin_day to _end_day(excluded)
+        """
+        ret = self._project(
+            DataStruct(self.columns, self.index_key), _columns
+        )
+        for tradingday in self.fetchTradingDayList(_begin_day, _end_day):
+            data = self.fetchData(tradingday, _symbol, _columns)
+            if data is not None:
+                ret.merge(data)
+        return ret
@@ -0,0 +1,5 @@
+from .Backtest import ComponentTimer, MAStrategy, RangeStrategy, runBacktest
+from .Micro import MicroCase, microCases, runMicro
+from .Report import compareResult, formatCompare, loadResult, saveResult
+from .SimData import simDayData, simMinData, simPrice, simTickData
+from .SimFetch import SimFetch
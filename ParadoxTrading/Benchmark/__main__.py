@@ -0,0 +1,102 @@
+import argparse
+import multiprocessing
+import sys
+
+from ParadoxTrading.Benchmark.Backtest import BACKTEST_KINDS, runBacktest
+from ParadoxTrading.Benchmark.Micro import runMicro
+from ParadoxTrading.Benchmark.Report import compareResult, formatCompare, \
+    loadResult, saveResult
+
+
+def micro(_args):
+    result = runMicro(_args.sizes, _args.repeat, _args.filter)
+    saveResult(
+        _args.output, result, sizes=_args.sizes, repeat=_args.repeat
+    )
+    return 0
+
+
+def backtest(_args):
+    result = {}
+    # a fresh process for each kind, so peak rss is not shared
+    ctx = multiprocessing.get_context('spawn')
+    for kind in _args.kind:
+        with ctx.Pool(1) as pool:
+            ret = pool.apply(runBacktest, (
+                kind, _args.begin, _args.end,
+                _args.tick_per_day, _args.bar_per_day, _args.products
+            ))
+        result['Backtest.{}'.format(kind)] = ret
+        print('{}: {} events, {:.0f} events/s, {:.0f} ticks/s, '
+              'peak rss {} KB'.format(
+                  kind, ret['events'], ret['events_per_sec'],
+                  ret['ticks_per_sec'], ret['peak_rss_kb']
+              ))
+        for k, v in sorted(ret['component'].items(), key=lambda x: -x[1]):
+            print('    {:<16}{:>10.3f} s'.format(k, v))
+    saveResult(
+        _args.output, result, begin=_args.begin, end=_args.end,
+        tick_per_day=_args.tick_per_day, bar_per_day=_args.bar_per_day,
+        products=_args.products
+    )
+    return 0
+
+
+def compare(_args):
+    ret = compareResult(
+        loadResult(_args.baseline), loadResult(_args.current),
+        _args.threshold
+    )
+    print(formatCompare(ret))
+    if any(d['regression'] for d in ret):
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m ParadoxTrading.Benchmark')
+    sub = parser.add_subparsers(dest='command')
+    sub.required = True
+
+    micro_parser = sub.add_parser(
+        'micro', help='time DataStruct, Split and indicators'
+    )
+    micro_parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[1000, 10000]
+    )
+    micro_parser.add_argument('--repeat', type=int, default=5)
+    micro_parser.add_argument(
+        '--filter', default=None, help='only cases whose name contains it'
+    )
+    micro_parser.add_argument('--output', default='micro.json')
+    micro_parser.set_defaults(func=micro)
+
+    backtest_parser = sub.add_parser(
+        'backtest', help='run sample strategies with synthetic data'
+    )
+    backtest_parser.add_argument(
+        '--kind', nargs='+', choices=sorted(BACKTEST_KINDS.keys()),
+        default=['tick', 'bar']
+    )
+    backtest_parser.add_argument('--begin', default='20170103')
+    backtest_parser.add_argument('--end', default='20170110')
+    backtest_parser.add_argument('--tick-per-day', type=int, default=10000)
+    backtest_parser.add_argument('--bar-per-day', type=int, default=360)
+    backtest_parser.add_argument('--products', nargs='+', default=['rb'])
+    backtest_parser.add_argument('--output', default='backtest.json')
+    backtest_parser.set_defaults(func=backtest)
+
+    compare_parser = sub.add_parser(
+        'compare', help='flag regressions against a stored baseline'
+    )
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1)
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == '__main__':
+    main()
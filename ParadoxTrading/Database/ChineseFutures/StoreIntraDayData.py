@@ -0,0 +1,272 @@
+import io
+import logging
+import typing
+
+import psycopg2
+
+from ParadoxTrading.Fetch.BinaryCopy import encodeBinaryCopy
+from ParadoxTrading.Utils import DataStruct
+
+# columns of tick and min tables, the same as FetchInstrumentTickData
+# and FetchInstrumentMinData, (name, postgresql type, binary copy type)
+TICK_COLUMNS = [
+    ('tradingday', 'char(8)', 'text'),
+    ('lastprice', 'double precision', 'float8'),
+    ('highestprice', 'double precision', 'float8'),
+    ('lowestprice', 'double precision', 'float8'),
+    ('volume', 'bigint', 'int8'),
+    ('turnover', 'double precision', 'float8'),
+    ('openinterest', 'double precision', 'float8'),
+    ('upperlimitprice', 'double precision', 'float8'),
+    ('lowerlimitprice', 'double precision', 'float8'),
+    ('askprice', 'double precision', 'float8'),
+    ('askvolume', 'bigint', 'int8'),
+    ('bidprice', 'double precision', 'float8'),
+    ('bidvolume', 'bigint', 'int8'),
+    ('happentime', 'timestamp', 'timestamp'),
+]
+MIN_COLUMNS = [
+    ('tradingday', 'char(8)', 'text'),
+    ('openprice', 'double precision', 'float8'),
+    ('highprice', 'double precision', 'float8'),
+    ('lowprice', 'double precision', 'float8'),
+    ('closeprice', 'double precision', 'float8'),
+    ('volume', 'bigint', 'int8'),
+    ('turnover', 'double precision', 'float8'),
+    ('openinterest', 'double precision', 'float8'),
+    ('bartime', 'timestamp', 'timestamp'),
+    ('barendtime', 'timestamp', 'timestamp'),
+]
+# kind -> (database, columns, time column of index)
+INTRADAY_TABLES = {
+    'tick': ('ChineseFuturesInstrumentTickData', TICK_COLUMNS, 'happentime'),
+    'min': ('ChineseFuturesInstrumentMinData', MIN_COLUMNS, 'barendtime'),
+}
+
+# old table is renamed to it while migrating
+UNPARTITIONED_SUFFIX = '_unpartitioned'
+
+
+def monthBounds(_tradingday: str) -> typing.Tuple[str, str]:
+    """
+    range of the month partition holding _tradingday
+
+    :param _tradingday: tradingday or month, like 20170103 or 201701
+    :return: first day of the month and of the next month
+    """
+    year, month = int(_tradingday[:4]), int(_tradingday[4:6])
+    if month == 12:
+        year, month = year + 1, 1
+    else:
+        month += 1
+    return '{}01'.format(_tradingday[:6]), '{:04d}{:02d}01'.format(
+        year, month
+    )
+
+
+class StoreIntraDayData:
+    """
+    tick or min tables of instruments. Each table is partitioned by
+    month of tradingday and indexed on (tradingday, time), so queries
+    comparing tradingday with literals, as fetchers do, only scan the
+    partitions of those months.
+
+    :param _kind: 'tick' or 'min'
+    """
+
+    def __init__(
+            self, _kind: str = 'tick', _psql_host: str = 'localhost',
+            _psql_user: str = '', _psql_password: str = ''
+    ):
+        assert _kind in INTRADAY_TABLES
+        self.kind: str = _kind
+        self.psql_dbname, columns, self.time_column = INTRADAY_TABLES[_kind]
+        self.columns: typing.List[str] = [d[0] for d in columns]
+        self.sql_types: typing.List[str] = [d[1] for d in columns]
+        self.copy_types: typing.List[str] = [d[2] for d in columns]
+
+        self.con = psycopg2.connect(
+            dbname=self.psql_dbname, host=_psql_host,
+            user=_psql_user, password=_psql_password
+        )
+        self.cur = self.con.cursor()
+
+    def _relkind(self, _table: str) -> typing.Union[None, str]:
+        # 'r' for table, 'p' for partitioned table
+        self.cur.execute(
+            "SELECT c.relkind FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = current_schema() AND c.relname = %s",
+            (_table,)
+        )
+        row = self.cur.fetchone()
+        return None if row is None else row[0]
+
+    def isPartitioned(self, _instrument: str) -> bool:
+        return self._relkind(_instrument.lower()) == 'p'
+
+    def _create_table(self, _table: str):
+        self.cur.execute(
+            "CREATE TABLE IF NOT EXISTS {} ({}) "
+            "PARTITION BY RANGE (tradingday)".format(_table, ', '.join(
+                '{} {}'.format(c, t)
+                for c, t in zip(self.columns, self.sql_types)
+            ))
+        )
+        # created on each partition by postgresql
+        self.cur.execute(
+            "CREATE INDEX IF NOT EXISTS {0}_tradingday_{1}_idx "
+            "ON {0} (tradingday, {1})".format(_table, self.time_column)
+        )
+
+    def _create_partition(self, _table: str, _month: str):
+        begin, end = monthBounds(_month)
+        self.cur.execute(
+            "CREATE TABLE IF NOT EXISTS {0}_{1} PARTITION OF {0} "
+            "FOR VALUES FROM ('{2}') TO ('{3}')".format(
+                _table, _month[:6], begin, end
+            )
+        )
+
+    def createTable(
+            self, _instrument: str, _tradingdays: typing.Iterable[str] = ()
+    ):
+        """
+        create partitioned table of _instrument if not exists, and the
+        partitions holding _tradingdays
+
+        :param _instrument:
+        :param _tradingdays: tradingdays or months
+        """
+        table = _instrument.lower()
+        if self._relkind(table) == 'r':
+            raise Exception(
+                '{} is not partitioned, migrate it first'.format(table)
+            )
+        self._create_table(table)
+        for month in sorted(set(d[:6] for d in _tradingdays)):
+            self._create_partition(table, month)
+        self.con.commit()
+
+    def storeData(self, _instrument: str, _data: DataStruct) -> int:
+        """
+        append rows of _data into the table of _instrument by binary
+        COPY, the table and partitions are created if needed
+
+        :param _instrument:
+        :param _data: has all columns of the table, in any case
+        :return: count of rows
+        """
+        if not len(_data):
+            return 0
+        column_dict = {k.lower(): v for k, v in _data.data.items()}
+        columns = [column_dict[c] for c in self.columns]
+        self.createTable(_instrument, column_dict['tradingday'])
+
+        # encodeBinaryCopy expects python values of each type
+        for i, t in enumerate(self.copy_types):
+            if t == 'float8':
+                columns[i] = [None if v is None else float(v)
+                              for v in columns[i]]
+            elif t == 'int8':
+                columns[i] = [None if v is None else int(v)
+                              for v in columns[i]]
+
+        try:
+            self.cur.copy_expert(
+                "COPY {} ({}) FROM STDIN WITH (FORMAT binary)".format(
+                    _instrument.lower(), ', '.join(self.columns)
+                ), io.BytesIO(encodeBinaryCopy(columns, self.copy_types))
+            )
+        except psycopg2.DatabaseError as e:
+            self.con.rollback()
+            logging.error('store {} failed: {}'.format(_instrument, e))
+            raise
+        self.con.commit()
+        return len(_data)
+
+    def migrateTable(
+            self, _instrument: str, _keep_old: bool = False
+    ) -> int:
+        """
+        turn an existing table into the partitioned one in a single
+        transaction. Old table is renamed with UNPARTITIONED_SUFFIX
+        and dropped after rows are copied, unless _keep_old.
+
+        :param _instrument:
+        :param _keep_old: keep the old table
+        :return: count of rows copied, -1 if already partitioned
+        """
+        table = _instrument.lower()
+        relkind = self._relkind(table)
+        if relkind == 'p':
+            return -1
+        if relkind != 'r':
+            raise Exception('{} does not exist'.format(table))
+        old_table = table + UNPARTITIONED_SUFFIX
+
+        try:
+            self.cur.execute(
+                'ALTER TABLE {} RENAME TO {}'.format(table, old_table)
+            )
+            self.cur.execute(
+                'SELECT DISTINCT substr(tradingday, 1, 6) FROM {}'.format(
+                    old_table
+                )
+            )
+            months = sorted(d[0] for d in self.cur.fetchall())
+            self._create_table(table)
+            for month in months:
+                self._create_partition(table, month)
+            # rows sorted as the index, so each partition is clustered
+            self.cur.execute(
+                'INSERT INTO {0} ({1}) SELECT {1} FROM {2} '
+                'ORDER BY tradingday, {3}'.format(
+                    table, ', '.join(self.columns), old_table,
+                    self.time_column
+                )
+            )
+            count = self.cur.rowcount
+            if not _keep_old:
+                self.cur.execute('DROP TABLE {}'.format(old_table))
+        except psycopg2.DatabaseError as e:
+            self.con.rollback()
+            logging.error('migrate {} failed: {}'.format(table, e))
+            raise
+        self.con.commit()
+        self.cur.execute('ANALYZE {}'.format(table))
+        self.con.commit()
+        return count
+
+    def migrateAll(
+            self, _keep_old: bool = False,
+            _callback: typing.Callable[[str, int], None] = None
+    ) -> typing.Dict[str, int]:
+        """
+        migrateTable() every table not partitioned yet, tables left by
+        _keep_old are skipped
+
+        :param _keep_old: keep the old tables
+        :param _callback: called with table and rows after each one
+        :return: map table to count of rows
+        """
+        self.cur.execute(
+            "SELECT c.relname FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = current_schema() AND c.relkind = 'r' "
+            "AND NOT c.relispartition ORDER BY c.relname"
+        )
+        tables = [
+            d[0] for d in self.cur.fetchall()
+            if not d[0].endswith(UNPARTITIONED_SUFFIX)
+        ]
+        ret = {}
+        for table in tables:
+            ret[table] = self.migrateTable(table, _keep_old)
+            if _callback is not None:
+                _callback(table, ret[table])
+        return ret
+
+    def close(self):
+        self.cur.close()
+        self.con.close()
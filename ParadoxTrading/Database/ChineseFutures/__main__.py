@@ -0,0 +1,60 @@
+import argparse
+import sys
+
+from ParadoxTrading.Database.ChineseFutures.StoreIntraDayData import \
+    INTRADAY_TABLES, StoreIntraDayData
+
+
+def migrate_partition(_args):
+    store = StoreIntraDayData(
+        _args.kind, _args.psql_host, _args.psql_user, _args.psql_password
+    )
+
+    def progress(_table, _rows):
+        if _rows < 0:
+            print('{} already partitioned'.format(_table))
+        else:
+            print('{} migrated, {} rows'.format(_table, _rows))
+
+    try:
+        if _args.tables:
+            for table in _args.tables:
+                progress(table, store.migrateTable(table, _args.keep_old))
+        else:
+            store.migrateAll(_args.keep_old, progress)
+    finally:
+        store.close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='python -m ParadoxTrading.Database.ChineseFutures'
+    )
+    sub = parser.add_subparsers(dest='command')
+    sub.required = True
+
+    migrate_parser = sub.add_parser(
+        'migrate-partition',
+        help='turn tick or min tables into ones partitioned by month'
+    )
+    migrate_parser.add_argument('kind', choices=sorted(INTRADAY_TABLES))
+    migrate_parser.add_argument(
+        '--tables', nargs='+', default=None,
+        help='only these instruments, default all tables'
+    )
+    migrate_parser.add_argument(
+        '--keep-old', action='store_true',
+        help='keep old tables, renamed with _unpartitioned after them'
+    )
+    migrate_parser.add_argument('--psql-host', default='localhost')
+    migrate_parser.add_argument('--psql-user', default='')
+    migrate_parser.add_argument('--psql-password', default='')
+    migrate_parser.set_defaults(func=migrate_partition)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == '__main__':
+    main()
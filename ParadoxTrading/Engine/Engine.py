@@ -3,6 +3,7 @@ from collections import deque
 from datetime import datetime
 
 from ParadoxTrading.Engine.Event import EventAbstract
+from ParadoxTrading.Engine.EventJournal import EventJournal
 from ParadoxTrading.Engine.Execution import ExecutionAbstract
 from ParadoxTrading.Engine.MarketSupply import MarketSupplyAbstract
 from ParadoxTrading.Engine.Portfolio import PortfolioAbstract
@@ -21,6 +22,8 @@ class EngineAbstract(Serializable):
         super().__init__()
 
         self.event_queue: deque = deque()  # store event
+        # structured record of events, None to disable
+        self.journal: EventJournal = None
 
         self.market_supply: MarketSupplyAbstract = None
         self.execution: ExecutionAbstract = None
@@ -48,6 +51,16 @@ class EngineAbstract(Serializable):
         assert isinstance(_event, EventAbstract)
         self.event_queue.append(_event)
 
+    def setJournal(self, _journal: EventJournal):
+        """
+        set event journal, market, signal, order, fill and settlement
+        will be recorded into it
+
+        :param _journal:
+        :return:
+        """
+        self.journal = _journal
+
     def _add_market_supply(self, _market_supply: MarketSupplyAbstract):
         """
         set marketsupply
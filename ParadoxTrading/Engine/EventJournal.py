@@ -0,0 +1,287 @@
+import math
+import struct
+import typing
+from datetime import datetime, timedelta
+
+from ParadoxTrading.Engine.Event import ActionType, DirectionType, \
+    EventType, FillEvent, OrderEvent, SignalEvent, SignalType
+
+# journal file layout:
+#   MAGIC, then a stream of records, each starts with one type byte.
+#   type 0 is a string record: (id, length) followed by utf-8 bytes,
+#   others are fixed size event records described by RECORD
+MAGIC = b'PTJ1'
+STRING_TYPE = 0
+STRING_HEAD = struct.Struct('<IH')
+# type, time kind, time, symbol id, strategy id, flag a, flag b, flag c,
+# index, quantity, value, extra
+RECORD = struct.Struct('<BBqIIBBBqqdd')
+
+TIME_NONE = 0
+TIME_DATETIME = 1  # microseconds since EPOCH
+TIME_STRING = 2  # id of interned string, such as '20171016'
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+class EventJournal:
+    """
+    Structured event journal used instead of formatting log strings
+    on the hot paths. Every event is packed into a fixed size binary
+    record inside a preallocated ring buffer, symbols, strategies and
+    string times are interned into ids. If _path is set, records are
+    appended to that file whenever the ring is full or flush() is called,
+    so the file keeps the whole history.
+
+    Use readJournal() and renderRecord() to turn records into text later.
+
+    :param _capacity: how many records the ring buffer holds
+    :param _path: journal file, None to keep records only in memory
+    """
+
+    def __init__(self, _capacity: int = 65536, _path: str = None):
+        assert _capacity > 0
+
+        self.capacity: int = _capacity
+        self.buf: bytearray = bytearray(_capacity * RECORD.size)
+        # total records ever added
+        self.count: int = 0
+        # records already written to file
+        self.flushed: int = 0
+
+        # id 0 is reserved for None
+        self.string_dict: typing.Dict[str, int] = {}
+        self.string_list: typing.List[str] = [None]
+        # strings interned but not written to file yet
+        self.string_pending: int = 1
+
+        self.path: str = _path
+        self.file: typing.BinaryIO = None
+        if self.path is not None:
+            self.file = open(self.path, 'wb')
+            self.file.write(MAGIC)
+
+    def _intern(self, _str: str) -> int:
+        if _str is None:
+            return 0
+        try:
+            return self.string_dict[_str]
+        except KeyError:
+            str_id = len(self.string_list)
+            self.string_dict[_str] = str_id
+            self.string_list.append(_str)
+            return str_id
+
+    def _encode_time(self, _time) -> (int, int):
+        if isinstance(_time, datetime):
+            return TIME_DATETIME, (_time - EPOCH) // MICROSECOND
+        if _time is None:
+            return TIME_NONE, 0
+        return TIME_STRING, self._intern(str(_time))
+
+    def _add(
+            self, _type: int, _time, _symbol: str = None,
+            _strategy: str = None, _a: int = 0, _b: int = 0, _c: int = 0,
+            _index: int = 0, _quantity: int = 0,
+            _value: float = math.nan, _extra: float = math.nan
+    ):
+        pos = self.count % self.capacity
+        if self.file is not None and pos == 0 and self.count > self.flushed:
+            # ring is full, dump it before overwriting
+            self.flush()
+        time_kind, time_value = self._encode_time(_time)
+        RECORD.pack_into(
+            self.buf, pos * RECORD.size,
+            _type, time_kind, time_value,
+            self._intern(_symbol), self._intern(_strategy),
+            _a, _b, _c, _index, _quantity,
+            math.nan if _value is None else _value,
+            math.nan if _extra is None else _extra,
+        )
+        self.count += 1
+
+    def addMarket(self, _symbol: str, _time):
+        self._add(EventType.MARKET, _time, _symbol)
+
+    def addSignal(self, _event: SignalEvent):
+        self._add(
+            EventType.SIGNAL, _event.datetime, _event.symbol,
+            _event.strategy, _a=_event.signal_type,
+            _value=_event.strength
+        )
+
+    def addOrder(self, _event: OrderEvent):
+        self._add(
+            EventType.ORDER, _event.datetime, _event.symbol,
+            _a=_event.action, _b=_event.direction, _c=_event.order_type,
+            _index=_event.index, _quantity=_event.quantity,
+            _value=_event.price
+        )
+
+    def addFill(self, _event: FillEvent):
+        self._add(
+            EventType.FILL, _event.datetime, _event.symbol,
+            _a=_event.action, _b=_event.direction,
+            _index=_event.index, _quantity=_event.quantity,
+            _value=_event.price, _extra=_event.commission
+        )
+
+    def addSettlement(self, _tradingday: str):
+        self._add(EventType.SETTLEMENT, _tradingday)
+
+    def __len__(self) -> int:
+        """
+        number of records still held by the ring buffer
+        """
+        return min(self.count, self.capacity)
+
+    def _decode(self, _record: tuple) -> typing.Dict[str, typing.Any]:
+        return decodeRecord(_record, self.string_list)
+
+    def __iter__(self):
+        """
+        iter records in the ring buffer from the oldest one
+        """
+        for i in range(self.count - len(self), self.count):
+            yield self._decode(RECORD.unpack_from(
+                self.buf, (i % self.capacity) * RECORD.size
+            ))
+
+    def flush(self):
+        """
+        write new strings and unwritten records into journal file
+        """
+        if self.file is None:
+            return
+        for str_id in range(self.string_pending, len(self.string_list)):
+            data = self.string_list[str_id].encode('utf-8')
+            self.file.write(bytes((STRING_TYPE,)))
+            self.file.write(STRING_HEAD.pack(str_id, len(data)))
+            self.file.write(data)
+        self.string_pending = len(self.string_list)
+
+        # records dropped by the ring can not be written any more
+        begin = max(self.flushed, self.count - len(self))
+        begin_pos = begin % self.capacity
+        end_pos = self.count % self.capacity
+        view = memoryview(self.buf)
+        if begin < self.count:
+            if begin_pos < end_pos:
+                self.file.write(
+                    view[begin_pos * RECORD.size:end_pos * RECORD.size])
+            else:
+                self.file.write(view[begin_pos * RECORD.size:])
+                self.file.write(view[:end_pos * RECORD.size])
+        self.flushed = self.count
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+    def __repr__(self) -> str:
+        return '\n'.join(renderRecord(r) for r in self)
+
+
+def decodeRecord(
+        _record: tuple, _string_list: typing.Sequence[str]
+) -> typing.Dict[str, typing.Any]:
+    """
+    turn one unpacked RECORD tuple into dict
+    """
+    _type, time_kind, time_value, symbol_id, strategy_id, \
+        a, b, c, index, quantity, value, extra = _record
+
+    if time_kind == TIME_DATETIME:
+        time = EPOCH + time_value * MICROSECOND
+    elif time_kind == TIME_STRING:
+        time = _string_list[time_value]
+    else:
+        time = None
+
+    ret = {
+        'type': _type,
+        'datetime': time,
+        'symbol': _string_list[symbol_id],
+    }
+    if _type == EventType.SIGNAL:
+        ret.update(
+            strategy=_string_list[strategy_id],
+            signal_type=a, strength=value,
+        )
+    elif _type == EventType.ORDER:
+        ret.update(
+            action=a, direction=b, order_type=c, index=index,
+            quantity=quantity, price=None if math.isnan(value) else value,
+        )
+    elif _type == EventType.FILL:
+        ret.update(
+            action=a, direction=b, index=index, quantity=quantity,
+            price=value, commission=extra,
+        )
+    return ret
+
+
+def readJournal(
+        _path: str
+) -> typing.Iterator[typing.Dict[str, typing.Any]]:
+    """
+    iter records stored in journal file
+
+    :param _path: path of journal file
+    :return: generator of record dicts
+    """
+    string_list: typing.List[str] = [None]
+    with open(_path, 'rb') as f:
+        assert f.read(len(MAGIC)) == MAGIC
+        while True:
+            head = f.read(1)
+            if not head:
+                return
+            if head[0] == STRING_TYPE:
+                str_id, length = STRING_HEAD.unpack(f.read(STRING_HEAD.size))
+                assert str_id == len(string_list)
+                string_list.append(f.read(length).decode('utf-8'))
+            else:
+                yield decodeRecord(
+                    RECORD.unpack(head + f.read(RECORD.size - 1)),
+                    string_list
+                )
+
+
+def renderRecord(_record: typing.Dict[str, typing.Any]) -> str:
+    """
+    turn record dict into the same text as the old log lines
+    """
+    _type = _record['type']
+    if _type == EventType.MARKET:
+        return 'Data({}) when {}'.format(
+            _record['symbol'], _record['datetime']
+        )
+    elif _type == EventType.SIGNAL:
+        return 'Strategy({}) send {} {} {} when {}'.format(
+            _record['strategy'], _record['symbol'],
+            SignalType.toStr(_record['signal_type']),
+            _record['strength'], _record['datetime']
+        )
+    elif _type == EventType.ORDER:
+        return 'Portfolio send: {} {} {} {} at {} when {}'.format(
+            ActionType.toStr(_record['action']),
+            DirectionType.toStr(_record['direction']),
+            _record['quantity'], _record['symbol'],
+            _record['price'], _record['datetime']
+        )
+    elif _type == EventType.FILL:
+        return 'Execution send {} {} {} {} at {} when {}'.format(
+            ActionType.toStr(_record['action']),
+            DirectionType.toStr(_record['direction']),
+            _record['quantity'], _record['symbol'],
+            _record['price'], _record['datetime']
+        )
+    elif _type == EventType.SETTLEMENT:
+        return 'Settlement - tradingday:{}'.format(_record['datetime'])
+    else:
+        raise Exception('unknown event type')
@@ -1,8 +1,6 @@
 import logging
 import typing
 
-import tabulate
-
 import ParadoxTrading.Engine
 from ParadoxTrading.Engine.Event import OrderEvent, FillEvent, DirectionType, ActionType
 from ParadoxTrading.Utils import DataStruct
@@ -18,6 +16,8 @@ class ExecutionAbstract(Serializable):
         # map order's index to order event
         self.order_dict: typing.Dict[
             int, ParadoxTrading.Engine.Event.OrderEvent] = {}
+        # columns of market data used by matchMarket(), None for all
+        self.market_columns: typing.Union[None, typing.Set[str]] = None
 
         self.addPickleKey('order_dict')
 
@@ -32,16 +32,21 @@ class ExecutionAbstract(Serializable):
 
     def addEvent(self, _fill_event: FillEvent):
         self.engine.addEvent(_fill_event)
-        logging.info('Execution send {} {} {} {} at {} when {}'.format(
-            ActionType.toStr(_fill_event.action),
-            DirectionType.toStr(_fill_event.direction),
-            _fill_event.quantity,
-            _fill_event.symbol,
-            _fill_event.price,
-            _fill_event.datetime
-        ))
+        if self.engine.journal is not None:
+            self.engine.journal.addFill(_fill_event)
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info('Execution send {} {} {} {} at {} when {}'.format(
+                ActionType.toStr(_fill_event.action),
+                DirectionType.toStr(_fill_event.direction),
+                _fill_event.quantity,
+                _fill_event.symbol,
+                _fill_event.price,
+                _fill_event.datetime
+            ))
 
     def __repr__(self) -> str:
+        import tabulate
+
         ret = '<<< ORDER DICT >>>\n'
         table = []
         for k, v in self.order_dict.items():
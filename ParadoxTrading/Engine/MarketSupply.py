@@ -62,13 +62,39 @@ class MarketSupplyAbstract(Serializable):
                 self.register_dict[key] = \
                     self.fetcher.register_type.fromJson(key)
             # add strategy into market register
-            self.register_dict[key].addStrategy(_strategy)
+            self.register_dict[key].addStrategy(
+                _strategy, _strategy.register_columns.get(key)
+            )
+
+    def marketColumns(
+            self, _keys: typing.Iterable[str]
+    ) -> typing.Union[None, typing.List[str]]:
+        """
+        columns needed by market registers of _keys, execution and
+        portfolio, None if any of them needs all columns
+
+        :param _keys: keys of market register
+        :return: sorted columns or None
+        """
+        columns = set()
+        users = [self.register_dict[k].columns for k in _keys]
+        if self.engine is not None:
+            users.append(self.engine.execution.market_columns)
+            users.append(self.engine.portfolio.market_columns)
+        for c in users:
+            if c is None:
+                return None
+            columns.update(c)
+        return sorted(columns)
 
     def addSettlementEvent(self, _tradingday) -> ReturnSettlement:
         self.engine.addEvent(SettlementEvent(_tradingday))
-        logging.debug('Settlement - tradingday:{}'.format(
-            _tradingday
-        ))
+        if self.engine.journal is not None:
+            self.engine.journal.addSettlement(_tradingday)
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug('Settlement - tradingday:{}'.format(
+                _tradingday
+            ))
         return ReturnSettlement(_tradingday)
 
     def addMarketEvent(
@@ -85,7 +111,10 @@ class MarketSupplyAbstract(Serializable):
             # add event for each strategy if necessary
             for strategy in self.register_dict[k].strategy_set:
                 self.engine.addEvent(MarketEvent(k, strategy, _symbol, _data))
-        logging.debug('Data({}) {}'.format(_symbol, _data.toDict()))
+        if self.engine.journal is not None:
+            self.engine.journal.addMarket(_symbol, _data.index()[0])
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug('Data({}) {}'.format(_symbol, _data.toDict()))
         return ReturnMarket(_symbol, _data)
 
     def getTradingDay(self) -> str:
@@ -2,16 +2,14 @@ import logging
 import sys
 import typing
 
-import pymongo
-import tabulate
-from pymongo import MongoClient
-from pymongo.collection import Collection
-
 import ParadoxTrading.Engine
 from ParadoxTrading.Engine.Event import ActionType, DirectionType, EventType, \
     FillEvent, OrderEvent, OrderType, SignalEvent, SignalType
 from ParadoxTrading.Utils import DataStruct, Serializable
 
+if typing.TYPE_CHECKING:
+    from pymongo.collection import Collection
+
 
 class PositionMgr:
     def __init__(self, _symbol: str):
@@ -388,7 +386,7 @@ class PortfolioMgr:
         for k, v in self.position_mgr.items():
             v.dealSettlement(_symbol_price_dict[k], self.margin_rate)
 
-    def storeRecords(self, _coll: Collection):
+    def storeRecords(self, _coll: 'Collection'):
         """
         store records into mongodb
 
@@ -402,6 +400,8 @@ class PortfolioMgr:
         )
 
     def getPositionTable(self):
+        import tabulate
+
         table = []
         for k, v in self.position_mgr.items():
             table.append([
@@ -412,6 +412,8 @@ class PortfolioMgr:
         )
 
     def getUnfilledOrderTable(self):
+        import tabulate
+
         table = []
         for k, v in self.unfilled_order.items():
             table.append([
@@ -471,6 +473,8 @@ class PortfolioAbstract(Serializable):
         # the global portfolio,
         self.portfolio_mgr: PortfolioMgr = PortfolioMgr(
             _init_fund, _margin_rate)
+        # columns of market data used by dealMarket(), None for all
+        self.market_columns: typing.Union[None, typing.Set[str]] = None
 
         self.addPickleKey('order_index', 'portfolio_mgr')
 
@@ -511,11 +515,15 @@ class PortfolioAbstract(Serializable):
 
         # add it into event queue
         self.engine.addEvent(_order_event)
-        logging.info('Portfolio send: {} {} {} {} at {} when {}'.format(
-            ActionType.toStr(_order_event.action),
-            DirectionType.toStr(_order_event.direction), _order_event.quantity,
-            _order_event.symbol, _order_event.price, _order_event.datetime
-        ))
+        if self.engine.journal is not None:
+            self.engine.journal.addOrder(_order_event)
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info('Portfolio send: {} {} {} {} at {} when {}'.format(
+                ActionType.toStr(_order_event.action),
+                DirectionType.toStr(_order_event.direction),
+                _order_event.quantity, _order_event.symbol,
+                _order_event.price, _order_event.datetime
+            ))
 
     def storeRecords(
             self,
@@ -533,8 +541,10 @@ class PortfolioAbstract(Serializable):
         :param _clear:
         :return:
         """
-        client = MongoClient(host=_mongo_host)
-        db = client[_mongo_database]
+        import pymongo
+        from ParadoxTrading.Fetch import getMongoClient
+
+        db = getMongoClient(_mongo_host)[_mongo_database]
         # clear old backtest records
         if _backtest_key in db.collection_names() and _clear:
             db.drop_collection(_backtest_key)
@@ -548,8 +558,6 @@ class PortfolioAbstract(Serializable):
         ])
         self.portfolio_mgr.storeRecords(coll)
 
-        client.close()
-
     def dealSignal(self, _event: SignalEvent):
         """
         deal signal event from strategy
@@ -21,6 +21,10 @@ class StrategyAbstract(Serializable):
         # common variables
         self.engine: ParadoxTrading.Engine.Engine.EngineAbstract = None
         self.registers: typing.Set[str] = set()
+        # map market register key to columns used, None for all
+        self.register_columns: typing.Dict[
+            str, typing.Union[None, typing.List[str]]
+        ] = {}
 
     def setEngine(self,
                   _engine: 'ParadoxTrading.Engine.EngineAbstract'):
@@ -54,12 +58,15 @@ class StrategyAbstract(Serializable):
 
     def addMarketRegister(
             self,
-            _market_register: RegisterAbstract
+            _market_register: RegisterAbstract,
+            _columns: typing.Sequence[str] = None
     ) -> str:
         """
         used in init() to register market data
 
         :type _market_register: object
+        :param _columns: columns of market data used by deal(), others
+            are not fetched if no one else needs them. None for all
         :return: json str key of market register
         """
 
@@ -67,6 +74,8 @@ class StrategyAbstract(Serializable):
         assert key not in self.registers
         # alloc position for market register object
         self.registers.add(key)
+        self.register_columns[key] = None if _columns is None \
+            else list(_columns)
 
         return key
 
@@ -89,20 +98,24 @@ class StrategyAbstract(Serializable):
         else:
             signal_type = SignalType.EMPTY
 
-        self.engine.addEvent(SignalEvent(
+        event = SignalEvent(
             _symbol=_symbol,
             _strategy=self.name,
             _tradingday=self.engine.getTradingDay(),
             _datetime=self.engine.getDatetime(),
             _signal_type=signal_type,
             _strength=_strength,
-        ))
-        logging.info('Strategy({}) send {} {} {} when {}'.format(
-            self.name, _symbol,
-            SignalType.toStr(signal_type),
-            _strength,
-            self.engine.getDatetime()
-        ))
+        )
+        self.engine.addEvent(event)
+        if self.engine.journal is not None:
+            self.engine.journal.addSignal(event)
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info('Strategy({}) send {} {} {} when {}'.format(
+                self.name, _symbol,
+                SignalType.toStr(signal_type),
+                _strength,
+                event.datetime
+            ))
 
     def __repr__(self) -> str:
         ret = 'Strategy:\n\t{}\nMarket Register:\n\t{}'
@@ -1,6 +1,7 @@
 from .Engine import EngineAbstract
 from .Event import ActionType, DirectionType, EventType, FillEvent, \
     MarketEvent, OrderEvent, OrderType, SignalEvent, SignalType, SettlementEvent
+from .EventJournal import EventJournal, readJournal, renderRecord
 from .Execution import ExecutionAbstract
 from .MarketSupply import MarketSupplyAbstract, ReturnMarket, ReturnSettlement
 from .Portfolio import PortfolioAbstract
@@ -1,5 +1,6 @@
-from ParadoxTrading.EngineExt.Futures.InterDayPortfolio import POINT_VALUE, \
+from ParadoxTrading.EngineExt.Futures.InterDayPortfolio import \
     InterDayPortfolio, ProductMgr, InstrumentMgr
+from ParadoxTrading.EngineExt.Futures.PriceMatrix import PriceMatrix
 from ParadoxTrading.Fetch.ChineseFutures.FetchBase import FetchBase
 
 
@@ -12,12 +13,14 @@ class ArbitrageEqualFundSimplePortfolio(InterDayPortfolio):
             _leverage_rate: float = 1.0,
             _adjust_period: int = 5,
             _simulate_product_index: bool = False,
-            _settlement_price_index: str = 'closeprice'
+            _settlement_price_index: str = 'closeprice',
+            _price_matrix: PriceMatrix = None,
     ):
         super().__init__(
             _fetcher, _init_fund, _margin_rate,
             _simulate_product_index=_simulate_product_index,
             _settlement_price_index=_settlement_price_index,
+            _price_matrix=_price_matrix,
         )
 
         self.adjust_period = _adjust_period
@@ -122,7 +125,7 @@ class ArbitrageEqualFundSimplePortfolio(InterDayPortfolio):
             if i_mgr.strength == 0:
                 continue
             fund = _strategy_fund / abs_total * abs(i_mgr.strength)
-            point_value = POINT_VALUE[i_mgr.product]
+            point_value = self.registry.pointValue(i_mgr.product)
             if not self.simulate_product_index:
                 self._update_dominant_status(
                     _tradingday, i_mgr, fund, point_value
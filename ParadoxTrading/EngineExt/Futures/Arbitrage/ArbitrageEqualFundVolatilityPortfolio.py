@@ -1,7 +1,8 @@
 import typing
 
-from ParadoxTrading.EngineExt.Futures.InterDayPortfolio import POINT_VALUE, \
+from ParadoxTrading.EngineExt.Futures.InterDayPortfolio import \
     InstrumentMgr, InterDayPortfolio, ProductMgr
+from ParadoxTrading.EngineExt.Futures.PriceMatrix import PriceMatrix
 from ParadoxTrading.Fetch.ChineseFutures.FetchBase import FetchBase
 from ParadoxTrading.Indicator import FastVolatility
 from ParadoxTrading.Utils import DataStruct
@@ -18,12 +19,14 @@ class ArbitrageEqualFundVolatilityPortfolio(InterDayPortfolio):
             _volatility_period: int = 30,
             _volatility_smooth: int = 12,
             _simulate_product_index: bool = False,
-            _settlement_price_index: str = 'closeprice'
+            _settlement_price_index: str = 'closeprice',
+            _price_matrix: PriceMatrix = None,
     ):
         super().__init__(
             _fetcher, _init_fund, _margin_rate,
             _simulate_product_index=_simulate_product_index,
             _settlement_price_index=_settlement_price_index,
+            _price_matrix=_price_matrix,
         )
 
         self.adjust_period = _adjust_period
@@ -64,9 +67,8 @@ class ArbitrageEqualFundVolatilityPortfolio(InterDayPortfolio):
             price = self._fetch_buf_price(
                 _tradingday, symbol
             )
-            quantity = round(
-                fund / price / POINT_VALUE[i_mgr.product]
-            ) * POINT_VALUE[i_mgr.product]
+            point_value = self.registry.pointValue(i_mgr.product)
+            quantity = round(fund / price / point_value) * point_value
             if i_mgr.strength > 0:
                 i_mgr.next_instrument_dict[symbol] = quantity
             elif i_mgr.strength < 0:
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 
 from ParadoxTrading.Engine import (MarketSupplyAbstract, ReturnMarket,
                                    ReturnSettlement)
+from ParadoxTrading.EngineExt.Futures.MarketRecorder import MarketRecorder
 from ParadoxTrading.Fetch import FetchAbstract, RegisterAbstract
 from ParadoxTrading.Utils import DataStruct
 
@@ -19,7 +20,10 @@ class DataGenerator:
             _tradingday: str,
             _register_dict: typing.Dict[str, RegisterAbstract],
             _symbol_dict: typing.Dict[str, typing.Set[str]],
-            _fetcher: FetchAbstract
+            _fetcher: FetchAbstract,
+            _columns_func: typing.Callable[
+                [typing.Iterable[str]], typing.Union[None, typing.List[str]]
+            ] = None
     ):
         """
         fetch data according to market registers,
@@ -28,6 +32,8 @@ class DataGenerator:
         :param _tradingday: the day to fetch
         :param _register_dict:
         :param _symbol_dict:
+        :param _columns_func: map register keys of one symbol to the
+            columns to fetch, None to fetch all columns
         """
         self.data_dict: typing.Dict[str, DataStruct] = {}
         self.index_dict: typing.Dict[str, int] = {}
@@ -36,27 +42,33 @@ class DataGenerator:
         # have to reset it, it is a ref to market supply's dict
         _symbol_dict.clear()
 
+        # resolve symbols first, so that data of one symbol is fetched
+        # once with the columns all its registers need
+        symbol_keys: typing.Dict[str, typing.List[str]] = {}
         for k, v in _register_dict.items():
             symbol = _fetcher.fetchSymbol(
                 _tradingday, **v.toKwargs()
             )
             if symbol is None:
                 continue
-
-            if symbol not in self.data_dict.keys():
-                # fetch data and set index to 0 init
-                data = _fetcher.fetchData(_tradingday, _symbol=symbol)
-                if data is None:
-                    logging.warning('data {} not available'.format(symbol))
-                    continue
-                self.data_dict[symbol] = data
-                self.index_dict[symbol] = 0
+            symbol_keys.setdefault(symbol, []).append(k)
+
+        for symbol, keys in symbol_keys.items():
+            # fetch data and set index to 0 init
+            kwargs = {}
+            if _columns_func is not None:
+                columns = _columns_func(keys)
+                if columns is not None:
+                    kwargs['_columns'] = columns
+            data = _fetcher.fetchData(_tradingday, _symbol=symbol, **kwargs)
+            if data is None:
+                logging.warning('data {} not available'.format(symbol))
+                continue
+            self.data_dict[symbol] = data
+            self.index_dict[symbol] = 0
 
             # map symbol to market register key
-            try:
-                _symbol_dict[symbol].add(k)
-            except KeyError:
-                _symbol_dict[symbol] = {k}
+            _symbol_dict[symbol] = set(keys)
         logging.debug('Available symbol: {}'.format(_symbol_dict.keys()))
 
     def gen(self) -> typing.Union[None, typing.Tuple[str, DataStruct]]:
@@ -118,6 +130,44 @@ class BacktestMarketSupply(MarketSupplyAbstract):
         )
         self.datetime: typing.Union[str, datetime] = None
         self.data_generator: DataGenerator = None
+        # record market stream for ReplayMarketSupply, None to disable
+        self.recorder: MarketRecorder = None
+        # whether metadata of backtest range is preloaded
+        self.preloaded: bool = False
+
+    def setRecorder(self, _recorder: MarketRecorder):
+        """
+        record market data and settlements into _recorder
+
+        :param _recorder:
+        :return:
+        """
+        self.recorder = _recorder
+
+    def _preload(self):
+        """
+        let fetcher load metadata and resolve symbols of the whole range
+        at once, instead of querying them day by day
+        """
+        products = set()
+        # map product to types of its registers
+        type_dict: typing.Dict[str, typing.Set[int]] = {}
+        for v in self.register_dict.values():
+            kwargs = v.toKwargs()
+            product = kwargs.get('_product')
+            if product is None:
+                # unknown register, load all products
+                products = None
+                continue
+            if products is not None:
+                products.add(product)
+            if '_type' in kwargs:
+                type_dict.setdefault(product, set()).add(kwargs['_type'])
+        self.fetcher.preloadMetadata(self.begin_day, self.end_day, products)
+        for product, types in type_dict.items():
+            self.fetcher.buildSymbolTable(
+                self.begin_day, self.end_day, [product], types
+            )
 
     def incDate(self) -> str:
         """
@@ -138,6 +188,10 @@ class BacktestMarketSupply(MarketSupplyAbstract):
         :return: flag of current market status
         """
 
+        if not self.preloaded:
+            self.preloaded = True
+            self._preload()
+
         while self.data_generator is None:
             if self.tradingday >= self.end_day:
                 return None
@@ -146,7 +200,8 @@ class BacktestMarketSupply(MarketSupplyAbstract):
                 _tradingday=self.tradingday,
                 _register_dict=self.register_dict,
                 _symbol_dict=self.symbol_dict,
-                _fetcher=self.fetcher
+                _fetcher=self.fetcher,
+                _columns_func=self.marketColumns
             )
             if not self.symbol_dict:
                 self.incDate()
@@ -155,15 +210,29 @@ class BacktestMarketSupply(MarketSupplyAbstract):
                 logging.info('TradingDay: {}, Product: {}'.format(
                     self.tradingday, self.symbol_dict.keys()
                 ))
+                if self.recorder is not None:
+                    if not self.recorder.meta_written:
+                        self.recorder.setMeta(
+                            self.begin_day, self.end_day,
+                            self.register_dict.keys()
+                        )
+                    self.recorder.beginDay(
+                        self.tradingday, self.symbol_dict,
+                        self.data_generator.data_dict
+                    )
         # try to gen one tick data from data generator
         ret = self.data_generator.gen()
         if ret is None:  # this tradingday is end
             tmp_day = self.tradingday
             self.incDate()
             self.data_generator: DataGenerator = None
+            if self.recorder is not None:
+                self.recorder.endDay(tmp_day)
             return self.addSettlementEvent(tmp_day)
         else:
             self.datetime = self.data_generator.datetime
+            if self.recorder is not None:
+                self.recorder.addMarket(ret[0])
             return self.addMarketEvent(*ret)
 
     def getTradingDay(self) -> str:
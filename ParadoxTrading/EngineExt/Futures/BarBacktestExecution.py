@@ -20,6 +20,7 @@ class BarBacktestExecution(ExecutionAbstract):
 
         self.commission_rate = _commission_rate
         self.price_idx = _price_idx
+        self.market_columns = {self.price_idx}
 
     def dealOrderEvent(
             self, _order_event: OrderEvent
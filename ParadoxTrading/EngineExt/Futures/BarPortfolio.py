@@ -1,12 +1,13 @@
 import logging
-import re
 import sys
 import typing
 
 from ParadoxTrading.Engine import FillEvent, SignalEvent, SignalType, \
     OrderEvent, OrderType, ActionType, DirectionType
 from ParadoxTrading.Engine import PortfolioAbstract
-from ParadoxTrading.EngineExt.Futures.PointValue import POINT_VALUE
+from ParadoxTrading.EngineExt.Futures.InstrumentRegistry import \
+    getInstrumentRegistry
+from ParadoxTrading.EngineExt.Futures.PriceMatrix import PriceMatrix
 from ParadoxTrading.Fetch import FetchAbstract
 from ParadoxTrading.Utils import DataStruct
 
@@ -26,13 +27,20 @@ class BarPortfolio(PortfolioAbstract):
             _init_fund: float = 0.0,
             _margin_rate: float = 1.0,
             _settlement_price_index: str = 'closeprice',
+            _price_matrix: PriceMatrix = None,
     ):
         super().__init__(_init_fund, _margin_rate)
+        # dealMarket() does nothing
+        self.market_columns = set()
 
         self.index_strategy_table: typing.Dict[int, str] = {}
 
         self.fetcher = _fetcher
         self.settlement_price_index = _settlement_price_index
+        # read settlement prices from it if given
+        self.price_matrix = _price_matrix
+        # point values of instruments
+        self.registry = getInstrumentRegistry()
 
         self.addPickleKey('index_strategy_table')
 
@@ -56,10 +64,11 @@ class BarPortfolio(PortfolioAbstract):
         self.portfolio_mgr.dealSignal(_event)
 
         instrument = _event.symbol
-        product = re.findall(r'[a-zA-Z]+', instrument)[0]
 
         order_list: typing.List[OrderEvent] = []
-        target_quantity = int(abs(_event.strength))
+        # strength is in hands, positions are in units
+        target_quantity = int(abs(_event.strength)) * \
+            self.registry.pointValue(instrument)
         short_quantity = self.portfolio_mgr.getPosition(
             instrument, SignalType.SHORT
         )
@@ -75,12 +84,12 @@ class BarPortfolio(PortfolioAbstract):
             if target_quantity > long_quantity:  # open long position
                 order_list.append(self._gen_order(
                     _event.symbol, ActionType.OPEN, DirectionType.BUY,
-                    POINT_VALUE[product] * (target_quantity - long_quantity)
+                    target_quantity - long_quantity
                 ))
             elif target_quantity < long_quantity:  # close long position
                 order_list.append(self._gen_order(
                     _event.symbol, ActionType.CLOSE, DirectionType.SELL,
-                    POINT_VALUE[product] * (long_quantity - target_quantity)
+                    long_quantity - target_quantity
                 ))
             else:  # nothing to do
                 pass
@@ -93,12 +102,12 @@ class BarPortfolio(PortfolioAbstract):
             if target_quantity > short_quantity:  # open short position
                 order_list.append(self._gen_order(
                     _event.symbol, ActionType.OPEN, DirectionType.SELL,
-                    POINT_VALUE[product] * (target_quantity - short_quantity)
+                    target_quantity - short_quantity
                 ))
             elif target_quantity < short_quantity:  # close short position
                 order_list.append(self._gen_order(
                     _event.symbol, ActionType.CLOSE, DirectionType.BUY,
-                    POINT_VALUE[product] * (short_quantity - target_quantity)
+                    short_quantity - target_quantity
                 ))
         elif _event.signal_type == SignalType.EMPTY:
             if long_quantity > 0:  # close long position
@@ -132,16 +141,25 @@ class BarPortfolio(PortfolioAbstract):
 
         # do settlement for cur positions
         symbol_price_dict = {}
-        for symbol in self.portfolio_mgr.getSymbolList():
-            try:
-                symbol_price_dict[symbol] = self.fetcher.fetchData(
+        symbol_list = self.portfolio_mgr.getSymbolList()
+        if self.price_matrix is None:
+            # fetch prices of all symbols together
+            data_dict = self.fetcher.fetchDataMany(_tradingday, symbol_list)
+        for symbol in symbol_list:
+            if self.price_matrix is None:
+                data = data_dict[symbol.lower()]
+                price = None if data is None \
+                    else data[self.settlement_price_index][0]
+            else:
+                price = self.price_matrix.getPrice(
+                    _tradingday, symbol, self.settlement_price_index
+                )
+            if price is None:
+                logging.error('Tradingday: {}, Symbol: {}, no price'.format(
                     _tradingday, symbol
-                )[self.settlement_price_index][0]
-            except TypeError as e:
-                logging.error('Tradingday: {}, Symbol: {}, e: {}'.format(
-                    _tradingday, symbol, e
                 ))
                 sys.exit(1)
+            symbol_price_dict[symbol] = price
         self.portfolio_mgr.dealSettlement(
             _tradingday, symbol_price_dict
         )
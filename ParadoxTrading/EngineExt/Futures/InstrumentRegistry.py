@@ -0,0 +1,391 @@
+import re
+import sys
+import typing
+
+from ParadoxTrading.Engine import ActionType, SignalType
+from ParadoxTrading.EngineExt.Futures.PointValue import POINT_VALUE
+from ParadoxTrading.Utils import DataStruct
+
+# product is the first letters of instrument, like rb of rb1705
+_PRODUCT_PATTERN = re.compile(r'[a-zA-Z]+')
+# futures instrument, options like m1801-C-2800 and spreads do not match
+_FUTURES_PATTERN = re.compile(r'^[a-zA-Z]+\d{3,4}$')
+
+# fields of a spec and the keys of them in mongo docs
+SPEC_FIELDS = (
+    ('point_value', 'PointValue'),
+    ('price_tick', 'PriceTick'),
+    ('long_margin_ratio_by_money', 'LongMarginRatioByMoney'),
+    ('long_margin_ratio_by_volume', 'LongMarginRatioByVolume'),
+    ('short_margin_ratio_by_money', 'ShortMarginRatioByMoney'),
+    ('short_margin_ratio_by_volume', 'ShortMarginRatioByVolume'),
+    ('open_ratio_by_money', 'OpenRatioByMoney'),
+    ('open_ratio_by_volume', 'OpenRatioByVolume'),
+    ('close_ratio_by_money', 'CloseRatioByMoney'),
+    ('close_ratio_by_volume', 'CloseRatioByVolume'),
+)
+
+
+class ContractSpec:
+    """
+    contract specs of a product, or of one instrument of it when some
+    fields of the instrument differ. Fields unknown are None, except
+    ratios by volume and commission ratios which are 0
+
+    :param _product: lower case product
+    :param _instrument: lower case instrument, None for product
+    """
+
+    __slots__ = ('product', 'instrument') + tuple(d[0] for d in SPEC_FIELDS)
+
+    def __init__(self, _product: str, _instrument: str = None):
+        self.product: str = _product
+        self.instrument: str = _instrument
+        self.point_value: int = None
+        self.price_tick: float = None
+        self.long_margin_ratio_by_money: float = None
+        self.long_margin_ratio_by_volume: float = 0.0
+        self.short_margin_ratio_by_money: float = None
+        self.short_margin_ratio_by_volume: float = 0.0
+        self.open_ratio_by_money: float = 0.0
+        self.open_ratio_by_volume: float = 0.0
+        self.close_ratio_by_money: float = 0.0
+        self.close_ratio_by_volume: float = 0.0
+
+    def commission(
+            self, _action: int, _price: float, _volume: int
+    ) -> float:
+        """
+        commission of _volume hands traded at _price
+
+        :param _action: ActionType
+        :param _price:
+        :param _volume: in hands
+        """
+        if _action == ActionType.OPEN:
+            by_money = self.open_ratio_by_money
+            by_volume = self.open_ratio_by_volume
+        elif _action == ActionType.CLOSE:
+            by_money = self.close_ratio_by_money
+            by_volume = self.close_ratio_by_volume
+        else:
+            raise Exception('unknown action')
+        return by_money * _price * _volume * self.point_value + \
+            by_volume * _volume
+
+    def margin(
+            self, _signal_type: int, _price: float, _volume: int
+    ) -> float:
+        """
+        margin of a position of _volume hands at _price
+
+        :param _signal_type: SignalType.LONG or SignalType.SHORT
+        :param _price:
+        :param _volume: in hands
+        """
+        if _signal_type == SignalType.LONG:
+            by_money = self.long_margin_ratio_by_money
+            by_volume = self.long_margin_ratio_by_volume
+        elif _signal_type == SignalType.SHORT:
+            by_money = self.short_margin_ratio_by_money
+            by_volume = self.short_margin_ratio_by_volume
+        else:
+            raise Exception('unknown signal type')
+        if by_money is None:
+            raise Exception('no margin ratio of {}'.format(
+                self.instrument or self.product
+            ))
+        return by_money * _price * _volume * self.point_value + \
+            by_volume * _volume
+
+    def copy(self, _instrument: str) -> 'ContractSpec':
+        """
+        spec of _instrument with the fields of self
+        """
+        ret = ContractSpec(self.product, _instrument)
+        for field, _ in SPEC_FIELDS:
+            setattr(ret, field, getattr(self, field))
+        return ret
+
+    def toDict(
+            self, _fields: typing.Iterable[str] = None
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        :param _fields: only these fields, None for all
+        :return: mongo doc
+        """
+        ret = {'ProductID': self.product}
+        if self.instrument is not None:
+            ret['InstrumentID'] = self.instrument
+        for field, key in SPEC_FIELDS:
+            if _fields is None or field in _fields:
+                ret[key] = getattr(self, field)
+        return ret
+
+    def __repr__(self):
+        return 'ContractSpec({})'.format(', '.join(
+            '{}={}'.format(k, getattr(self, k)) for k in self.__slots__
+        ))
+
+
+class InstrumentRegistry:
+    """
+    map instruments to products and contract specs. An instrument is
+    parsed once, later lookups are a dict get, and the product strings
+    are interned so they are shared by every event of the instrument.
+
+    Specs are kept for each product. An instrument gets its own spec
+    when some fields are set for it, like margin and commission ratios
+    CTP returns for one instrument. Its other fields follow the product.
+
+    Specs are loaded from POINT_VALUE by default, then may be updated
+    by loadMongo() or the results of CTP queries.
+
+    :param _point_value: map product to point value, None to skip
+    """
+
+    def __init__(
+            self,
+            _point_value: typing.Dict[str, int] = POINT_VALUE
+    ):
+        # map product to spec
+        self.spec_dict: typing.Dict[str, ContractSpec] = {}
+        # map lower case instrument to its own spec, and the fields
+        # set for it, which are not changed by its product
+        self.instrument_spec_dict: typing.Dict[str, ContractSpec] = {}
+        self.own_field_dict: typing.Dict[str, typing.Set[str]] = {}
+        # map product to its instruments with own spec
+        self.product_instrument_dict: typing.Dict[str, typing.List[str]] = {}
+        # map instrument, in any case, to product and spec
+        self.product_cache: typing.Dict[str, str] = {}
+        self.spec_cache: typing.Dict[str, ContractSpec] = {}
+
+        if _point_value is not None:
+            self.loadPointValue(_point_value)
+
+    def product(self, _instrument: str) -> str:
+        """
+        lower case product of _instrument, a product maps to itself
+
+        :param _instrument: like rb1705, SR705 or rb
+        """
+        try:
+            return self.product_cache[_instrument]
+        except KeyError:
+            pass
+        match = _PRODUCT_PATTERN.search(_instrument)
+        if match is None:
+            raise Exception('no product in {}'.format(_instrument))
+        product = sys.intern(match.group().lower())
+        self.product_cache[sys.intern(_instrument)] = product
+        return product
+
+    def _product_spec(self, _product: str) -> ContractSpec:
+        try:
+            return self.spec_dict[_product]
+        except KeyError:
+            spec = self.spec_dict[_product] = ContractSpec(_product)
+            return spec
+
+    def spec(self, _instrument: str) -> ContractSpec:
+        """
+        spec of _instrument if it has one, else of its product
+        """
+        try:
+            return self.spec_cache[_instrument]
+        except KeyError:
+            pass
+        spec = self.instrument_spec_dict.get(_instrument.lower())
+        if spec is None:
+            spec = self._product_spec(self.product(_instrument))
+        self.spec_cache[sys.intern(_instrument)] = spec
+        return spec
+
+    def pointValue(self, _instrument: str) -> int:
+        """
+        units in one hand of _instrument
+        """
+        point_value = self.spec(_instrument).point_value
+        if point_value is None:
+            raise KeyError(self.product(_instrument))
+        return point_value
+
+    def setSpec(self, _product: str, **kwargs) -> ContractSpec:
+        """
+        update fields of the spec of _product, and of its instruments
+        which do not set them
+
+        :param _product: product, or any instrument of it
+        :param kwargs: fields of ContractSpec, None ones are skipped
+        """
+        product = self.product(_product)
+        spec = self._product_spec(product)
+        kwargs = {k: v for k, v in kwargs.items() if v is not None}
+        for k, v in kwargs.items():
+            setattr(spec, k, v)
+        for instrument in self.product_instrument_dict.get(product, ()):
+            inst_spec = self.instrument_spec_dict[instrument]
+            own_fields = self.own_field_dict[instrument]
+            for k, v in kwargs.items():
+                if k not in own_fields:
+                    setattr(inst_spec, k, v)
+        return spec
+
+    def setInstrumentSpec(
+            self, _instrument: str, **kwargs
+    ) -> ContractSpec:
+        """
+        set fields of _instrument only, or of the product if
+        _instrument is a product
+
+        :param _instrument:
+        :param kwargs: fields of ContractSpec, None ones are skipped
+        """
+        instrument = _instrument.lower()
+        product = self.product(instrument)
+        if instrument == product:
+            return self.setSpec(product, **kwargs)
+
+        try:
+            spec = self.instrument_spec_dict[instrument]
+        except KeyError:
+            spec = self._product_spec(product).copy(sys.intern(instrument))
+            self.instrument_spec_dict[spec.instrument] = spec
+            self.own_field_dict[spec.instrument] = set()
+            self.product_instrument_dict.setdefault(product, []).append(
+                spec.instrument
+            )
+            # cached lookups may point to the product spec
+            self.spec_cache.clear()
+        for k, v in kwargs.items():
+            if v is not None:
+                setattr(spec, k, v)
+                self.own_field_dict[instrument].add(k)
+        return spec
+
+    def loadPointValue(self, _point_value: typing.Dict[str, int]):
+        """
+        :param _point_value: map product to point value, like POINT_VALUE
+        """
+        for product, point_value in _point_value.items():
+            self.setSpec(product, point_value=point_value)
+
+    def loadMongo(
+            self, _mongo_host: str = 'localhost',
+            _mongo_database: str = 'ChineseFuturesContractSpec',
+            _collection: str = 'ContractSpec'
+    ) -> int:
+        """
+        load docs stored by saveMongo()
+
+        :return: count of docs
+        """
+        from ParadoxTrading.Fetch import getMongoClient
+
+        coll = getMongoClient(_mongo_host)[_mongo_database][_collection]
+        count = 0
+        for doc in coll.find():
+            kwargs = {
+                field: doc.get(key) for field, key in SPEC_FIELDS
+            }
+            if doc.get('InstrumentID') is None:
+                self.setSpec(doc['ProductID'], **kwargs)
+            else:
+                self.setInstrumentSpec(doc['InstrumentID'], **kwargs)
+            count += 1
+        return count
+
+    def saveMongo(
+            self, _mongo_host: str = 'localhost',
+            _mongo_database: str = 'ChineseFuturesContractSpec',
+            _collection: str = 'ContractSpec'
+    ):
+        """
+        store all specs, one doc for each product, and one for each
+        instrument with its own fields
+        """
+        from ParadoxTrading.Fetch import getMongoClient
+
+        coll = getMongoClient(_mongo_host)[_mongo_database][_collection]
+        for product, spec in self.spec_dict.items():
+            coll.replace_one(
+                {'ProductID': product, 'InstrumentID': None},
+                spec.toDict(), True
+            )
+        for instrument, spec in self.instrument_spec_dict.items():
+            coll.replace_one(
+                {'ProductID': spec.product, 'InstrumentID': instrument},
+                spec.toDict(self.own_field_dict[instrument]), True
+            )
+
+    def loadCTPInstrument(self, _data: DataStruct):
+        """
+        load point value and price tick of products, and exchange
+        margin ratios of instruments, from the result of
+        CTPTraderSpi.ReqQryInstrument(). Only futures are loaded,
+        options and spreads are skipped
+        """
+        # map product to point value and price tick, of its first row
+        product_dict: typing.Dict[str, typing.Tuple[int, float]] = {}
+        margin_list = []
+        for d in zip(
+                _data['InstrumentID'],
+                _data['VolumeMultiple'], _data['PriceTick'],
+                _data['LongMarginRatio'], _data['ShortMarginRatio'],
+        ):
+            if _FUTURES_PATTERN.match(d[0]) is None:
+                continue
+            product_dict.setdefault(self.product(d[0]), (d[1], d[2]))
+            margin_list.append((d[0], d[3], d[4]))
+
+        for product, (point_value, price_tick) in product_dict.items():
+            self.setSpec(
+                product, point_value=point_value, price_tick=price_tick
+            )
+        for instrument, long_ratio, short_ratio in margin_list:
+            self.setInstrumentSpec(
+                instrument, long_margin_ratio_by_money=long_ratio,
+                short_margin_ratio_by_money=short_ratio
+            )
+
+    def loadCTPMargin(self, _rate: typing.Dict[str, typing.Any]):
+        """
+        load margin ratios from the result of
+        CTPTraderSpi.ReqQryInstrumentMarginRate(), they are of an
+        instrument or a product as InstrumentID is
+        """
+        self.setInstrumentSpec(
+            _rate['InstrumentID'],
+            long_margin_ratio_by_money=_rate['LongMarginRatioByMoney'],
+            long_margin_ratio_by_volume=_rate['LongMarginRatioByVolume'],
+            short_margin_ratio_by_money=_rate['ShortMarginRatioByMoney'],
+            short_margin_ratio_by_volume=_rate['ShortMarginRatioByVolume'],
+        )
+
+    def loadCTPCommission(self, _rate: typing.Dict[str, typing.Any]):
+        """
+        load commission ratios from the result of
+        CTPTraderSpi.ReqQryInstrumentCommissionRate(), they are of an
+        instrument or a product as InstrumentID is
+        """
+        self.setInstrumentSpec(
+            _rate['InstrumentID'],
+            open_ratio_by_money=_rate['OpenRatioByMoney'],
+            open_ratio_by_volume=_rate['OpenRatioByVolume'],
+            close_ratio_by_money=_rate['CloseRatioByMoney'],
+            close_ratio_by_volume=_rate['CloseRatioByVolume'],
+        )
+
+
+_registry: InstrumentRegistry = None
+
+
+def getInstrumentRegistry() -> InstrumentRegistry:
+    """
+    the registry shared by portfolios and executions, specs loaded into
+    it are seen by all of them
+    """
+    global _registry
+    if _registry is None:
+        _registry = InstrumentRegistry()
+    return _registry
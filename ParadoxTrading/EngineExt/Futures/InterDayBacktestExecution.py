@@ -3,6 +3,7 @@ import sys
 
 from ParadoxTrading.Engine import ExecutionAbstract, FillEvent, OrderEvent, \
     OrderType
+from ParadoxTrading.EngineExt.Futures.PriceMatrix import PriceMatrix
 from ParadoxTrading.Fetch.ChineseFutures.FetchBase import FetchBase
 from ParadoxTrading.Utils import DataStruct
 
@@ -20,13 +21,18 @@ class InterDayBacktestExecution(ExecutionAbstract):
     def __init__(
             self, _fetcher: FetchBase,
             _commission_rate: float = 0.0,
-            _price_idx='openprice'
+            _price_idx='openprice',
+            _price_matrix: PriceMatrix = None,
     ):
         super().__init__()
+        # matchMarket() does nothing
+        self.market_columns = set()
 
         self.fetcher: FetchBase = _fetcher
         self.commission_rate = _commission_rate
         self.price_idx = _price_idx
+        # read prices from it if given
+        self.price_matrix = _price_matrix
 
     def dealOrderEvent(
             self, _order_event: OrderEvent
@@ -35,22 +41,30 @@ class InterDayBacktestExecution(ExecutionAbstract):
 
         tradingday = self.engine.getTradingDay()
         symbol = _order_event.symbol
-        try:
-            price = self.fetcher.fetchData(
-                self.engine.getTradingDay(), _order_event.symbol,
-            )[self.price_idx][0]
-        except TypeError as e:
-            # if not available, use last tradingday's closeprice
-            logging.warning('Tradingday: {}, Symbol: {}, e: {}'.format(
-                tradingday, symbol, e
+        if self.price_matrix is None:
+            data = self.fetcher.fetchData(tradingday, symbol)
+            price = None if data is None else data[self.price_idx][0]
+        else:
+            price = self.price_matrix.getPrice(
+                tradingday, symbol, self.price_idx
+            )
+        if price is None:
+            # if not available, use last tradingday's price
+            logging.warning('Tradingday: {}, Symbol: {}, no price'.format(
+                tradingday, symbol
             ))
             if input('Continue?(y/n): ') != 'y':
                 sys.exit(1)
-            price = self.fetcher.fetchData(
-                self.fetcher.instrumentLastTradingDay(
-                    _order_event.symbol, self.engine.getTradingDay()
-                ), _order_event.symbol
-            )[self.price_idx][0]
+            if self.price_matrix is None:
+                price = self.fetcher.fetchData(
+                    self.fetcher.instrumentLastTradingDay(
+                        symbol, tradingday
+                    ), symbol
+                )[self.price_idx][0]
+            else:
+                price = self.price_matrix.getLastPrice(
+                    tradingday, symbol, self.price_idx
+                )
 
         fill_event = FillEvent(
             _index=_order_event.index,
@@ -1,26 +1,29 @@
 import csv
 import logging
 import os
-import re
 import sys
 import typing
 
 from ParadoxTrading.Engine import ActionType, DirectionType, \
     ExecutionAbstract, FillEvent, OrderEvent
-from ParadoxTrading.EngineExt.Futures.InterDayPortfolio import POINT_VALUE
+from ParadoxTrading.EngineExt.Futures.InstrumentRegistry import \
+    getInstrumentRegistry
 from ParadoxTrading.Utils import DataStruct
 
 
 class InterDayOnlineExecution(ExecutionAbstract):
     def __init__(self, _tradingday: str, _path: str = './csv/'):
         super().__init__()
+        # matchMarket() does nothing
+        self.market_columns = set()
 
         self.tradingday = _tradingday
         self.path = _path
         if not self.path.endswith('/'):
             self.path += '/'
 
-        self.prog = re.compile(r'[a-z]+')
+        # point values of instruments
+        self.registry = getInstrumentRegistry()
         self.order_buf: typing.List[OrderEvent] = []
 
     def matchMarket(self, _symbol: str, _data: DataStruct):
@@ -47,7 +50,6 @@ class InterDayOnlineExecution(ExecutionAbstract):
             for row in reader:
                 index = int(row[0])
                 instrument = row[1].lower()
-                product = self.prog.findall(instrument)[0]
                 action = ActionType.fromStr(row[3])
                 direction = DirectionType.fromStr(row[4])
 
@@ -66,7 +68,9 @@ class InterDayOnlineExecution(ExecutionAbstract):
                     _index=index, _symbol=instrument,
                     _tradingday=self.tradingday,
                     _datetime=self.tradingday,
-                    _quantity=int(row[2]) * POINT_VALUE[product],
+                    _quantity=int(row[2]) * self.registry.pointValue(
+                        instrument
+                    ),
                     _action=action,
                     _direction=direction,
                     _price=float(row[-2]),
@@ -86,12 +90,11 @@ class InterDayOnlineExecution(ExecutionAbstract):
             'Action', 'Direction', 'Quantity'
         ))
         for o in self.order_buf:
-            product = self.prog.findall(o.symbol.lower())[0]
             writer.writerow((
                 o.index, o.symbol,
                 ActionType.toStr(o.action),
                 DirectionType.toStr(o.direction),
-                o.quantity / POINT_VALUE[product],
+                o.quantity / self.registry.pointValue(o.symbol),
             ))
         self.order_buf = []  # clear it
         f.close()
@@ -27,6 +27,8 @@ class InterDayOnlineMarketSupply(MarketSupplyAbstract):
         self.is_finish = False
 
     def _get_data(self):
+        # records of today may be stored after fetcher was created
+        self.fetcher.invalidateCalendar()
         # fetch data from database
         for k, v in self.register_dict.items():
             symbol = self.fetcher.fetchSymbol(
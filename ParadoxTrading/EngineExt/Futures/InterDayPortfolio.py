@@ -2,11 +2,11 @@ import logging
 import sys
 import typing
 
-import tabulate
-
 from ParadoxTrading.Engine import ActionType, DirectionType, FillEvent, \
     OrderEvent, OrderType, PortfolioAbstract, SignalEvent
-from ParadoxTrading.EngineExt.Futures.PointValue import POINT_VALUE
+from ParadoxTrading.EngineExt.Futures.InstrumentRegistry import \
+    getInstrumentRegistry
+from ParadoxTrading.EngineExt.Futures.PriceMatrix import PriceMatrix
 from ParadoxTrading.Fetch.ChineseFutures.FetchBase import FetchBase
 from ParadoxTrading.Utils import DataStruct
 
@@ -331,6 +331,8 @@ class StrategyMgr:
             yield s
 
     def getCurInstrumentTable(self):
+        import tabulate
+
         table = []
         for p_mgr in self:
             for i_mgr in p_mgr:
@@ -345,6 +347,8 @@ class StrategyMgr:
         ])
 
     def getNextInstrumentTable(self):
+        import tabulate
+
         table = []
         for p_mgr in self:
             for i_mgr in p_mgr:
@@ -373,12 +377,17 @@ class InterDayPortfolio(PortfolioAbstract):
             _margin_rate: float = 1.0,
             _simulate_product_index: bool = False,
             _settlement_price_index: str = 'closeprice',
+            _price_matrix: PriceMatrix = None,
     ):
         super().__init__(_init_fund, _margin_rate)
 
         self.fetcher = _fetcher
         self.simulate_product_index = _simulate_product_index
         self.settlement_price_index = _settlement_price_index
+        # read settlement prices from it if given
+        self.price_matrix = _price_matrix
+        # point values of products
+        self.registry = getInstrumentRegistry()
 
         self.strategy_mgr = StrategyMgr()
 
@@ -400,24 +409,38 @@ class InterDayPortfolio(PortfolioAbstract):
     ):
         # get price dict for each portfolio
         keys = self.symbol_price_dict.keys()
-        for symbol in self.portfolio_mgr.getSymbolList():
-            if symbol in keys:
-                continue
-            try:
-                self.symbol_price_dict[symbol] = self.fetcher.fetchData(
-                    _tradingday, symbol
-                )[self.settlement_price_index][0]
-            except TypeError as e:
+        symbol_list = [
+            s for s in self.portfolio_mgr.getSymbolList() if s not in keys
+        ]
+        if self.price_matrix is None:
+            # fetch prices of all symbols together
+            data_dict = self.fetcher.fetchDataMany(_tradingday, symbol_list)
+        for symbol in symbol_list:
+            if self.price_matrix is None:
+                data = data_dict[symbol.lower()]
+                price = None if data is None \
+                    else data[self.settlement_price_index][0]
+            else:
+                price = self.price_matrix.getPrice(
+                    _tradingday, symbol, self.settlement_price_index
+                )
+            if price is None:
                 # if not available, use the last tradingday's price
-                logging.warning('Tradingday: {}, Symbol: {}, e: {}'.format(
-                    _tradingday, symbol, e
+                logging.warning('Tradingday: {}, Symbol: {}, no price'.format(
+                    _tradingday, symbol
                 ))
                 if input('Continue?(y/n): ') != 'y':
                     sys.exit(1)
-                self.symbol_price_dict[symbol] = self.fetcher.fetchData(
-                    self.fetcher.instrumentLastTradingDay(
-                        symbol, _tradingday), symbol
-                )[self.settlement_price_index][0]
+                if self.price_matrix is None:
+                    price = self.fetcher.fetchData(
+                        self.fetcher.instrumentLastTradingDay(
+                            symbol, _tradingday), symbol
+                    )[self.settlement_price_index][0]
+                else:
+                    price = self.price_matrix.getLastPrice(
+                        _tradingday, symbol, self.settlement_price_index
+                    )
+            self.symbol_price_dict[symbol] = price
 
     def _iter_update_next_status(self, _tradingday):
         """
@@ -438,7 +461,7 @@ class InterDayPortfolio(PortfolioAbstract):
                 else:
                     quantity = 0
                 i_mgr.next_instrument_dict[next_instrument] = \
-                    POINT_VALUE[i_mgr.product] * quantity
+                    self.registry.pointValue(i_mgr.product) * quantity
 
     def _iter_send_order(self):
         for p_mgr in self.strategy_mgr:
@@ -570,9 +593,14 @@ class InterDayPortfolio(PortfolioAbstract):
         try:
             price = self.symbol_price_dict[_symbol]
         except KeyError:
-            price = self.fetcher.fetchData(
-                _tradingday, _symbol
-            )[self.settlement_price_index][0]
+            if self.price_matrix is None:
+                price = self.fetcher.fetchData(
+                    _tradingday, _symbol
+                )[self.settlement_price_index][0]
+            else:
+                price = self.price_matrix.getPrice(
+                    _tradingday, _symbol, self.settlement_price_index
+                )
             self.symbol_price_dict[_symbol] = price
 
         return price
@@ -0,0 +1,233 @@
+import pickle
+import struct
+import typing
+import zlib
+from array import array
+from datetime import datetime
+
+from ParadoxTrading.Engine.EventJournal import EPOCH, MICROSECOND
+from ParadoxTrading.Utils import DataStruct
+
+# record file layout:
+#   MAGIC, then blocks, each is BLOCK_HEAD (type, length) and payload.
+#   META block stores begin day, end day and register keys,
+#   one DAY block for each tradingday stores the data of every symbol
+#   column by column, and the order in which rows were emitted
+MAGIC = b'PTR1'
+BLOCK_HEAD = struct.Struct('<BI')
+BLOCK_META = 1
+BLOCK_DAY = 2
+
+COLUMN_PICKLE = 0
+COLUMN_FLOAT = 1
+COLUMN_INT = 2
+COLUMN_DATETIME = 3  # microseconds since EPOCH
+COLUMN_STR = 4  # utf-8, joined by '\0'
+
+
+def encodeColumn(_column: typing.Sequence) -> typing.Tuple[int, bytes]:
+    """
+    pack one column into bytes by the type of its values
+
+    :param _column: values of column
+    :return: kind of column and bytes
+    """
+    types = set(type(v) for v in _column)
+    if types == {float}:
+        return COLUMN_FLOAT, array('d', _column).tobytes()
+    elif types == {int}:
+        try:
+            return COLUMN_INT, array('q', _column).tobytes()
+        except OverflowError:
+            pass
+    elif types == {datetime} and all(v.tzinfo is None for v in _column):
+        return COLUMN_DATETIME, array(
+            'q', [(v - EPOCH) // MICROSECOND for v in _column]
+        ).tobytes()
+    elif types == {str} and not any('\0' in v for v in _column):
+        return COLUMN_STR, '\0'.join(_column).encode('utf-8')
+    return COLUMN_PICKLE, pickle.dumps(list(_column), pickle.HIGHEST_PROTOCOL)
+
+
+def decodeColumn(_kind: int, _bytes: bytes, _length: int) -> list:
+    """
+    unpack bytes created by encodeColumn
+    """
+    if _kind == COLUMN_FLOAT:
+        return array('d', _bytes).tolist()
+    elif _kind == COLUMN_INT:
+        return array('q', _bytes).tolist()
+    elif _kind == COLUMN_DATETIME:
+        return [EPOCH + v * MICROSECOND for v in array('q', _bytes)]
+    elif _kind == COLUMN_STR:
+        if _length == 0:
+            return []
+        return _bytes.decode('utf-8').split('\0')
+    elif _kind == COLUMN_PICKLE:
+        return pickle.loads(_bytes)
+    else:
+        raise Exception('unknown column kind')
+
+
+class MarketRecorder:
+    """
+    Record the market stream of BacktestMarketSupply into file, so that
+    ReplayMarketSupply can play it again without fetching anything.
+    Set it by BacktestMarketSupply.setRecorder() before engine.run(),
+    and close() it after.
+
+    :param _path: record file
+    :param _compress: zlib level of day blocks, 0 to disable
+    """
+
+    def __init__(self, _path: str, _compress: int = 1):
+        self.path: str = _path
+        self.compress: int = _compress
+        self.file: typing.BinaryIO = open(self.path, 'wb')
+        self.file.write(MAGIC)
+        self.meta_written: bool = False
+
+        self.tradingday: str = None
+        self.symbol_dict: typing.Dict[str, typing.Set[str]] = None
+        self.data_dict: typing.Dict[str, DataStruct] = None
+        self.symbol_id_dict: typing.Dict[str, int] = None
+        self.order: array = None
+
+    def _write_block(self, _type: int, _payload: bytes):
+        self.file.write(BLOCK_HEAD.pack(_type, len(_payload)))
+        self.file.write(_payload)
+
+    def setMeta(
+            self, _begin_day: str, _end_day: str,
+            _register_keys: typing.Iterable[str]
+    ):
+        """
+        write backtest range and market register keys, it must be the
+        first block of file
+        """
+        assert not self.meta_written
+        self.meta_written = True
+        self._write_block(BLOCK_META, pickle.dumps({
+            'begin_day': _begin_day,
+            'end_day': _end_day,
+            'register_keys': sorted(_register_keys),
+        }))
+
+    def beginDay(
+            self, _tradingday: str,
+            _symbol_dict: typing.Dict[str, typing.Set[str]],
+            _data_dict: typing.Dict[str, DataStruct]
+    ):
+        """
+        called when market supply loaded data of one tradingday
+
+        :param _tradingday:
+        :param _symbol_dict: map symbol to register keys
+        :param _data_dict: map symbol to data of the day
+        """
+        self.tradingday = _tradingday
+        self.symbol_dict = {k: set(v) for k, v in _symbol_dict.items()}
+        self.data_dict = dict(_data_dict)
+        self.symbol_id_dict = {
+            k: i for i, k in enumerate(sorted(self.data_dict.keys()))
+        }
+        self.order = array('H')
+
+    def addMarket(self, _symbol: str):
+        self.order.append(self.symbol_id_dict[_symbol])
+
+    def endDay(self, _tradingday: str):
+        """
+        called when market supply sends settlement of this day
+        """
+        assert _tradingday == self.tradingday
+
+        symbol_list = sorted(self.symbol_id_dict, key=self.symbol_id_dict.get)
+        data_list = []
+        for symbol in symbol_list:
+            data = self.data_dict[symbol]
+            data_list.append((
+                data.index_name, len(data),
+                [(k,) + encodeColumn(data.data[k]) for k in data.data.keys()]
+            ))
+        payload = pickle.dumps((
+            _tradingday,
+            {k: sorted(v) for k, v in self.symbol_dict.items()},
+            symbol_list, data_list, self.order.tobytes()
+        ), pickle.HIGHEST_PROTOCOL)
+        if self.compress:
+            payload = zlib.compress(payload, self.compress)
+        self._write_block(BLOCK_DAY, payload)
+
+        self.tradingday = None
+        self.data_dict = None
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class MarketRecordDay:
+    """
+    data of one tradingday read from record file
+    """
+
+    def __init__(
+            self, _tradingday: str,
+            _symbol_dict: typing.Dict[str, typing.Set[str]],
+            _data_dict: typing.Dict[str, DataStruct],
+            _order: typing.List[str]
+    ):
+        self.tradingday = _tradingday
+        # map symbol to register keys
+        self.symbol_dict = _symbol_dict
+        # map symbol to data of the day
+        self.data_dict = _data_dict
+        # symbol of each market data, in the order they were emitted
+        self.order = _order
+
+
+def readMarketRecord(
+        _path: str
+) -> typing.Iterator[typing.Union[dict, MarketRecordDay]]:
+    """
+    iter record file, the first one is the meta dict,
+    then a MarketRecordDay for each tradingday
+
+    :param _path: record file
+    """
+    with open(_path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise Exception('{} is not a market record'.format(_path))
+        while True:
+            head = f.read(BLOCK_HEAD.size)
+            if not head:
+                return
+            block_type, length = BLOCK_HEAD.unpack(head)
+            payload = f.read(length)
+            if block_type == BLOCK_META:
+                yield pickle.loads(payload)
+            elif block_type == BLOCK_DAY:
+                if payload[:1] != b'\x80':  # not raw pickle, so compressed
+                    payload = zlib.decompress(payload)
+                tradingday, symbol_dict, symbol_list, data_list, order = \
+                    pickle.loads(payload)
+                data_dict = {}
+                for symbol, (index_name, length, columns) in zip(
+                        symbol_list, data_list
+                ):
+                    data = DataStruct([k for k, _, _ in columns], index_name)
+                    data.data = {
+                        k: decodeColumn(kind, b, length)
+                        for k, kind, b in columns
+                    }
+                    data_dict[symbol] = data
+                yield MarketRecordDay(
+                    tradingday,
+                    {k: set(v) for k, v in symbol_dict.items()},
+                    data_dict,
+                    [symbol_list[i] for i in array('H', order)]
+                )
+            else:
+                raise Exception('unknown block type')
@@ -0,0 +1,171 @@
+import typing
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from ParadoxTrading.Fetch import FetchAbstract
+
+# columns kept by default, the ones portfolios and executions read
+PRICE_COLUMNS = ('openprice', 'closeprice', 'settlementprice')
+
+
+class PriceMatrix:
+    """
+    daily prices of instruments from _begin_day to _end_day(excluded)
+    in a numpy matrix of (column, symbol, day), so portfolios and
+    executions read the price of a symbol on a day in O(1) instead of
+    fetching the day's data for one float. Each symbol is loaded by one
+    fetchDayData() of its whole range when first read, or by preload().
+    Days out of range are fetched as before.
+
+    The price of a day is the first row of that tradingday, the same as
+    fetchData(tradingday, symbol)[column][0].
+
+    :param _fetcher: day data fetcher
+    :param _begin_day: first day of backtest
+    :param _end_day: end day of backtest(excluded)
+    :param _columns: columns to keep
+    """
+
+    def __init__(
+            self, _fetcher: FetchAbstract,
+            _begin_day: str, _end_day: str,
+            _columns: typing.Sequence[str] = PRICE_COLUMNS
+    ):
+        self.fetcher = _fetcher
+        self.begin_day = _begin_day
+        self.end_day = _end_day
+        self.columns: typing.List[str] = list(_columns)
+        self.column_pos: typing.Dict[str, int] = {
+            c: i for i, c in enumerate(self.columns)
+        }
+
+        # every date in range, days without data are nan
+        self.day_pos: typing.Dict[str, int] = {
+            d: i for i, d in enumerate(
+                self._day_list(_begin_day, _end_day)
+            )
+        }
+        self.symbol_pos: typing.Dict[str, int] = {}
+        self.prices: np.ndarray = np.full(
+            (len(self.columns), 0, len(self.day_pos)), np.nan
+        )
+        # position of the last day before each day with data, -1 if none
+        self.prev_pos: np.ndarray = np.full(
+            (0, len(self.day_pos)), -1, np.int32
+        )
+
+    @staticmethod
+    def _day_list(_begin_day: str, _end_day: str) -> typing.List[str]:
+        ret = []
+        cur = datetime.strptime(_begin_day, '%Y%m%d')
+        end = datetime.strptime(_end_day, '%Y%m%d')
+        while cur < end:
+            ret.append(cur.strftime('%Y%m%d'))
+            cur += timedelta(days=1)
+        return ret
+
+    def _grow(self):
+        # double rows, so adding symbols one by one is amortized O(1)
+        rows = max(16, 2 * self.prices.shape[1])
+        prices = np.full(
+            (len(self.columns), rows, len(self.day_pos)), np.nan
+        )
+        prices[:, :self.prices.shape[1]] = self.prices
+        prev_pos = np.full((rows, len(self.day_pos)), -1, np.int32)
+        prev_pos[:self.prev_pos.shape[0]] = self.prev_pos
+        self.prices, self.prev_pos = prices, prev_pos
+
+    def _load(self, _symbol: str) -> int:
+        symbol = _symbol.lower()
+        try:
+            return self.symbol_pos[symbol]
+        except KeyError:
+            pass
+
+        pos = len(self.symbol_pos)
+        if pos == self.prices.shape[1]:
+            self._grow()
+        data = self.fetcher.fetchDayData(
+            self.begin_day, self.end_day,
+            _symbol=symbol, _columns=self.columns
+        )
+        has_data = np.zeros(len(self.day_pos), bool)
+        for i, tradingday in enumerate(data['tradingday']):
+            day = self.day_pos.get(tradingday)
+            if day is None or has_data[day]:
+                continue
+            has_data[day] = True
+            for c, column in enumerate(self.columns):
+                self.prices[c, pos, day] = data.data[column][i]
+
+        last_pos = np.maximum.accumulate(
+            np.where(has_data, np.arange(len(self.day_pos)), -1)
+        )
+        self.prev_pos[pos, 1:] = last_pos[:-1]
+        self.symbol_pos[symbol] = pos
+        return pos
+
+    def preload(self, _symbols: typing.Iterable[str]):
+        """
+        load symbols before backtest, one query for each
+        """
+        for symbol in _symbols:
+            self._load(symbol)
+
+    def _fetch_price(
+            self, _tradingday: str, _symbol: str, _column: str
+    ) -> typing.Union[None, float]:
+        data = self.fetcher.fetchData(_tradingday, _symbol)
+        return None if data is None else data[_column][0]
+
+    def _fetch_last_price(
+            self, _tradingday: str, _symbol: str, _column: str
+    ) -> typing.Union[None, float]:
+        last_day = self.fetcher.instrumentLastTradingDay(
+            _symbol, _tradingday
+        )
+        if last_day is None:
+            return None
+        return self._fetch_price(last_day, _symbol, _column)
+
+    def getPrice(
+            self, _tradingday: str, _symbol: str, _column: str
+    ) -> typing.Union[None, float]:
+        """
+        price of _symbol on _tradingday
+
+        :param _tradingday:
+        :param _symbol:
+        :param _column: one of columns
+        :return: None if no data
+        """
+        day = self.day_pos.get(_tradingday)
+        if day is None:
+            return self._fetch_price(_tradingday, _symbol, _column)
+        # _load() may replace self.prices, so call it before indexing
+        symbol_pos = self._load(_symbol)
+        price = self.prices[self.column_pos[_column], symbol_pos, day]
+        return None if np.isnan(price) else float(price)
+
+    def getLastPrice(
+            self, _tradingday: str, _symbol: str, _column: str
+    ) -> typing.Union[None, float]:
+        """
+        price of _symbol on the last day before _tradingday having data,
+        used when it has no data on _tradingday
+
+        :param _tradingday:
+        :param _symbol:
+        :param _column: one of columns
+        :return: None if no data before
+        """
+        day = self.day_pos.get(_tradingday)
+        if day is None:
+            return self._fetch_last_price(_tradingday, _symbol, _column)
+        symbol_pos = self._load(_symbol)
+        prev = self.prev_pos[symbol_pos, day]
+        if prev < 0:
+            # the last day may be before begin day
+            return self._fetch_last_price(_tradingday, _symbol, _column)
+        return float(self.prices[self.column_pos[_column], symbol_pos, prev])
@@ -0,0 +1,103 @@
+import logging
+import typing
+from datetime import datetime, timedelta
+
+from ParadoxTrading.Engine import (MarketSupplyAbstract, ReturnMarket,
+                                   ReturnSettlement, StrategyAbstract)
+from ParadoxTrading.EngineExt.Futures.MarketRecorder import \
+    MarketRecordDay, readMarketRecord
+from ParadoxTrading.Fetch import RegisterAbstract
+
+
+class ReplayMarketSupply(MarketSupplyAbstract):
+    def __init__(self, _path: str):
+        """
+        market supply for backtest, it replays the market stream recorded
+        by MarketRecorder from BacktestMarketSupply, without fetcher.
+        Strategies can only use market registers which were recorded.
+
+        :param _path: record file
+        """
+        super().__init__(None)
+
+        self.path: str = _path
+        self.record_iter: typing.Iterator = readMarketRecord(self.path)
+        self.meta: typing.Dict[str, typing.Any] = next(self.record_iter, None)
+        if self.meta is None:
+            raise Exception('{} is empty'.format(self.path))
+
+        self.tradingday: str = self.meta['begin_day']
+        self.datetime: typing.Union[str, datetime] = None
+
+        self.day: MarketRecordDay = None
+        self.pos: int = 0
+        self.index_dict: typing.Dict[str, int] = {}
+
+    def addStrategy(self, _strategy: StrategyAbstract):
+        for key in _strategy.registers:
+            if key not in self.meta['register_keys']:
+                raise Exception('register {} is not recorded in {}'.format(
+                    key, self.path
+                ))
+            if key not in self.register_dict.keys():
+                # only strategy_set is used when replaying
+                self.register_dict[key] = RegisterAbstract()
+            self.register_dict[key].addStrategy(_strategy)
+
+    def _load_day(self) -> bool:
+        """
+        load next tradingday, return False when record is over
+        """
+        self.day = next(self.record_iter, None)
+        if self.day is None:
+            return False
+
+        self.tradingday = self.day.tradingday
+        self.pos = 0
+        self.index_dict = {k: 0 for k in self.day.data_dict.keys()}
+        # only keep symbols whose registers are replayed
+        self.symbol_dict.clear()
+        for symbol, keys in self.day.symbol_dict.items():
+            keys = keys & self.register_dict.keys()
+            if keys:
+                self.symbol_dict[symbol] = keys
+        logging.info('TradingDay: {}, Product: {}'.format(
+            self.tradingday, self.symbol_dict.keys()
+        ))
+        return True
+
+    def updateData(self) -> typing.Union[
+        None, ReturnMarket, ReturnSettlement
+    ]:
+        while self.day is None:
+            if not self._load_day():
+                return None
+            if not self.symbol_dict:
+                self.day = None
+
+        order = self.day.order
+        while self.pos < len(order):
+            symbol = order[self.pos]
+            self.pos += 1
+            index = self.index_dict[symbol]
+            self.index_dict[symbol] += 1
+            if symbol not in self.symbol_dict:
+                # its strategies are not replayed
+                continue
+            data = self.day.data_dict[symbol].iloc[index]
+            self.datetime = data.index()[0]
+            return self.addMarketEvent(symbol, data)
+
+        # this tradingday is end, move to next date like backtest
+        tmp_day = self.tradingday
+        self.tradingday = (
+            datetime.strptime(tmp_day, '%Y%m%d') + timedelta(days=1)
+        ).strftime('%Y%m%d')
+        self.day = None
+        return self.addSettlementEvent(tmp_day)
+
+    def getTradingDay(self) -> str:
+        return self.tradingday
+
+    def getDatetime(self) -> typing.Union[None, datetime, str]:
+        return self.datetime
@@ -14,6 +14,7 @@ class TickBacktestExecution(ExecutionAbstract):
         self.commission_rate: float = _commission_rate
         self.askprice_idx: str = _askprice_idx
         self.bidprice_idx: str = _bidprice_idx
+        self.market_columns = {self.askprice_idx, self.bidprice_idx}
 
     def dealOrderEvent(
         self, _order_event: OrderEvent
@@ -1,11 +1,12 @@
 import logging
-import re
 import sys
 
 import typing
 from ParadoxTrading.Engine import ActionType, DirectionType, FillEvent, \
     OrderEvent, OrderType, PortfolioAbstract, SignalEvent, SignalType
-from ParadoxTrading.EngineExt.Futures.PointValue import POINT_VALUE
+from ParadoxTrading.EngineExt.Futures.InstrumentRegistry import \
+    getInstrumentRegistry
+from ParadoxTrading.EngineExt.Futures.PriceMatrix import PriceMatrix
 from ParadoxTrading.Fetch import FetchAbstract
 from ParadoxTrading.Utils import DataStruct
 
@@ -20,14 +21,21 @@ class TickPortfolio(PortfolioAbstract):
         _fetcher: FetchAbstract,
         _init_fund: float = 0.0,
         _margin_rate: float = 1.0,
-        _settlement_price_index='lastprice'
+        _settlement_price_index='lastprice',
+        _price_matrix: PriceMatrix = None,
     ):
         super().__init__(_init_fund, _margin_rate)
+        # dealMarket() does nothing
+        self.market_columns = set()
 
         self.index_strategy_table: typing.Dict[int, str] = {}
 
         self.fetcher = _fetcher
         self.settlement_price_index = _settlement_price_index
+        # read settlement prices from it if given
+        self.price_matrix = _price_matrix
+        # point values of instruments
+        self.registry = getInstrumentRegistry()
 
         self.addPickleKey('index_strategy_table')
 
@@ -51,7 +59,6 @@ class TickPortfolio(PortfolioAbstract):
         self.portfolio_mgr.dealSignal(_event)
 
         instrument = _event.symbol
-        product = re.findall(r'[a-zA-Z]+', instrument)[0]
 
         order_list: typing.List[OrderEvent] = []
         short_quantity = self.portfolio_mgr.getPosition(
@@ -69,7 +76,7 @@ class TickPortfolio(PortfolioAbstract):
             if long_quantity == 0:  # open long position
                 order_list.append(self._gen_order(
                     _event.symbol, ActionType.OPEN, DirectionType.BUY,
-                    POINT_VALUE[product]
+                    self.registry.pointValue(instrument)
                 ))
         elif _event.signal_type == SignalType.SHORT:
             if long_quantity > 0:  # close long position
@@ -80,7 +87,7 @@ class TickPortfolio(PortfolioAbstract):
             if short_quantity == 0:  # open short position
                 order_list.append(self._gen_order(
                     _event.symbol, ActionType.OPEN, DirectionType.SELL,
-                    POINT_VALUE[product]
+                    self.registry.pointValue(instrument)
                 ))
         elif _event.signal_type == SignalType.EMPTY:
             if long_quantity > 0:  # close long position
@@ -114,16 +121,25 @@ class TickPortfolio(PortfolioAbstract):
 
         # do settlement for cur positions
         symbol_price_dict = {}
-        for symbol in self.portfolio_mgr.getSymbolList():
-            try:
-                symbol_price_dict[symbol] = self.fetcher.fetchData(
+        symbol_list = self.portfolio_mgr.getSymbolList()
+        if self.price_matrix is None:
+            # fetch prices of all symbols together
+            data_dict = self.fetcher.fetchDataMany(_tradingday, symbol_list)
+        for symbol in symbol_list:
+            if self.price_matrix is None:
+                data = data_dict[symbol.lower()]
+                price = None if data is None \
+                    else data[self.settlement_price_index][0]
+            else:
+                price = self.price_matrix.getPrice(
+                    _tradingday, symbol, self.settlement_price_index
+                )
+            if price is None:
+                logging.error('Tradingday: {}, Symbol: {}, no price'.format(
                     _tradingday, symbol
-                )[self.settlement_price_index][0]
-            except TypeError as e:
-                logging.error('Tradingday: {}, Symbol: {}, e: {}'.format(
-                    _tradingday, symbol, e
                 ))
                 sys.exit(1)
+            symbol_price_dict[symbol] = price
         self.portfolio_mgr.dealSettlement(
             _tradingday, symbol_price_dict
         )
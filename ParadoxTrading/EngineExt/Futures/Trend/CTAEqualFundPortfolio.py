@@ -1,7 +1,8 @@
 import math
 
-from ParadoxTrading.EngineExt.Futures.InterDayPortfolio import POINT_VALUE, \
+from ParadoxTrading.EngineExt.Futures.InterDayPortfolio import \
     InterDayPortfolio, InstrumentMgr
+from ParadoxTrading.EngineExt.Futures.PriceMatrix import PriceMatrix
 from ParadoxTrading.Fetch.ChineseFutures.FetchBase import FetchBase
 
 
@@ -15,11 +16,13 @@ class CTAEqualFundPortfolio(InterDayPortfolio):
             _adjust_period: int = 5,
             _simulate_product_index: bool = True,
             _settlement_price_index: str = 'closeprice',
+            _price_matrix: PriceMatrix = None,
     ):
         super().__init__(
             _fetcher, _init_fund, _margin_rate,
             _simulate_product_index=_simulate_product_index,
             _settlement_price_index=_settlement_price_index,
+            _price_matrix=_price_matrix,
         )
 
         self.leverage_rate: float = _leverage_rate
@@ -33,7 +36,7 @@ class CTAEqualFundPortfolio(InterDayPortfolio):
             self, _i_mgr: InstrumentMgr,
             _tradingday: str, _part_fund_alloc: float
     ):
-        point_value = POINT_VALUE[_i_mgr.product]
+        point_value = self.registry.pointValue(_i_mgr.product)
         instrument = self.fetcher.fetchSymbol(
             _tradingday, _product=_i_mgr.product
         )
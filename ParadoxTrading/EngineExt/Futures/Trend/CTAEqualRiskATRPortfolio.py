@@ -1,8 +1,9 @@
 import math
 import typing
 
-from ParadoxTrading.EngineExt.Futures.InterDayPortfolio import POINT_VALUE, \
+from ParadoxTrading.EngineExt.Futures.InterDayPortfolio import \
     InterDayPortfolio, InstrumentMgr
+from ParadoxTrading.EngineExt.Futures.PriceMatrix import PriceMatrix
 from ParadoxTrading.Fetch.ChineseFutures.FetchBase import FetchBase
 from ParadoxTrading.Indicator import ATR
 from ParadoxTrading.Utils import DataStruct
@@ -19,12 +20,14 @@ class CTAEqualRiskATRPortfolio(InterDayPortfolio):
             _atr_period: int = 50,
             _leverage_limit: int = 3,
             _simulate_product_index: bool = False,
-            _settlement_price_index: str = 'closeprice'
+            _settlement_price_index: str = 'closeprice',
+            _price_matrix: PriceMatrix = None,
     ):
         super().__init__(
             _fetcher, _init_fund, _margin_rate,
             _simulate_product_index=_simulate_product_index,
-            _settlement_price_index=_settlement_price_index
+            _settlement_price_index=_settlement_price_index,
+            _price_matrix=_price_matrix,
         )
 
         self.risk_rate: float = _risk_rate
@@ -43,7 +46,7 @@ class CTAEqualRiskATRPortfolio(InterDayPortfolio):
             _tradingday: str, _part_risk_alloc: float,
     ):
         # limit max quantity
-        point_value = POINT_VALUE[_i_mgr.product]
+        point_value = self.registry.pointValue(_i_mgr.product)
         instrument = self.fetcher.fetchSymbol(
             _tradingday, _product=_i_mgr.product
         )
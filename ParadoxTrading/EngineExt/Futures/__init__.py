@@ -4,11 +4,16 @@ from .BacktestEngine import BacktestEngine
 from .BacktestMarketSupply import BacktestMarketSupply
 from .BarBacktestExecution import BarBacktestExecution
 from .BarPortfolio import BarPortfolio
+from .InstrumentRegistry import ContractSpec, InstrumentRegistry, \
+    getInstrumentRegistry
 from .InterDayBacktestExecution import InterDayBacktestExecution
 from .InterDayOnlineEngine import InterDayOnlineEngine
 from .InterDayOnlineExecution import InterDayOnlineExecution
 from .InterDayOnlineMarketSupply import InterDayOnlineMarketSupply
 from .InterDayPortfolio import InterDayPortfolio
+from .MarketRecorder import MarketRecorder, readMarketRecord
+from .PriceMatrix import PriceMatrix
+from .ReplayMarketSupply import ReplayMarketSupply
 from .TickBacktestExecution import TickBacktestExecution
 from .TickPortfolio import TickPortfolio
 from .Trend import CTAEqualFundPortfolio, CTAEqualRiskATRPortfolio, \
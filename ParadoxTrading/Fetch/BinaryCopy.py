@@ -0,0 +1,214 @@
+import struct
+import typing
+from datetime import datetime, timedelta
+
+# stream layout of COPY ... TO STDOUT WITH (FORMAT binary):
+#   SIGNATURE, int32 flags, int32 length of header extension and it,
+#   then each row is int16 count of fields and for each field int32
+#   length (-1 for NULL) and value, all in network byte order,
+#   int16 -1 ends the stream
+SIGNATURE = b'PGCOPY\n\xff\r\n\x00'
+HEADER = struct.Struct('>ii')
+FIELD_COUNT = struct.Struct('>h')
+FIELD_LENGTH = struct.Struct('>i')
+TRAILER = b'\xff\xff'
+
+# timestamp is sent as microseconds since it
+PG_EPOCH = datetime(2000, 1, 1)
+# PG_EPOCH - 1970-01-01 in microseconds
+PG_EPOCH_OFFSET = 946684800 * 1000000
+
+# type name -> (struct format of value, numpy dtype of value)
+COPY_TYPES: typing.Dict[str, typing.Tuple[str, str]] = {
+    'float8': ('>d', '>f8'),
+    'float4': ('>f', '>f4'),
+    'int8': ('>q', '>i8'),
+    'int4': ('>i', '>i4'),
+    'int2': ('>h', '>i2'),
+    'timestamp': ('>q', '>i8'),
+    'text': (None, None),
+}
+
+
+def castColumns(
+        _columns: typing.Sequence[str], _types: typing.Sequence[str]
+) -> str:
+    """
+    select list casting every column to the type decodeBinaryCopy
+    expects
+
+    :param _columns: columns to select
+    :param _types: type name of each column, keys of COPY_TYPES
+    :return: sql
+    """
+    return ', '.join(
+        '{}::{}'.format(c, t) for c, t in zip(_columns, _types)
+    )
+
+
+def copyQuery(_select: str) -> str:
+    """
+    build the COPY statement sending result of _select in binary
+
+    :param _select: select statement
+    :return: sql
+    """
+    return "COPY ({}) TO STDOUT WITH (FORMAT binary)".format(_select)
+
+
+def _body_offset(_buf: bytes) -> int:
+    if _buf[:len(SIGNATURE)] != SIGNATURE:
+        raise Exception('not a binary copy stream')
+    _, ext_length = HEADER.unpack_from(_buf, len(SIGNATURE))
+    return len(SIGNATURE) + HEADER.size + ext_length
+
+
+def _decode_value(_type: str, _value: bytes):
+    if _type == 'text':
+        return _value.decode('utf-8')
+    ret = struct.unpack(COPY_TYPES[_type][0], _value)[0]
+    if _type == 'timestamp':
+        return PG_EPOCH + timedelta(microseconds=ret)
+    return ret
+
+
+def _decode_rows(
+        _buf: bytes, _offset: int, _types: typing.Sequence[str]
+) -> typing.List[list]:
+    """
+    decode field by field, used when rows are not of the same shape,
+    NULL becomes None
+    """
+    columns = [[] for _ in _types]
+    offset = _offset
+    while True:
+        count, = FIELD_COUNT.unpack_from(_buf, offset)
+        offset += FIELD_COUNT.size
+        if count == -1:
+            return columns
+        if count != len(_types):
+            raise Exception('fields of row mismatch types')
+        for column, type_name in zip(columns, _types):
+            length, = FIELD_LENGTH.unpack_from(_buf, offset)
+            offset += FIELD_LENGTH.size
+            if length < 0:
+                column.append(None)
+            else:
+                column.append(
+                    _decode_value(type_name, _buf[offset:offset + length])
+                )
+                offset += length
+
+
+def _decode_fixed(
+        _buf: bytes, _offset: int, _types: typing.Sequence[str]
+) -> typing.Union[None, typing.List[list]]:
+    """
+    when every row has the same field lengths, which is true for tables
+    without NULL and with fixed width text such as char(8), the body is
+    an array of one numpy record type and is decoded column by column.
+    Return None if it is not the case.
+    """
+    import numpy as np
+
+    # lengths of the first row
+    lengths = []
+    offset = _offset + FIELD_COUNT.size
+    for type_name in _types:
+        if offset + FIELD_LENGTH.size > len(_buf):
+            return None
+        length, = FIELD_LENGTH.unpack_from(_buf, offset)
+        if length < 0 or (type_name == 'text' and length == 0):
+            return None
+        lengths.append(length)
+        offset += FIELD_LENGTH.size + length
+
+    fields = [('count', '>i2')]
+    for i, (type_name, length) in enumerate(zip(_types, lengths)):
+        fields.append(('l{}'.format(i), '>i4'))
+        if type_name == 'text':
+            fields.append(('v{}'.format(i), 'S{}'.format(length)))
+        else:
+            fields.append(('v{}'.format(i), COPY_TYPES[type_name][1]))
+    dtype = np.dtype(fields)
+
+    body = len(_buf) - _offset - len(TRAILER)
+    if body % dtype.itemsize or _buf[-len(TRAILER):] != TRAILER:
+        return None
+    arr = np.frombuffer(
+        _buf, dtype, body // dtype.itemsize, _offset
+    )
+    if not (arr['count'] == len(_types)).all():
+        return None
+    for i, length in enumerate(lengths):
+        if not (arr['l{}'.format(i)] == length).all():
+            return None
+
+    columns = []
+    for i, type_name in enumerate(_types):
+        value = arr['v{}'.format(i)]
+        if type_name == 'text':
+            # text columns such as tradingday repeat a few values,
+            # so decode each distinct value only once
+            uniq, inverse = np.unique(value, return_inverse=True)
+            uniq = [v.decode('utf-8') for v in uniq.tolist()]
+            columns.append([uniq[i] for i in inverse.tolist()])
+        elif type_name == 'timestamp':
+            columns.append((
+                value.astype('i8') + PG_EPOCH_OFFSET
+            ).astype('datetime64[us]').tolist())
+        else:
+            columns.append(value.tolist())
+    return columns
+
+
+def decodeBinaryCopy(
+        _buf: bytes, _types: typing.Sequence[str]
+) -> typing.List[list]:
+    """
+    decode the output of COPY ... TO STDOUT WITH (FORMAT binary)
+    into columns of python values, the same values psycopg2 returns
+
+    :param _buf: the whole stream
+    :param _types: type name of each column, keys of COPY_TYPES
+    :return: list of columns
+    """
+    offset = _body_offset(_buf)
+    columns = _decode_fixed(_buf, offset, _types)
+    if columns is None:
+        columns = _decode_rows(_buf, offset, _types)
+    return columns
+
+
+def encodeBinaryCopy(
+        _columns: typing.Sequence[typing.Sequence],
+        _types: typing.Sequence[str]
+) -> bytes:
+    """
+    create the stream decodeBinaryCopy reads, it is what postgresql
+    sends, used to benchmark without database
+
+    :param _columns: list of columns
+    :param _types: type name of each column
+    :return: stream
+    """
+    ret = [SIGNATURE, HEADER.pack(0, 0)]
+    count = FIELD_COUNT.pack(len(_types))
+    for row in zip(*_columns):
+        ret.append(count)
+        for type_name, v in zip(_types, row):
+            if v is None:
+                ret.append(FIELD_LENGTH.pack(-1))
+                continue
+            if type_name == 'text':
+                value = v.encode('utf-8')
+            elif type_name == 'timestamp':
+                value = struct.pack(
+                    '>q', (v - PG_EPOCH) // timedelta(microseconds=1)
+                )
+            else:
+                value = struct.pack(COPY_TYPES[type_name][0], v)
+            ret.append(FIELD_LENGTH.pack(len(value)))
+            ret.append(value)
+    ret.append(TRAILER)
+    return b''.join(ret)
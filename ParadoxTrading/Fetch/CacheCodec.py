@@ -0,0 +1,185 @@
+import pickle
+import typing
+import zlib
+from datetime import datetime
+
+from ParadoxTrading.Engine.EventJournal import EPOCH, MICROSECOND
+from ParadoxTrading.Utils import DataStruct
+
+# encoded datastruct is MAGIC and zlib compressed int32 length of
+# header, pickled header and column payloads one after another.
+# Header is (index_name, length, [(key, kind, nbytes)])
+MAGIC = b'PTC1'
+COMPRESS_LEVEL = 1
+
+COLUMN_PICKLE = 0
+# bits xor the previous value, close prices share most high bits
+COLUMN_FLOAT = 1
+# delta to the previous value
+COLUMN_INT = 2
+# delta of microseconds since EPOCH
+COLUMN_DATETIME = 3
+# distinct values and int32 code of each row
+COLUMN_STR = 4
+# numpy arrays of the same shape and dtype, like levels of order book,
+# only elements changed from the previous row are kept, with a bit mask
+COLUMN_ARRAY = 5
+
+
+def _shuffle(_arr) -> bytes:
+    """
+    put the n-th byte of every value together, zlib likes runs of
+    equal high bytes
+    """
+    return _arr.view('u1').reshape(-1, _arr.dtype.itemsize).T.tobytes()
+
+
+def _unshuffle(_bytes: bytes, _dtype: str):
+    import numpy as np
+
+    itemsize = np.dtype(_dtype).itemsize
+    return np.frombuffer(_bytes, 'u1').reshape(
+        itemsize, -1
+    ).T.copy().view(_dtype).reshape(-1)
+
+
+def _encode_column(_column: list) -> typing.Tuple[int, bytes]:
+    import numpy as np
+
+    types = set(map(type, _column))
+    if types == {float}:
+        bits = np.array(_column, '<f8').view('<u8')
+        xor = bits.copy()
+        xor[1:] ^= bits[:-1]
+        return COLUMN_FLOAT, _shuffle(xor)
+    if types == {int}:
+        try:
+            arr = np.array(_column, '<i8')
+        except OverflowError:
+            arr = None
+        if arr is not None:
+            return COLUMN_INT, _shuffle(np.diff(arr, prepend=0))
+    if types == {datetime} and all(v.tzinfo is None for v in _column):
+        arr = np.fromiter(
+            ((v - EPOCH) // MICROSECOND for v in _column), '<i8', len(_column)
+        )
+        return COLUMN_DATETIME, _shuffle(np.diff(arr, prepend=0))
+    if types == {str}:
+        code_dict = {}
+        codes = np.fromiter((
+            code_dict.setdefault(v, len(code_dict)) for v in _column
+        ), '<i4', len(_column))
+        return COLUMN_STR, pickle.dumps(
+            list(code_dict), pickle.HIGHEST_PROTOCOL
+        ) + codes.tobytes()
+    if types == {np.ndarray}:
+        first = _column[0]
+        if first.dtype.kind in 'biuf' and all(
+                v.shape == first.shape and v.dtype == first.dtype
+                for v in _column
+        ):
+            dtype = first.dtype.newbyteorder('<')
+            bits = np.ascontiguousarray(np.stack(_column), dtype).view(
+                '<u{}'.format(dtype.itemsize)
+            ).reshape(len(_column), -1)
+            changed = np.ones(bits.shape, bool)
+            changed[1:] = bits[1:] != bits[:-1]
+            raw = pickle.dumps(
+                (dtype.str, first.shape), pickle.HIGHEST_PROTOCOL
+            )
+            return COLUMN_ARRAY, len(raw).to_bytes(4, 'little') + raw + \
+                np.packbits(changed).tobytes() + _shuffle(bits[changed])
+    return COLUMN_PICKLE, pickle.dumps(_column, pickle.HIGHEST_PROTOCOL)
+
+
+def _decode_column(_kind: int, _bytes: bytes, _length: int) -> list:
+    import numpy as np
+
+    if _length == 0:
+        return []
+    if _kind == COLUMN_FLOAT:
+        xor = _unshuffle(_bytes, '<u8')
+        return np.bitwise_xor.accumulate(xor).view('<f8').tolist()
+    if _kind == COLUMN_INT:
+        return np.cumsum(_unshuffle(_bytes, '<i8')).tolist()
+    if _kind == COLUMN_DATETIME:
+        return np.cumsum(
+            _unshuffle(_bytes, '<i8')
+        ).astype('datetime64[us]').tolist()
+    if _kind == COLUMN_STR:
+        codes = np.frombuffer(_bytes[-4 * _length:], '<i4')
+        uniq = pickle.loads(_bytes[:-4 * _length])
+        return [uniq[i] for i in codes.tolist()]
+    if _kind == COLUMN_ARRAY:
+        head_len = int.from_bytes(_bytes[:4], 'little')
+        dtype, shape = pickle.loads(_bytes[4:4 + head_len])
+        dtype = np.dtype(dtype)
+        width = int(np.prod(shape))
+        offset = 4 + head_len + (_length * width + 7) // 8
+        changed = np.unpackbits(
+            np.frombuffer(_bytes[4 + head_len:offset], 'u1'),
+            count=_length * width
+        ).view(bool).reshape(_length, width)
+        bits = np.zeros((_length, width), '<u{}'.format(dtype.itemsize))
+        bits[changed] = _unshuffle(
+            _bytes[offset:], '<u{}'.format(dtype.itemsize)
+        )
+        # each element takes the value of the row it last changed in
+        rows = np.where(changed, np.arange(_length)[:, None], 0)
+        np.maximum.accumulate(rows, axis=0, out=rows)
+        bits = bits[rows, np.arange(width)]
+        # rows are views of one array
+        return list(bits.view(dtype).reshape((_length,) + shape))
+    if _kind == COLUMN_PICKLE:
+        return pickle.loads(_bytes)
+    raise Exception('unknown column kind')
+
+
+def isEncoded(_value: typing.Any) -> bool:
+    return isinstance(_value, bytes) and _value[:len(MAGIC)] == MAGIC
+
+
+def encodeValue(_value: typing.Any) -> typing.Any:
+    """
+    turn datastruct into compressed columnar bytes, other values are
+    returned as they are and pickled by diskcache
+
+    :param _value: value to cache
+    :return: value to store
+    """
+    if not isinstance(_value, DataStruct):
+        return _value
+    length = len(_value)
+    header = []
+    payload = []
+    for k, column in _value.data.items():
+        kind, b = _encode_column(column)
+        header.append((k, kind, len(b)))
+        payload.append(b)
+    raw = pickle.dumps(
+        (_value.index_name, length, header), pickle.HIGHEST_PROTOCOL
+    )
+    return MAGIC + zlib.compress(
+        len(raw).to_bytes(4, 'little') + raw + b''.join(payload),
+        COMPRESS_LEVEL
+    )
+
+
+def decodeValue(_value: typing.Any) -> typing.Any:
+    """
+    reverse of encodeValue, values not encoded by it, like those stored
+    by old versions, are returned as they are
+    """
+    if not isEncoded(_value):
+        return _value
+    raw = zlib.decompress(memoryview(_value)[len(MAGIC):])
+    head_len = int.from_bytes(raw[:4], 'little')
+    index_name, length, header = pickle.loads(raw[4:4 + head_len])
+    ret = DataStruct([k for k, _, _ in header], index_name)
+    offset = 4 + head_len
+    for k, kind, nbytes in header:
+        ret.data[k] = _decode_column(
+            kind, raw[offset:offset + nbytes], length
+        )
+        offset += nbytes
+    return ret
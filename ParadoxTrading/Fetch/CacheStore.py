@@ -0,0 +1,317 @@
+import contextlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import typing
+import urllib.parse
+import zlib
+
+if typing.TYPE_CHECKING:
+    from diskcache import Cache
+
+# prefixes of _cache_path selecting the kind of cache, see openDisk()
+SNAPSHOT_PREFIX = 'snapshot:'
+SHARDED_PREFIX = 'sharded:'
+
+# shards of a new sharded cache, an existing one keeps its own count
+CACHE_SHARDS = 8
+# bytes of snapshot database mapped into memory by each connection
+SNAPSHOT_MMAP_SIZE = 1024 * 1024 * 1024
+
+_SHARD_DIR = 'shard_{:03d}'
+# tradingday in keys, like ChineseFuturesInstrumentTickData_rb1705_20170103
+# and ones of projected data with columns after it
+_TRADINGDAY_PATTERN = re.compile(r'_(\d{8})(?:_|$)')
+_MISSING = object()
+
+
+def splitKey(_key: str) -> typing.Tuple[str, typing.Union[None, str]]:
+    """
+    split cache key into the part before tradingday, which names the
+    symbol of market data, and the tradingday, None if there is not
+
+    :param _key:
+    :return: name and tradingday
+    """
+    match = _TRADINGDAY_PATTERN.search(_key)
+    if match is None:
+        return _key, None
+    return _key[:match.start()], match.group(1)
+
+
+def oldestTag(
+        _disk: typing.Union['Cache', 'ShardedCache']
+) -> typing.Union[None, str]:
+    """
+    the smallest tag in cache, it is the oldest tradingday
+    """
+    shards = _disk.shards if isinstance(_disk, ShardedCache) else [_disk]
+    tags = []
+    for shard in shards:
+        row = shard._sql(
+            'SELECT tag FROM Cache WHERE tag IS NOT NULL '
+            'ORDER BY tag LIMIT 1'
+        ).fetchone()
+        if row is not None:
+            tags.append(row[0])
+    return min(tags) if tags else None
+
+
+def usedVolume(_disk: typing.Union['Cache', 'ShardedCache']) -> int:
+    """
+    bytes on disk without pages sqlite has freed, volume() keeps
+    counting them until they are reused
+    """
+    shards = _disk.shards if isinstance(_disk, ShardedCache) else [_disk]
+    ret = 0
+    for shard in shards:
+        page_size = shard._sql('PRAGMA page_size').fetchone()[0]
+        free_pages = shard._sql('PRAGMA freelist_count').fetchone()[0]
+        ret += shard.volume() - page_size * free_pages
+    return ret
+
+
+class ShardedCache:
+    """
+    diskcache split into several databases by symbol, so processes
+    warming different symbols do not wait for the lock of one sqlite
+    database. All tradingdays of a symbol are in the same shard.
+
+    :param _path: directory holding shards
+    :param _shards: count of shards, default the count of existing ones,
+        or CACHE_SHARDS for a new cache
+    :param kwargs: settings of each diskcache
+    """
+
+    def __init__(self, _path: str, _shards: int = None, **kwargs):
+        from diskcache import Cache
+
+        self.path: str = _path
+        if _shards is None:
+            _shards = len([
+                d for d in os.listdir(_path) if d.startswith('shard_')
+            ]) if os.path.isdir(_path) else 0
+            _shards = _shards or CACHE_SHARDS
+        self.shards: typing.List['Cache'] = [
+            Cache(os.path.join(_path, _SHARD_DIR.format(i)), **kwargs)
+            for i in range(_shards)
+        ]
+
+    def _shard(self, _key: str) -> 'Cache':
+        name = splitKey(_key)[0].encode('utf-8')
+        return self.shards[zlib.crc32(name) % len(self.shards)]
+
+    def __getitem__(self, _key: str) -> typing.Any:
+        return self._shard(_key)[_key]
+
+    def __contains__(self, _key: str) -> bool:
+        return _key in self._shard(_key)
+
+    def __delitem__(self, _key: str):
+        del self._shard(_key)[_key]
+
+    def get(
+            self, _key: str, _default: typing.Any = None, tag: bool = False
+    ) -> typing.Any:
+        return self._shard(_key).get(_key, _default, tag=tag)
+
+    def set(self, _key: str, _value: typing.Any, tag: str = None):
+        return self._shard(_key).set(_key, _value, tag=tag)
+
+    @contextlib.contextmanager
+    def transact(self) -> typing.Iterator[None]:
+        # always in the same order, so two writers do not deadlock
+        with contextlib.ExitStack() as stack:
+            for shard in self.shards:
+                stack.enter_context(shard.transact())
+            yield
+
+    def iterkeys(self) -> typing.Iterator[str]:
+        for shard in self.shards:
+            yield from shard.iterkeys()
+
+    def volume(self) -> int:
+        return sum(shard.volume() for shard in self.shards)
+
+    def create_tag_index(self):
+        for shard in self.shards:
+            shard.create_tag_index()
+
+    def evict(self, _tag: str) -> int:
+        return sum(shard.evict(_tag) for shard in self.shards)
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
+
+
+class SnapshotCache:
+    """
+    diskcache opened read only by sqlite as immutable, so readers take
+    no lock and pages are mapped into memory. Many backtest processes
+    can share it. Create it by createSnapshot(), and never write it
+    while it is in use.
+
+    :param _path: directory of snapshot
+    """
+
+    readonly = True
+
+    def __init__(self, _path: str):
+        from diskcache import Disk
+
+        self.path: str = _path
+        db_path = os.path.abspath(os.path.join(_path, 'cache.db'))
+        if not os.path.isfile(db_path):
+            raise Exception('{} is not a cache'.format(_path))
+        self.uri: str = 'file:{}?immutable=1'.format(
+            urllib.parse.quote(db_path)
+        )
+        # converts keys and values as diskcache does
+        self.disk: 'Disk' = Disk(_path)
+
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.con_list: typing.List[sqlite3.Connection] = []
+
+    def _con(self) -> sqlite3.Connection:
+        # one connection for each thread, a forked process opens its own
+        con = getattr(self.local, 'con', None)
+        if con is None or self.local.pid != os.getpid():
+            con = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+            con.execute('PRAGMA mmap_size = {}'.format(SNAPSHOT_MMAP_SIZE))
+            self.local.con = con
+            self.local.pid = os.getpid()
+            with self.lock:
+                self.con_list.append(con)
+        return con
+
+    def get(
+            self, _key: str, _default: typing.Any = None, tag: bool = False
+    ) -> typing.Any:
+        db_key, raw = self.disk.put(_key)
+        row = self._con().execute(
+            'SELECT tag, mode, filename, value FROM Cache '
+            'WHERE key = ? AND raw = ? '
+            'AND (expire_time IS NULL OR expire_time > ?)',
+            (db_key, raw, time.time())
+        ).fetchone()
+        if row is None:
+            value, db_tag = _default, None
+        else:
+            db_tag, mode, filename, db_value = row
+            value = self.disk.fetch(mode, filename, db_value, False)
+        return (value, db_tag) if tag else value
+
+    def __getitem__(self, _key: str) -> typing.Any:
+        value = self.get(_key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(_key)
+        return value
+
+    def __contains__(self, _key: str) -> bool:
+        return self.get(_key, _MISSING) is not _MISSING
+
+    def __delitem__(self, _key: str):
+        raise Exception('snapshot cache is read only')
+
+    def set(self, _key: str, _value: typing.Any, tag: str = None):
+        raise Exception('snapshot cache is read only')
+
+    def evict(self, _tag: str) -> int:
+        raise Exception('snapshot cache is read only')
+
+    def create_tag_index(self):
+        pass
+
+    @contextlib.contextmanager
+    def transact(self) -> typing.Iterator[None]:
+        yield
+
+    def iterkeys(self) -> typing.Iterator[str]:
+        for db_key, raw in self._con().execute(
+                'SELECT key, raw FROM Cache ORDER BY rowid'
+        ).fetchall():
+            yield self.disk.get(db_key, raw)
+
+    def volume(self) -> int:
+        row = self._con().execute(
+            "SELECT value FROM Settings WHERE key = 'size'"
+        ).fetchone()
+        return os.path.getsize(
+            os.path.join(self.path, 'cache.db')
+        ) + (row[0] if row else 0)
+
+    def close(self):
+        with self.lock:
+            for con in self.con_list:
+                con.close()
+            self.con_list.clear()
+        self.local = threading.local()
+
+
+def openDisk(
+        _path: str
+) -> typing.Union['Cache', ShardedCache, SnapshotCache]:
+    """
+    open the disk store of cache by _path:
+
+        'cache'           diskcache in directory cache
+        'sharded:cache'   ShardedCache in directory cache
+        'snapshot:cache'  SnapshotCache in directory cache
+
+    diskcache never evicts by itself, see TieredCache
+
+    :param _path:
+    :return: the store
+    """
+    if _path.startswith(SNAPSHOT_PREFIX):
+        return SnapshotCache(_path[len(SNAPSHOT_PREFIX):])
+    if _path.startswith(SHARDED_PREFIX):
+        return ShardedCache(
+            _path[len(SHARDED_PREFIX):], eviction_policy='none'
+        )
+
+    from diskcache import Cache
+
+    return Cache(_path, eviction_policy='none')
+
+
+def createSnapshot(_src_path: str, _dst_path: str) -> int:
+    """
+    copy the cache at _src_path into a new snapshot at _dst_path,
+    open it by 'snapshot:' + _dst_path
+
+    :param _src_path: same as openDisk()
+    :param _dst_path: directory of snapshot, must not exist
+    :return: count of items copied
+    """
+    from diskcache import Cache
+
+    if os.path.exists(_dst_path):
+        raise Exception('{} already exists'.format(_dst_path))
+
+    src = openDisk(_src_path)
+    dst = Cache(_dst_path, eviction_policy='none')
+    count = 0
+    try:
+        for key in src.iterkeys():
+            value, tag = src.get(key, _MISSING, tag=True)
+            if value is _MISSING:
+                continue
+            dst.set(key, value, tag=tag)
+            count += 1
+    finally:
+        src.close()
+        dst.close()
+
+    # back to a single file, sqlite can not open wal database as
+    # immutable without its wal and shm files
+    con = sqlite3.connect(os.path.join(_dst_path, 'cache.db'))
+    try:
+        con.execute('PRAGMA journal_mode = DELETE')
+    finally:
+        con.close()
+    return count
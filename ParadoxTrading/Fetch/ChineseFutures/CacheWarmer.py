@@ -0,0 +1,104 @@
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from ParadoxTrading.Fetch import ConnectionPool
+from ParadoxTrading.Fetch.ChineseFutures.FetchBase import FetchBase, \
+    RegisterIndex, RegisterInstrument
+
+
+def warmCache(
+        _fetcher: FetchBase, _products: typing.Iterable[str],
+        _begin_day: str, _end_day: str,
+        _types: typing.Iterable[int] = (RegisterInstrument.DOMINANT,),
+        _workers: int = None, _columns: typing.Sequence[str] = None,
+        _callback: typing.Callable[[str, int, int], None] = None
+) -> typing.Dict[str, typing.Any]:
+    """
+    fetch data of symbols registered by products and types for every
+    tradingday from _begin_day to _end_day(excluded) into the cache of
+    _fetcher, so that backtests find it there. Days are fetched by a
+    pool of threads, each day by one fetchDataMany(). Symbols already
+    cached are skipped, so it continues where an interrupted run
+    stopped.
+
+    :param _fetcher: data of which fetcher
+    :param _products:
+    :param _begin_day:
+    :param _end_day:
+    :param _types: types of RegisterInstrument, ignored by index fetchers
+    :param _workers: threads, default ConnectionPool.PSQL_MAX_CONN
+    :param _columns: only fetch these columns, None for all
+    :param _callback: called with tradingday, days done and days to do
+        after each day is fetched
+    :return: report, missing is (tradingday, symbol) without data and
+        failed is (tradingday, error)
+    """
+    begin_time = time.perf_counter()
+    products = sorted(set(p.lower() for p in _products))
+    # the symbol of an index fetcher is the product itself
+    is_index = _fetcher.register_type is RegisterIndex
+    types = [None] if is_index else sorted(set(_types))
+    workers = ConnectionPool.PSQL_MAX_CONN if _workers is None else _workers
+
+    # metadata and symbols in bulk, workers only query market data
+    _fetcher.preloadMetadata(_begin_day, _end_day, products)
+    if not is_index:
+        _fetcher.buildSymbolTable(_begin_day, _end_day, products, types)
+
+    ret = {
+        'days': 0, 'symbols': 0, 'cached': 0, 'fetched': 0, 'rows': 0,
+        'missing': [], 'failed': [],
+    }
+    task_dict: typing.Dict[str, typing.List[str]] = {}
+    for day in _fetcher._day_list(_begin_day, _end_day):
+        if not _fetcher.isTradingDay(day):
+            continue
+        ret['days'] += 1
+        symbols = set()
+        for product in products:
+            for _type in types:
+                if is_index:
+                    symbol = _fetcher.fetchSymbol(day, product)
+                else:
+                    symbol = _fetcher.fetchSymbol(day, product, _type=_type)
+                if symbol is not None:
+                    symbols.add(symbol.lower())
+        ret['symbols'] += len(symbols)
+        pending = []
+        for symbol in sorted(symbols):
+            if _fetcher.isCached(day, symbol, _columns):
+                ret['cached'] += 1
+            else:
+                pending.append(symbol)
+        if pending:
+            task_dict[day] = pending
+
+    with ThreadPoolExecutor(max(workers, 1)) as executor:
+        future_dict = {
+            executor.submit(
+                _fetcher.fetchDataMany, day, symbols, _columns=_columns
+            ): day for day, symbols in task_dict.items()
+        }
+        for done, future in enumerate(as_completed(future_dict), 1):
+            day = future_dict[future]
+            try:
+                data_dict = future.result()
+            except Exception as e:
+                ret['failed'].append((day, repr(e)))
+            else:
+                for symbol, data in sorted(data_dict.items()):
+                    ret['fetched'] += 1
+                    if data is None:
+                        ret['missing'].append((day, symbol))
+                    else:
+                        ret['rows'] += len(data)
+            if _callback is not None:
+                _callback(day, done, len(task_dict))
+
+    ret['missing'].sort()
+    ret['failed'].sort()
+    ret['seconds'] = time.perf_counter() - begin_time
+    ret['rows_per_sec'] = ret['rows'] / ret['seconds']
+    ret['symbols_per_sec'] = ret['fetched'] / ret['seconds']
+    return ret
@@ -1,17 +1,40 @@
+import contextlib
+import io
+import itertools
 import json
+import operator
+import time
 import typing
-
-import psycopg2
-import psycopg2.extensions
-import pymongo
-import pymongo.collection
-import pymongo.database
-from diskcache import Cache
-from pymongo import MongoClient
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
 
 from ParadoxTrading.Fetch import FetchAbstract, RegisterAbstract
+from ParadoxTrading.Fetch.BinaryCopy import castColumns, copyQuery, \
+    decodeBinaryCopy
+from ParadoxTrading.Fetch import FetchStats
+from ParadoxTrading.Fetch.ConnectionPool import getMongoClient, \
+    psqlConnection
+from ParadoxTrading.Fetch.FetchStats import keyFamily, recordIO, timeIO
+from ParadoxTrading.Fetch.TieredCache import TieredCache, openCache
 from ParadoxTrading.Utils import DataStruct
 
+if typing.TYPE_CHECKING:
+    # psycopg2, pymongo and diskcache are imported when first used,
+    # so workers that never touch the database skip loading them
+    import psycopg2.extensions
+    import pymongo.collection
+    import pymongo.database
+    from pymongo import MongoClient
+
+
+# make names of server side cursors unique
+_cursor_count = itertools.count()
+# symbols resolved by buildSymbolTable(), map key of
+# FetchBase._symbol_table_key() to {tradingday: symbol}
+_symbol_table_dict: typing.Dict[
+    tuple, typing.Dict[str, typing.Union[None, str]]
+] = {}
+
 
 class RegisterInstrument(RegisterAbstract):
     DOMINANT = 1
@@ -125,67 +148,282 @@ class FetchBase(FetchAbstract):
         self.psql_user: str = _psql_user
         self.psql_password: str = _psql_password
 
-        self.cache: Cache = Cache(_cache_path)
+        # recently used items are kept in memory as well,
+        # market data is tagged by tradingday. _cache_path may open a
+        # sharded cache or a read only snapshot, see CacheStore.openDisk()
+        self.cache: TieredCache = openCache(_cache_path)
         self.market_key: str = None
         self.tradingday_key: str = 'ChineseFuturesTradingDay_{}'
         self.prod_key: str = 'ChineseFuturesProduct_{}_{}'
         self.inst_key: str = 'ChineseFuturesInstrument_{}_{}'
+        # marks a range of product whose metadata is preloaded
+        self.preload_key: str = 'ChineseFuturesPreload_{}_{}_{}'
 
-        self._mongo_client: MongoClient = None
-        self._mongo_prod: pymongo.database.Database = None
-        self._mongo_inst: pymongo.database.Database = None
-        self._mongo_tradingday: pymongo.database.Database = None
-        self._psql_con: psycopg2.extensions.connection = None
-        self._psql_cur: psycopg2.extensions.cursor = None
+        self._mongo_prod: 'pymongo.database.Database' = None
+        self._mongo_inst: 'pymongo.database.Database' = None
+        self._mongo_tradingday: 'pymongo.database.Database' = None
 
-        self.columns: typing.List = []
+        # map (db name, product or instrument) to its sorted tradingdays,
+        # loaded when first used
+        self.calendar_dict: typing.Dict[
+            typing.Tuple[str, str], typing.List[str]
+        ] = {}
 
-    def _get_mongo_prod(self) -> pymongo.database.Database:
-        if not self._mongo_prod:
-            if not self._mongo_client:
-                self._mongo_client: MongoClient = MongoClient(
-                    host=self.mongo_host
-                )
-            self._mongo_prod: pymongo.database.Database = \
-                self._mongo_client[self.mongo_prod_db]
+        self.columns: typing.List = []
+        # index column used by fetchData() when _index is not given
+        self.index: str = 'happentime'
+        # type of each column in self.columns, see BinaryCopy.COPY_TYPES.
+        # If set, data is loaded by binary COPY and decoded column by
+        # column, instead of creating datastruct row by row
+        self.column_types: typing.List[str] = None
+        self.use_copy: bool = True
+
+    def _get_mongo_client(self) -> 'MongoClient':
+        # shared by all fetchers using the same host
+        return getMongoClient(self.mongo_host)
+
+    def _get_mongo_prod(self) -> 'pymongo.database.Database':
+        if self._mongo_prod is None:
+            self._mongo_prod = self._get_mongo_client()[self.mongo_prod_db]
         return self._mongo_prod
 
-    def _get_mongo_inst(self) -> pymongo.database.Database:
-        if not self._mongo_inst:
-            if not self._mongo_client:
-                self._mongo_client: MongoClient = MongoClient(
-                    host=self.mongo_host
-                )
-            self._mongo_inst: pymongo.database.Database = \
-                self._mongo_client[self.mongo_inst_db]
+    def _get_mongo_inst(self) -> 'pymongo.database.Database':
+        if self._mongo_inst is None:
+            self._mongo_inst = self._get_mongo_client()[self.mongo_inst_db]
         return self._mongo_inst
 
-    def _get_mongo_tradingday(self) -> pymongo.database.Database:
-        if not self._mongo_tradingday:
-            if not self._mongo_client:
-                self._mongo_client: MongoClient = MongoClient(
-                    host=self.mongo_host
-                )
-            self._mongo_tradingday: pymongo.database.Database = \
-                self._mongo_client[self.mongo_tradingday_db]
+    def _get_mongo_tradingday(self) -> 'pymongo.database.Database':
+        if self._mongo_tradingday is None:
+            self._mongo_tradingday = \
+                self._get_mongo_client()[self.mongo_tradingday_db]
         return self._mongo_tradingday
 
-    def _get_psql_con_cur(self) -> typing.Tuple[
-        psycopg2.extensions.connection, psycopg2.extensions.cursor
-    ]:
-        if not self._psql_con:
-            self._psql_con: psycopg2.extensions.connection = \
-                psycopg2.connect(
-                    dbname=self.psql_dbname,
-                    host=self.psql_host,
-                    user=self.psql_user,
-                    password=self.psql_password,
+    @staticmethod
+    def _record_mongo(
+            _key: str, _operation: str, _seconds: float,
+            _coll: 'pymongo.collection.Collection', _query: dict,
+            _docs: typing.List[dict], _hit: bool = None
+    ):
+        size = 0
+        if FetchStats.IO_STATS:
+            import bson
+
+            size = sum(len(bson.encode(d)) for d in _docs)
+        recordIO(
+            keyFamily(_key), 'mongo', _operation, _seconds, _hit,
+            size, len(_docs), '{} {}'.format(_coll.full_name, _query)
+        )
+
+    def _find_one(
+            self, _key: str, _coll: 'pymongo.collection.Collection',
+            _query: dict
+    ) -> typing.Union[None, typing.Dict]:
+        """
+        find_one() recorded by FetchStats
+
+        :param _key: key template of the record, names its family
+        """
+        begin = time.perf_counter()
+        ret = _coll.find_one(_query)
+        self._record_mongo(
+            _key, 'find_one', time.perf_counter() - begin, _coll, _query,
+            [] if ret is None else [ret], ret is not None
+        )
+        return ret
+
+    def _find(
+            self, _key: str, _coll: 'pymongo.collection.Collection',
+            _query: dict, _projection: dict = None
+    ) -> typing.List[typing.Dict]:
+        """
+        find() recorded by FetchStats, all documents are read
+
+        :param _key: key template of the records, names their family
+        """
+        begin = time.perf_counter()
+        ret = list(_coll.find(_query, _projection))
+        self._record_mongo(
+            _key, 'find', time.perf_counter() - begin, _coll, _query, ret
+        )
+        return ret
+
+    @contextlib.contextmanager
+    def _psql_cursor(
+            self, _name: str = None, _itersize: int = None
+    ) -> typing.Iterator['psycopg2.extensions.cursor']:
+        """
+        borrow a connection from the shared pool of self.psql_dbname,
+        and give it back when the block exits
+
+        :param _name: set to create a named (server side) cursor
+        :param _itersize: rows fetched each time when iterating
+            a named cursor
+        """
+        with psqlConnection(
+                self.psql_dbname, self.psql_host,
+                self.psql_user, self.psql_password
+        ) as con:
+            with con.cursor(name=_name) as cur:
+                if _itersize is not None:
+                    cur.itersize = _itersize
+                yield cur
+
+    def _select_columns(
+            self, _columns: typing.Union[None, typing.Iterable[str]],
+            _index: str
+    ) -> typing.List[str]:
+        """
+        columns to query, in the order of self.columns, index and
+        tradingday are always kept
+
+        :param _columns: columns wanted, None for all
+        :param _index: index column, lower case
+        """
+        if _columns is None:
+            return self.columns
+        wanted = set(c.lower() for c in _columns)
+        unknown = wanted - set(self.columns)
+        if unknown:
+            raise Exception('unknown columns {}'.format(sorted(unknown)))
+        wanted.update((_index, 'tradingday'))
+        return [c for c in self.columns if c in wanted]
+
+    @staticmethod
+    def _day_condition(_begin_day: str, _end_day: str = None) -> str:
+        """
+        condition of tradingday _begin_day, or from _begin_day to
+        _end_day(excluded). Tables partitioned by month of tradingday,
+        see StoreIntraDayData, are pruned by the planner only when the
+        bare column is compared with constants, so keep it this way
+
+        :param _begin_day:
+        :param _end_day: None for one day
+        :return: sql
+        """
+        if _end_day is None:
+            return "tradingday = '{}'".format(_begin_day)
+        return "tradingday >= '{}' AND tradingday < '{}'".format(
+            _begin_day, _end_day
+        )
+
+    def _market_key(
+            self, _symbol: str, _tradingday: str,
+            _columns: typing.List[str]
+    ) -> str:
+        key = self.market_key.format(_symbol, _tradingday)
+        if _columns != self.columns:
+            # projected data is cached apart from the whole one
+            key += '_' + ','.join(_columns)
+        return key
+
+    def _query(
+            self, _select: str, _types: typing.Sequence[str] = None
+    ) -> typing.List[typing.Sequence]:
+        """
+        run _select, by binary COPY if _types is given
+
+        :param _select: select statement
+        :param _types: type of each column, see BinaryCopy.COPY_TYPES
+        :return: columns if _types is given, else rows
+        """
+        family = keyFamily(self.market_key)
+        if _types is not None:
+            buf = io.BytesIO()
+            with timeIO(family, 'psql', 'copy', _select) as info:
+                with self._psql_cursor() as cur:
+                    cur.copy_expert(copyQuery(_select), buf)
+                info['bytes'] = buf.tell()
+            with timeIO(family, 'psql', 'decode') as info:
+                columns = decodeBinaryCopy(buf.getvalue(), _types)
+                info['rows'] = len(columns[0])
+            return columns
+        with timeIO(family, 'psql', 'execute', _select) as info:
+            with self._psql_cursor() as cur:
+                cur.execute(_select)
+                rows = list(cur.fetchall())
+            info['rows'] = len(rows)
+        return rows
+
+    def _query_data(
+            self, _select: str, _columns: typing.List[str],
+            _types: typing.Sequence[str], _index: str
+    ) -> DataStruct:
+        """
+        datastruct of _select, whose rows are sorted by _index
+
+        :param _types: type of each column to use binary COPY, or None
+        """
+        ret = self._query(_select, _types)
+        if _types is None:
+            return DataStruct(_columns, _index, ret)
+        data = DataStruct(_columns, _index)
+        data.data = dict(zip(_columns, ret))
+        return data
+
+    def _load_data(
+            self, _symbols: typing.Sequence[str], _where: str, _index: str,
+            _columns: typing.List[str]
+    ) -> typing.Dict[str, DataStruct]:
+        """
+        query rows sorted by index, by binary COPY if column types are
+        known. Several symbols are queried at once by UNION ALL, and rows
+        are sorted by server so columns are set directly
+
+        :param _symbols: tables, lower case
+        :param _where: condition
+        :param _index: index column, lower case
+        :param _columns: columns to select
+        :return: map symbol to data, empty if no rows
+        """
+        use_copy = self.use_copy and self.column_types is not None
+        if use_copy:
+            types = [
+                self.column_types[self.columns.index(c)] for c in _columns
+            ]
+            fields = castColumns(_columns, types)
+        else:
+            types = None
+            fields = ', '.join(_columns)
+
+        if len(_symbols) == 1:
+            return {_symbols[0]: self._query_data(
+                'SELECT {} FROM {} WHERE {} ORDER BY {}'.format(
+                    fields, _symbols[0], _where, _index
+                ), _columns, types, _index
+            )}
+
+        # tag rows with position of their symbol, a fixed width tag
+        # keeps the fast path of decodeBinaryCopy
+        select = ' UNION ALL '.join(
+            "(SELECT {0}::int4 AS symbol_id, {1} FROM {2} "
+            "WHERE {3})".format(i, fields, symbol, _where)
+            for i, symbol in enumerate(_symbols)
+        ) + ' ORDER BY symbol_id, {}'.format(_index)
+
+        ret = {}
+        if use_copy:
+            columns = self._query(select, ['int4'] + types)
+            begin = 0
+            for symbol_id, rows in itertools.groupby(columns[0]):
+                end = begin + sum(1 for _ in rows)
+                data = DataStruct(_columns, _index)
+                data.data = {
+                    k: v[begin:end] for k, v in zip(_columns, columns[1:])
+                }
+                ret[_symbols[symbol_id]] = data
+                begin = end
+        else:
+            for symbol_id, group in itertools.groupby(
+                    self._query(select), operator.itemgetter(0)
+            ):
+                ret[_symbols[symbol_id]] = DataStruct(
+                    _columns, _index, [r[1:] for r in group]
                 )
-        if not self._psql_cur:
-            self._psql_cur: psycopg2.extensions.cursor = \
-                self._psql_con.cursor()
 
-        return self._psql_con, self._psql_cur
+        for symbol in _symbols:
+            if symbol not in ret:
+                ret[symbol] = DataStruct(_columns, _index)
+        return ret
 
     def isTradingDay(self, _tradingday: str) -> bool:
         """
@@ -219,50 +457,96 @@ class FetchBase(FetchAbstract):
             _product, _tradingday
         ) is not None
 
+    def _calendar(
+            self, _db_name: str, _name: str
+    ) -> typing.List[str]:
+        """
+        sorted tradingdays of a product or instrument collection
+
+        :param _db_name: self.mongo_prod_db or self.mongo_inst_db
+        :param _name: product or instrument, lower case
+        """
+        key = (_db_name, _name)
+        try:
+            return self.calendar_dict[key]
+        except KeyError:
+            pass
+        if _db_name == self.mongo_prod_db:
+            db = self._get_mongo_prod()
+        else:
+            db = self._get_mongo_inst()
+        ret = sorted(d['TradingDay'] for d in self._find(
+            self.prod_key if _db_name == self.mongo_prod_db
+            else self.inst_key,
+            db[_name], {}, {'TradingDay': 1, '_id': 0}
+        ))
+        self.calendar_dict[key] = ret
+        return ret
+
+    def invalidateCalendar(self, _name: str = None):
+        """
+        forget loaded tradingdays, call it after new days are stored
+        into mongo, such as the daily update of online trading
+
+        :param _name: product or instrument, None for all
+        """
+        if _name is None:
+            self.calendar_dict.clear()
+            return
+        name = _name.lower()
+        for key in [k for k in self.calendar_dict if k[1] == name]:
+            del self.calendar_dict[key]
+
+    @staticmethod
+    def _first_day(_days: typing.List[str]) -> typing.Union[None, str]:
+        return _days[0] if _days else None
+
+    @staticmethod
+    def _last_day(
+            _days: typing.List[str], _tradingday: str
+    ) -> typing.Union[None, str]:
+        i = bisect_left(_days, _tradingday)
+        return _days[i - 1] if i > 0 else None
+
+    @staticmethod
+    def _next_day(
+            _days: typing.List[str], _tradingday: str
+    ) -> typing.Union[None, str]:
+        i = bisect_right(_days, _tradingday)
+        return _days[i] if i < len(_days) else None
+
     def productFirstTradingDay(
             self, _product: str,
     ) -> typing.Union[None, str]:
         """
         get the first tradingday of this product
         """
-        db = self._get_mongo_prod()
-        coll = db[_product.lower()]
-        d = coll.find_one(
-            sort=[('TradingDay', pymongo.ASCENDING)]
+        return self._first_day(
+            self._calendar(self.mongo_prod_db, _product.lower())
         )
 
-        return d['TradingDay'] if d is not None else None
-
     def productLastTradingDay(
             self, _product: str, _tradingday: str
     ) -> typing.Union[None, str]:
         """
         get the first day less then _tradingday of _product
         """
-        db = self._get_mongo_prod()
-        coll = db[_product.lower()]
-        d = coll.find_one(
-            {'TradingDay': {'$lt': _tradingday}},
-            sort=[('TradingDay', pymongo.DESCENDING)]
+        return self._last_day(
+            self._calendar(self.mongo_prod_db, _product.lower()),
+            _tradingday
         )
 
-        return d['TradingDay'] if d is not None else None
-
     def productNextTradingDay(
             self, _product: str, _tradingday: str
     ) -> typing.Union[None, str]:
         """
         get the first day greater then _tradingday of _product
         """
-        db = self._get_mongo_prod()
-        coll = db[_product.lower()]
-        d = coll.find_one(
-            {'TradingDay': {'$gt': _tradingday}},
-            sort=[('TradingDay', pymongo.ASCENDING)]
+        return self._next_day(
+            self._calendar(self.mongo_prod_db, _product.lower()),
+            _tradingday
         )
 
-        return d['TradingDay'] if d is not None else None
-
     def fetchDominant(
             self, _product: str, _tradingday: str
     ) -> typing.Union[None, str]:
@@ -325,44 +609,32 @@ class FetchBase(FetchAbstract):
         """
         get the first tradingday of this instrument
         """
-        db = self._get_mongo_inst()
-        coll = db[_instrument.lower()]
-        d = coll.find_one(
-            sort=[('TradingDay', pymongo.ASCENDING)]
+        return self._first_day(
+            self._calendar(self.mongo_inst_db, _instrument.lower())
         )
 
-        return d['TradingDay'] if d is not None else None
-
     def instrumentLastTradingDay(
             self, _instrument: str, _tradingday: str
     ) -> typing.Union[None, str]:
         """
         get the first day less then _tradingday of _instrument
         """
-        db = self._get_mongo_inst()
-        coll = db[_instrument.lower()]
-        d = coll.find_one(
-            {'TradingDay': {'$lt': _tradingday}},
-            sort=[('TradingDay', pymongo.DESCENDING)]
+        return self._last_day(
+            self._calendar(self.mongo_inst_db, _instrument.lower()),
+            _tradingday
         )
 
-        return d['TradingDay'] if d is not None else None
-
     def instrumentNextTradingDay(
             self, _instrument: str, _tradingday: str
     ) -> typing.Union[None, str]:
         """
         get the first day greater then _tradingday of _instrument
         """
-        db = self._get_mongo_inst()
-        coll = db[_instrument.lower()]
-        d = coll.find_one(
-            {'TradingDay': {'$gt': _tradingday}},
-            sort=[('TradingDay', pymongo.ASCENDING)]
+        return self._next_day(
+            self._calendar(self.mongo_inst_db, _instrument.lower()),
+            _tradingday
         )
 
-        return d['TradingDay'] if d is not None else None
-
     def fetchTradingDayInfo(
             self, _tradingday: str
     ) -> typing.Union[None, typing.Dict]:
@@ -374,8 +646,10 @@ class FetchBase(FetchAbstract):
             return self.cache[key]
         except KeyError:
             db = self._get_mongo_tradingday()
-            coll = db.TradingDay
-            data = coll.find_one({'TradingDay': _tradingday})
+            data = self._find_one(
+                self.tradingday_key, db.TradingDay,
+                {'TradingDay': _tradingday}
+            )
             self.cache[key] = data
             return data
 
@@ -391,8 +665,9 @@ class FetchBase(FetchAbstract):
             return self.cache[key]
         except KeyError:
             db = self._get_mongo_prod()
-            coll = db[product]
-            data = coll.find_one({'TradingDay': _tradingday})
+            data = self._find_one(
+                self.prod_key, db[product], {'TradingDay': _tradingday}
+            )
             self.cache[key] = data
             return data
 
@@ -408,11 +683,92 @@ class FetchBase(FetchAbstract):
             return self.cache[key]
         except KeyError:
             db = self._get_mongo_inst()
-            coll = db[instrument]
-            data = coll.find_one({'TradingDay': _tradingday})
+            data = self._find_one(
+                self.inst_key, db[instrument], {'TradingDay': _tradingday}
+            )
             self.cache[key] = data
             return data
 
+    @staticmethod
+    def _day_list(_begin_day: str, _end_day: str) -> typing.List[str]:
+        """
+        every date from _begin_day to _end_day(excluded)
+        """
+        ret = []
+        cur = datetime.strptime(_begin_day, '%Y%m%d')
+        end = datetime.strptime(_end_day, '%Y%m%d')
+        while cur < end:
+            ret.append(cur.strftime('%Y%m%d'))
+            cur += timedelta(days=1)
+        return ret
+
+    def preloadMetadata(
+            self, _begin_day: str, _end_day: str,
+            _products: typing.Iterable[str] = None
+    ):
+        """
+        read tradingday, product and instrument records from _begin_day
+        to _end_day(excluded) with one range query for each collection,
+        and store them into cache, so that fetch***Info() does not query
+        mongo one day by one day. Days without tradingday or product
+        record are cached as None. Ranges already preloaded are skipped.
+
+        :param _begin_day:
+        :param _end_day:
+        :param _products: products to load, None for all products
+            traded in the range
+        """
+        query = {'TradingDay': {'$gte': _begin_day, '$lt': _end_day}}
+        day_list = self._day_list(_begin_day, _end_day)
+
+        key = self.preload_key.format('', _begin_day, _end_day)
+        if key not in self.cache:
+            found = {
+                d['TradingDay']: d for d in self._find(
+                    self.tradingday_key,
+                    self._get_mongo_tradingday().TradingDay, query
+                )
+            }
+            with self.cache.transact():
+                for day in day_list:
+                    self.cache[self.tradingday_key.format(day)] = \
+                        found.get(day)
+            self.cache[key] = sorted(set(itertools.chain.from_iterable(
+                d['ProductList'] for d in found.values()
+            )))
+        if _products is None:
+            # all products traded in range
+            _products = self.cache[key]
+
+        for product in sorted(set(p.lower() for p in _products)):
+            key = self.preload_key.format(product, _begin_day, _end_day)
+            if key in self.cache:
+                continue
+
+            found = {
+                d['TradingDay']: d for d in self._find(
+                    self.prod_key, self._get_mongo_prod()[product], query
+                )
+            }
+            with self.cache.transact():
+                for day in day_list:
+                    self.cache[self.prod_key.format(product, day)] = \
+                        found.get(day)
+
+            # instruments are only cached for days they are traded
+            db = self._get_mongo_inst()
+            for instrument in sorted(set(itertools.chain.from_iterable(
+                    d['InstrumentList'] for d in found.values()
+            ))):
+                instrument = instrument.lower()
+                docs = self._find(self.inst_key, db[instrument], query)
+                with self.cache.transact():
+                    for d in docs:
+                        self.cache[self.inst_key.format(
+                            instrument, d['TradingDay']
+                        )] = d
+            self.cache[key] = True
+
     def _get_sorted_list(
             self, _product: str, _tradingday: str, _key: str
     ):
@@ -421,13 +777,61 @@ class FetchBase(FetchAbstract):
         )
         if not instrument_list:
             return None
+        # one query for all instruments
+        data_dict = self.fetchDataMany(
+            _tradingday, instrument_list, _columns=[_key]
+        )
         tmp = [(
-            k, self.fetchData(_tradingday, k)[_key][0]
+            k, data_dict[k.lower()][_key][0]
         ) for k in instrument_list]
         tmp.sort(key=lambda x: x[1])
 
         return tmp
 
+    def _symbol_table_key(self, _product: str, _type: int) -> tuple:
+        if _type in (
+                RegisterInstrument.DOMINANT,
+                RegisterInstrument.SUB_DOMINANT,
+                RegisterInstrument.BEFORE_DOMINANT,
+                RegisterInstrument.AFTER_DOMINANT,
+        ):
+            # only depends on metadata, share it with all fetchers
+            return self.mongo_host, None, _product, _type
+        # ranked by market data, depends on which data is fetched
+        return self.mongo_host, self.market_key, _product, _type
+
+    def buildSymbolTable(
+            self, _begin_day: str, _end_day: str,
+            _products: typing.Iterable[str],
+            _types: typing.Iterable[int] = (
+                    RegisterInstrument.DOMINANT,
+                    RegisterInstrument.SUB_DOMINANT,
+            )
+    ):
+        """
+        resolve symbols of each product and type for every day from
+        _begin_day to _end_day(excluded) in one pass, then fetchSymbol()
+        answers them from table. Tables of types decided by metadata are
+        shared by all fetchers of the same mongo host, so market supply,
+        portfolio and execution only resolve each day once.
+
+        :param _begin_day:
+        :param _end_day:
+        :param _products:
+        :param _types: types of RegisterInstrument
+        """
+        day_list = self._day_list(_begin_day, _end_day)
+        for product in sorted(set(p.lower() for p in _products)):
+            for _type in sorted(set(_types)):
+                table = _symbol_table_dict.setdefault(
+                    self._symbol_table_key(product, _type), {}
+                )
+                for day in day_list:
+                    if day not in table:
+                        table[day] = self._resolve_symbol(
+                            day, product, _type
+                        )
+
     def fetchSymbol(
             self, _tradingday: str, _product: str = None,
             _type: int = RegisterInstrument.DOMINANT,
@@ -444,7 +848,17 @@ class FetchBase(FetchAbstract):
         assert _product is not None
 
         product = _product.lower()
+        try:
+            return _symbol_table_dict[
+                self._symbol_table_key(product, _type)
+            ][_tradingday]
+        except KeyError:
+            return self._resolve_symbol(_tradingday, product, _type)
 
+    def _resolve_symbol(
+            self, _tradingday: str, _product: str, _type: int
+    ) -> typing.Union[None, str]:
+        product = _product
         if _type == RegisterInstrument.DOMINANT:
             return self.fetchDominant(product, _tradingday)
         elif _type == RegisterInstrument.SUB_DOMINANT:
@@ -500,7 +914,8 @@ class FetchBase(FetchAbstract):
 
     def fetchData(
             self, _tradingday: str, _symbol: str,
-            _cache=True, _index='HappenTime'
+            _cache=True, _index='HappenTime',
+            _columns: typing.Sequence[str] = None
     ) -> typing.Union[None, DataStruct]:
         """
 
@@ -508,40 +923,105 @@ class FetchBase(FetchAbstract):
         :param _symbol:
         :param _cache: whether to cache by hdf5
         :param _index: use which column to index
+        :param _columns: only fetch these columns, None for all
         :return:
         """
         assert isinstance(_symbol, str)
         symbol = _symbol.lower()
+        index = _index.lower()
+        columns = self._select_columns(_columns, index)
 
-        key = self.market_key.format(symbol, _tradingday)
+        key = self._market_key(symbol, _tradingday, columns)
         if _cache:
             try:
                 return self.cache[key]
             except KeyError:
                 pass
 
-        # fetch from database
-        con, cur = self._get_psql_con_cur()
-
-        # get all ticks
-        cur.execute(
-            "SELECT * FROM {} WHERE TradingDay='{}' "
-            "ORDER BY {}".format(
-                symbol, _tradingday, _index.lower())
-        )
-        data = list(cur.fetchall())
-        if len(data):
-            data = DataStruct(self.columns, _index.lower(), data)
-        else:
+        # fetch from database, get all ticks
+        data = self._load_data(
+            [symbol], self._day_condition(_tradingday), index, columns
+        )[symbol]
+        if not len(data):
             data = None
 
         if _cache:
-            self.cache[key] = data
+            self.cache.set(key, data, _tag=_tradingday)
         return data
 
+    def isCached(
+            self, _tradingday: str, _symbol: str,
+            _columns: typing.Sequence[str] = None
+    ) -> bool:
+        """
+        whether fetchData() of this symbol and day is answered by cache,
+        data known to be empty is cached too
+
+        :param _tradingday:
+        :param _symbol:
+        :param _columns: only fetch these columns, None for all
+        :return:
+        """
+        return self._market_key(
+            _symbol.lower(), _tradingday,
+            self._select_columns(_columns, self.index)
+        ) in self.cache
+
+    def fetchDataMany(
+            self, _tradingday: str, _symbols: typing.Iterable[str],
+            _cache=True, _index='HappenTime',
+            _columns: typing.Sequence[str] = None
+    ) -> typing.Dict[str, typing.Union[None, DataStruct]]:
+        """
+        like fetchData, but symbols not in cache are fetched by one
+        query, and each one is cached as fetchData does
+
+        :param _tradingday:
+        :param _symbols:
+        :param _cache: whether to use cache
+        :param _index: use which column to index
+        :param _columns: only fetch these columns, None for all
+        :return: map symbol(lower case) to data or None
+        """
+        index = _index.lower()
+        columns = self._select_columns(_columns, index)
+
+        ret: typing.Dict[str, typing.Union[None, DataStruct]] = {}
+        missing = []
+        for symbol in _symbols:
+            assert isinstance(symbol, str)
+            symbol = symbol.lower()
+            if symbol in ret or symbol in missing:
+                continue
+            if _cache:
+                try:
+                    ret[symbol] = self.cache[
+                        self._market_key(symbol, _tradingday, columns)
+                    ]
+                    continue
+                except KeyError:
+                    pass
+            missing.append(symbol)
+
+        if missing:
+            for symbol, data in self._load_data(
+                    missing, self._day_condition(_tradingday),
+                    index, columns
+            ).items():
+                if not len(data):
+                    data = None
+                if _cache:
+                    self.cache.set(
+                        self._market_key(symbol, _tradingday, columns),
+                        data, _tag=_tradingday
+                    )
+                ret[symbol] = data
+        return ret
+
     def fetchDayData(
             self, _begin_day: str, _end_day: str,
-            _symbol: str, _index: str = 'HappenTime'
+            _symbol: str, _index: str = 'HappenTime',
+            _columns: typing.Sequence[str] = None
     ) -> DataStruct:
         """
         get the data from _begin_day to _end_day(excluded)
@@ -550,15 +1030,63 @@ class FetchBase(FetchAbstract):
         end_day = _end_day
         if _end_day is None:
             end_day = begin_day
+        index = _index.lower()
 
-        con, cur = self._get_psql_con_cur()
+        symbol = _symbol.lower()
+        return self._load_data(
+            [symbol], self._day_condition(begin_day, end_day),
+            index, self._select_columns(_columns, index)
+        )[symbol]
+
+    def iterDayData(
+            self, _begin_day: str, _end_day: typing.Union[None, str],
+            _symbol: str, _index: str = 'HappenTime',
+            _chunk_size: int = None, _itersize: int = 10000,
+            _columns: typing.Sequence[str] = None
+    ) -> typing.Iterator[DataStruct]:
+        """
+        like fetchDayData, but rows are read by a server side cursor
+        and yielded piece by piece, so a long range only keeps a bounded
+        number of rows in memory. Stop iterating early is fine, the
+        connection is given back to pool when generator is closed.
 
-        query = "SELECT * FROM {} " \
-                "WHERE tradingday >= '{}' AND tradingday < '{}' " \
-                "ORDER BY {}".format(
-            _symbol.lower(), begin_day, end_day, _index.lower()
-        )
-        cur.execute(query)
-        data = list(cur.fetchall())
+        :param _begin_day: the begin day, included
+        :param _end_day: the end day, excluded, None for only _begin_day
+        :param _symbol:
+        :param _index: use which column to index
+        :param _chunk_size: rows of each datastruct, None to yield
+            one datastruct for each tradingday
+        :param _itersize: rows transferred from server each time
+        :param _columns: only fetch these columns, None for all
+        :return: generator of datastruct
+        """
+        index = _index.lower()
+        columns = self._select_columns(_columns, index)
 
-        return DataStruct(self.columns, _index.lower(), data)
+        query = "SELECT {} FROM {} WHERE {} ORDER BY {}".format(
+            ', '.join(columns), _symbol.lower(),
+            self._day_condition(_begin_day, _end_day), index
+        )
+        with self._psql_cursor(
+                'iter_{}_{}'.format(_symbol.lower(), next(_cursor_count)),
+                _itersize
+        ) as cur:
+            # rows are read while iterating, only the query is timed
+            with timeIO(
+                    keyFamily(self.market_key), 'psql', 'execute', query
+            ):
+                cur.execute(query)
+            if _chunk_size is None:
+                # ordered by index, so rows of one tradingday are together
+                for _, rows in itertools.groupby(
+                        cur, operator.itemgetter(
+                            columns.index('tradingday')
+                        )
+                ):
+                    yield DataStruct(columns, index, list(rows))
+            else:
+                while True:
+                    rows = cur.fetchmany(_chunk_size)
+                    if not rows:
+                        break
+                    yield DataStruct(columns, index, rows)
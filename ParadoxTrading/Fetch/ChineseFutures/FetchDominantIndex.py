@@ -21,6 +21,11 @@ class FetchDominantIndex(FetchInstrumentDayData):
             'openprice', 'highprice', 'lowprice', 'closeprice',
             'volume', 'openinterest'
         ]
+        self.column_types = [
+            'text',
+            'float8', 'float8', 'float8', 'float8',
+            'int4', 'float8'
+        ]
 
     def fetchSymbol(
             self, _tradingday: str, _product: str = None, **kwargs
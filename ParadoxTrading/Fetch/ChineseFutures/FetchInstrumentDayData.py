@@ -15,6 +15,7 @@ class FetchInstrumentDayData(FetchBase):
 
         self.psql_dbname: str = 'ChineseFuturesInstrumentDayData'
         self.market_key: str = 'ChineseFuturesInstrumentDayData_{}_{}'
+        self.index: str = 'tradingday'
         self.columns = [
             'tradingday',
             'openprice', 'highprice', 'lowprice', 'closeprice',
@@ -23,19 +24,49 @@ class FetchInstrumentDayData(FetchBase):
             'volume', 'openinterest', 'openinterestdiff',
             'presettlementprice',
         ]
+        self.column_types = [
+            'text',
+            'float8', 'float8', 'float8', 'float8',
+            'float8',
+            'float8', 'float8',
+            'int4', 'float8', 'float8',
+            'float8',
+        ]
 
     def fetchData(
             self, _tradingday: str, _symbol: str,
-            _cache=True, _index='TradingDay'
+            _cache=True, _index='TradingDay',
+            _columns: typing.Sequence[str] = None
     ) -> typing.Union[None, DataStruct]:
         return super().fetchData(
-            _tradingday, _symbol, _cache, _index
+            _tradingday, _symbol, _cache, _index, _columns
+        )
+
+    def fetchDataMany(
+            self, _tradingday: str, _symbols: typing.Iterable[str],
+            _cache=True, _index='TradingDay',
+            _columns: typing.Sequence[str] = None
+    ) -> typing.Dict[str, typing.Union[None, DataStruct]]:
+        return super().fetchDataMany(
+            _tradingday, _symbols, _cache, _index, _columns
         )
 
     def fetchDayData(
             self, _begin_day: str, _end_day: str = None,
-            _symbol: str = None, _index: str = 'TradingDay'
+            _symbol: str = None, _index: str = 'TradingDay',
+            _columns: typing.Sequence[str] = None
     ) -> DataStruct:
         return super().fetchDayData(
-            _begin_day, _end_day, _symbol, _index
+            _begin_day, _end_day, _symbol, _index, _columns
+        )
+
+    def iterDayData(
+            self, _begin_day: str, _end_day: typing.Union[None, str],
+            _symbol: str, _index: str = 'TradingDay',
+            _chunk_size: int = None, _itersize: int = 10000,
+            _columns: typing.Sequence[str] = None
+    ) -> typing.Iterator[DataStruct]:
+        return super().iterDayData(
+            _begin_day, _end_day, _symbol, _index,
+            _chunk_size, _itersize, _columns
         )
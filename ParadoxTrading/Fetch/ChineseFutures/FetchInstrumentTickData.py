@@ -1,8 +1,54 @@
 import typing
+from datetime import timedelta
 
 from ParadoxTrading.Fetch.ChineseFutures.FetchBase import FetchBase
 from ParadoxTrading.Utils import DataStruct
 
+# bars have the columns of FetchInstrumentMinData
+BAR_COLUMNS = [
+    'tradingday',
+    'openprice', 'highprice', 'lowprice', 'closeprice',
+    'volume', 'turnover', 'openinterest',
+    'bartime', 'barendtime'
+]
+BAR_TYPES = [
+    'text',
+    'float8', 'float8', 'float8', 'float8',
+    'int8', 'float8', 'float8',
+    'timestamp', 'timestamp',
+]
+
+# {0} is table, {1} tradingday and {2} seconds of period. Ticks are
+# grouped by seconds since midnight floored to period, volume and
+# turnover of ticks accumulate through the day, so those of a bar are
+# the difference of the last tick to the one of previous bar
+_BAR_QUERY = (
+    "SELECT tradingday::text, "
+    "openprice::float8, highprice::float8, "
+    "lowprice::float8, closeprice::float8, "
+    "(last_volume - lag(last_volume, 1, 0::int8) "
+    "OVER (ORDER BY bartime))::int8, "
+    "(last_turnover - lag(last_turnover, 1, 0::float8) "
+    "OVER (ORDER BY bartime))::float8, "
+    "openinterest::float8, bartime::timestamp, "
+    "(bartime + interval '{2} second')::timestamp AS barendtime "
+    "FROM (SELECT max(tradingday) AS tradingday, "
+    "(array_agg(lastprice ORDER BY happentime))[1] AS openprice, "
+    "max(lastprice) AS highprice, min(lastprice) AS lowprice, "
+    "(array_agg(lastprice ORDER BY happentime DESC))[1] AS closeprice, "
+    "(array_agg(volume ORDER BY happentime DESC))[1]::int8 "
+    "AS last_volume, "
+    "(array_agg(turnover ORDER BY happentime DESC))[1]::float8 "
+    "AS last_turnover, "
+    "(array_agg(openinterest ORDER BY happentime DESC))[1] "
+    "AS openinterest, "
+    "date_trunc('day', happentime) + floor(extract(epoch FROM "
+    "happentime - date_trunc('day', happentime)) / {2})::float8 "
+    "* interval '{2} second' AS bartime "
+    "FROM {0} WHERE TradingDay='{1}' GROUP BY bartime) AS bars "
+    "ORDER BY barendtime"
+)
+
 
 class FetchInstrumentTickData(FetchBase):
     def __init__(
@@ -23,3 +69,56 @@ class FetchInstrumentTickData(FetchBase):
             'askprice', 'askvolume', 'bidprice', 'bidvolume',
             'happentime',
         ]
+        self.column_types = [
+            'text',
+            'float8', 'float8', 'float8',
+            'int8', 'float8', 'float8',
+            'float8', 'float8',
+            'float8', 'int8', 'float8', 'int8',
+            'timestamp',
+        ]
+        # {2} is seconds of period
+        self.bar_key: str = 'ChineseFuturesInstrumentTickBar_{}_{}_{}'
+
+    def fetchBars(
+            self, _tradingday: str, _symbol: str, _period: timedelta,
+            _cache=True
+    ) -> typing.Union[None, DataStruct]:
+        """
+        bars of _period aggregated from ticks by postgresql, only bars
+        are transferred. A bar begins at a multiple of _period since
+        midnight, the same as SplitIntoSecond and SplitIntoMinute if
+        _period divides a minute or an hour. Columns are the same as
+        FetchInstrumentMinData, and volume and turnover are the amount
+        traded in each bar.
+
+        :param _tradingday:
+        :param _symbol:
+        :param _period: length of bar, whole seconds
+        :param _cache: whether to use cache, bars of each period are
+            cached apart
+        :return: bars indexed by barendtime, None if no tick
+        """
+        seconds = _period.total_seconds()
+        assert seconds >= 1 and seconds == int(seconds)
+        seconds = int(seconds)
+        symbol = _symbol.lower()
+
+        key = self.bar_key.format(symbol, _tradingday, seconds)
+        if _cache:
+            try:
+                return self.cache[key]
+            except KeyError:
+                pass
+
+        data = self._query_data(
+            _BAR_QUERY.format(symbol, _tradingday, seconds),
+            BAR_COLUMNS, BAR_TYPES if self.use_copy else None,
+            'barendtime'
+        )
+        if not len(data):
+            data = None
+
+        if _cache:
+            self.cache.set(key, data, _tag=_tradingday)
+        return data
@@ -4,3 +4,4 @@ from .FetchInstrumentDayData import FetchInstrumentDayData
 from .FetchInstrumentTickData import FetchInstrumentTickData
 from .FetchInstrumentMinData import FetchInstrumentMinData
 from .FetchProductIndex import FetchProductIndex
+from .CacheWarmer import warmCache
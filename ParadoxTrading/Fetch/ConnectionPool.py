@@ -0,0 +1,151 @@
+import contextlib
+import os
+import threading
+import typing
+
+if typing.TYPE_CHECKING:
+    import psycopg2.extensions
+    import psycopg2.pool
+    from pymongo import MongoClient
+
+# connections kept by each postgresql pool, change them before first use
+PSQL_MIN_CONN = 1
+PSQL_MAX_CONN = 8
+
+_lock = threading.Lock()
+# pools belong to the process which created them, a forked child must
+# not reuse the sockets of its parent
+_pid: int = os.getpid()
+_mongo_client_dict: typing.Dict[str, 'MongoClient'] = {}
+_psql_pool_dict: typing.Dict[tuple, 'PsqlPool'] = {}
+
+
+class PsqlPool:
+    """
+    ThreadedConnectionPool raises when all connections are in use,
+    this one waits until a connection is returned instead
+
+    :param _maxconn: max connections opened at the same time
+    :param kwargs: args of psycopg2.connect
+    """
+
+    def __init__(self, _minconn: int, _maxconn: int, **kwargs):
+        import psycopg2.pool
+
+        self.pool = psycopg2.pool.ThreadedConnectionPool(
+            _minconn, _maxconn, **kwargs
+        )
+        self.semaphore = threading.BoundedSemaphore(_maxconn)
+
+    @contextlib.contextmanager
+    def connection(self) -> typing.Iterator[
+        'psycopg2.extensions.connection'
+    ]:
+        """
+        borrow one connection, it is returned when the block exits,
+        and the transaction left open by queries is rolled back
+        """
+        import psycopg2
+
+        self.semaphore.acquire()
+        try:
+            con = self.pool.getconn()
+            broken = False
+            try:
+                yield con
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                broken = True
+                raise
+            finally:
+                self.pool.putconn(con, close=broken or bool(con.closed))
+        finally:
+            self.semaphore.release()
+
+    def close(self):
+        self.pool.closeall()
+
+
+def _check_pid():
+    global _pid
+    if os.getpid() != _pid:
+        # forked, forget parent's connections without closing them
+        _mongo_client_dict.clear()
+        _psql_pool_dict.clear()
+        _pid = os.getpid()
+
+
+def getMongoClient(_host: str = 'localhost') -> 'MongoClient':
+    """
+    get the MongoClient shared by the whole process for _host,
+    MongoClient is thread safe and keeps its own connection pool.
+    Do not close it.
+
+    :param _host: mongodb host
+    :return: client
+    """
+    with _lock:
+        _check_pid()
+        try:
+            return _mongo_client_dict[_host]
+        except KeyError:
+            from pymongo import MongoClient
+
+            client = MongoClient(host=_host)
+            _mongo_client_dict[_host] = client
+            return client
+
+
+def getPsqlPool(
+        _dbname: str, _host: str = 'localhost',
+        _user: str = '', _password: str = ''
+) -> PsqlPool:
+    """
+    get the pool shared by the whole process for this database
+
+    :param _dbname: postgresql database
+    :param _host: postgresql host
+    :param _user:
+    :param _password:
+    :return: pool
+    """
+    key = (_dbname, _host, _user, _password)
+    with _lock:
+        _check_pid()
+        try:
+            return _psql_pool_dict[key]
+        except KeyError:
+            pool = PsqlPool(
+                PSQL_MIN_CONN, PSQL_MAX_CONN,
+                dbname=_dbname, host=_host,
+                user=_user, password=_password,
+            )
+            _psql_pool_dict[key] = pool
+            return pool
+
+
+def psqlConnection(
+        _dbname: str, _host: str = 'localhost',
+        _user: str = '', _password: str = ''
+) -> typing.ContextManager['psycopg2.extensions.connection']:
+    """
+    borrow one connection from shared pool, use it as
+
+        with psqlConnection('db') as con:
+            ...
+
+    """
+    return getPsqlPool(_dbname, _host, _user, _password).connection()
+
+
+def closeConnections():
+    """
+    close all shared mongodb clients and postgresql pools
+    """
+    with _lock:
+        _check_pid()
+        for client in _mongo_client_dict.values():
+            client.close()
+        _mongo_client_dict.clear()
+        for pool in _psql_pool_dict.values():
+            pool.close()
+        _psql_pool_dict.clear()
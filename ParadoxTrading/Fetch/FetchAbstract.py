@@ -7,15 +7,24 @@ class RegisterAbstract:
     def __init__(self):
         # strategies linked to this market register
         self.strategy_set: typing.Set[str] = set()
+        # columns used by linked strategies, None for all columns
+        self.columns: typing.Union[None, typing.Set[str]] = set()
 
-    def addStrategy(self, _strategy):
+    def addStrategy(
+            self, _strategy, _columns: typing.Iterable[str] = None
+    ):
         """
         link strategy to self
 
         :param _strategy: strategy object (just use its name)
+        :param _columns: columns the strategy uses, None for all
         :return:
         """
         self.strategy_set.add(_strategy.name)
+        if _columns is None:
+            self.columns = None
+        elif self.columns is not None:
+            self.columns.update(_columns)
 
     def toJson(self) -> str:
         """
@@ -67,11 +76,51 @@ class FetchAbstract:
         """
         raise NotImplementedError('fetchSymbol')
 
+    def preloadMetadata(
+            self, _begin_day: str, _end_day: str,
+            _products: typing.Iterable[str] = None
+    ):
+        """
+        load metadata used by fetchSymbol() from _begin_day to
+        _end_day(excluded) in bulk, called by market supply before
+        backtest. Fetchers without metadata do nothing.
+
+        :param _begin_day:
+        :param _end_day:
+        :param _products: None for all
+        """
+        pass
+
+    def buildSymbolTable(
+            self, _begin_day: str, _end_day: str,
+            _products: typing.Iterable[str], _types: typing.Iterable[int]
+    ):
+        """
+        resolve symbols from _begin_day to _end_day(excluded) at once,
+        so fetchSymbol() does not resolve them day by day. Fetchers
+        resolving symbols cheaply do nothing.
+
+        :param _begin_day:
+        :param _end_day:
+        :param _products:
+        :param _types:
+        """
+        pass
+
+    def invalidateCalendar(self, _name: str = None):
+        """
+        drop tradingdays kept in memory, fetchers keeping none do nothing
+
+        :param _name: product or instrument, None for all
+        """
+        pass
+
     def fetchData(
             self, _tradingday: str, _symbol: str, **kwargs
     ) -> typing.Union[None, DataStruct]:
         """
-        get one day data from database
+        get one day data from database, fetchers supporting projection
+        take _columns in kwargs to only return those columns
 
         :param _tradingday:
         :param _symbol:
@@ -80,6 +129,23 @@ class FetchAbstract:
         """
         raise NotImplementedError('fetchData')
 
+    def fetchDataMany(
+            self, _tradingday: str, _symbols: typing.Iterable[str], **kwargs
+    ) -> typing.Dict[str, typing.Union[None, DataStruct]]:
+        """
+        get one day data of several symbols, fetchers which can do it
+        in one query override it
+
+        :param _tradingday:
+        :param _symbols:
+        :param kwargs: args of fetchData
+        :return: map symbol(lower case) to data or None
+        """
+        return {
+            symbol.lower(): self.fetchData(_tradingday, symbol, **kwargs)
+            for symbol in _symbols
+        }
+
     def fetchDayData(
             self, _begin_day: str, _end_day: str, _symbol: str, **kwargs
     ) -> DataStruct:
@@ -1,15 +1,20 @@
 import json
 import typing
+from datetime import datetime, timedelta
 
-import pymongo
-import pymongo.collection
-import pymongo.database
-from diskcache import Cache
-from pymongo import MongoClient
-
-from ParadoxTrading.Fetch import FetchAbstract, RegisterAbstract
+from ParadoxTrading.Fetch.ConnectionPool import getMongoClient
+from ParadoxTrading.Fetch.FetchAbstract import FetchAbstract, RegisterAbstract
+from ParadoxTrading.Fetch.FetchStats import keyFamily, timeIO
+from ParadoxTrading.Fetch.TieredCache import TieredCache, openCache
 from ParadoxTrading.Utils import DataStruct
 
+if typing.TYPE_CHECKING:
+    import pymongo.database
+
+# levels of each side kept in snapshot, missing levels have nan price
+# and zero size
+DEPTH_LEVELS = 20
+
 
 class RegisterLiqui(RegisterAbstract):
     def __init__(self, _pair: str):
@@ -44,24 +49,51 @@ class FetchLiqui(FetchAbstract):
         self.mongo_host: str = 'localhost'
         self.mongo_info_db: str = 'LiquiInfo'
         self.mongo_depth_db: str = 'LiquiDepth'
-
-        self.cache: Cache = Cache('cache')
-
-        self._mongo_client: MongoClient = None
-        self._mongo_info: pymongo.database.Database = None
-        self._mongo_depth: pymongo.database.Database = None
-
-    def _get_mongo_info(self) -> pymongo.database.Database:
-        if not self._mongo_info:
-            if not self._mongo_client:
-                self._mongo_client: MongoClient = MongoClient(
-                    host=self.mongo_host
-                )
-            self._mongo_info: pymongo.database.Database = self._mongo_client[
-                self.mongo_info_db
-            ]
+        self.depth_key: str = 'LiquiDepth_{}_{}'
+        self.depth_levels: int = DEPTH_LEVELS
+        self.columns: typing.List[str] = [
+            'tradingday',
+            'askprice', 'asksize', 'bidprice', 'bidsize',
+            'happentime',
+        ]
+
+        self.cache: TieredCache = openCache('cache')
+
+        self._mongo_info: 'pymongo.database.Database' = None
+        self._mongo_depth: 'pymongo.database.Database' = None
+
+    def _get_mongo_info(self) -> 'pymongo.database.Database':
+        if self._mongo_info is None:
+            self._mongo_info = getMongoClient(
+                self.mongo_host
+            )[self.mongo_info_db]
         return self._mongo_info
 
+    def _get_mongo_depth(self) -> 'pymongo.database.Database':
+        if self._mongo_depth is None:
+            self._mongo_depth = getMongoClient(
+                self.mongo_host
+            )[self.mongo_depth_db]
+        return self._mongo_depth
+
+    def _depth_arrays(
+            self, _levels_list: typing.List[list]
+    ) -> typing.Tuple[list, list]:
+        """
+        turn [[price, size], ...] of each snapshot into rows of one
+        price array and one size array of shape (n, depth_levels)
+        """
+        import numpy as np
+
+        price = np.full((len(_levels_list), self.depth_levels), np.nan)
+        size = np.zeros((len(_levels_list), self.depth_levels))
+        for i, levels in enumerate(_levels_list):
+            if levels:
+                arr = np.array(levels[:self.depth_levels], 'f8')
+                price[i, :len(arr)] = arr[:, 0]
+                size[i, :len(arr)] = arr[:, 1]
+        return list(price), list(size)
+
     def fetchAllPairs(self, _tradingday: str, _not_hidden=True) -> typing.Iterable[str]:
         info = self.fetchInfo(_tradingday)
 
@@ -76,15 +108,96 @@ class FetchLiqui(FetchAbstract):
             return self.cache[key]
         except KeyError:
             db = self._get_mongo_info()
-            data = db['info'].find_one({'tradingday': _tradingday})
+            with timeIO('info', 'mongo', 'find_one', _tradingday) as info:
+                data = db['info'].find_one({'tradingday': _tradingday})
+                info['hit'] = data is not None
             self.cache[key] = data
             return data
 
-    def fetchData(self, _tradingday: str, _symbol: str, **kwargs) -> typing.Union[None, DataStruct]:
-        pass
-
-    def fetchSymbol(self, _tradingday: str, **kwargs) -> typing.Union[None, str]:
-        pass
-
-    def fetchDayData(self, _begin_day: str, _end_day: str, _symbol: str, **kwargs) -> DataStruct:
-        pass
+    def fetchData(
+            self, _tradingday: str, _symbol: str, _cache=True
+    ) -> typing.Union[None, DataStruct]:
+        """
+        depth snapshots of pair _symbol, read from the collection of it
+        in LiquiDepth, whose documents are
+
+            {'tradingday': '20180102', 'happentime': datetime,
+             'asks': [[price, size], ...], 'bids': [[price, size], ...]}
+
+        Each row keeps the best depth_levels of each side as numpy
+        arrays, cached by the columnar codec
+
+        :param _tradingday:
+        :param _symbol: pair, like eth_btc
+        :param _cache: whether to use cache
+        :return: index is happentime, None if no snapshot
+        """
+        key = self.depth_key.format(_symbol, _tradingday)
+        if _cache:
+            try:
+                return self.cache[key]
+            except KeyError:
+                pass
+
+        coll = self._get_mongo_depth()[_symbol]
+        with timeIO(
+                keyFamily(self.depth_key), 'mongo', 'find', _tradingday
+        ) as info:
+            docs = list(coll.find(
+                {'tradingday': _tradingday},
+                {'_id': 0, 'happentime': 1, 'asks': 1, 'bids': 1}
+            ).sort('happentime', 1))
+            info['hit'] = len(docs) > 0
+            info['rows'] = len(docs)
+
+        data = None
+        if docs:
+            askprice, asksize = self._depth_arrays([d['asks'] for d in docs])
+            bidprice, bidsize = self._depth_arrays([d['bids'] for d in docs])
+            data = DataStruct(self.columns, 'happentime')
+            data.data = {
+                'tradingday': [_tradingday] * len(docs),
+                'askprice': askprice, 'asksize': asksize,
+                'bidprice': bidprice, 'bidsize': bidsize,
+                'happentime': [d['happentime'] for d in docs],
+            }
+
+        if _cache:
+            self.cache.set(key, data, _tag=_tradingday)
+        return data
+
+    def fetchSymbol(
+            self, _tradingday: str, _pair: str
+    ) -> typing.Union[None, str]:
+        """
+        the pair itself, if it is listed and not hidden on _tradingday
+
+        :param _tradingday:
+        :param _pair:
+        :return:
+        """
+        info = self.fetchInfo(_tradingday)
+        if info is None:
+            return None
+        if _pair in self.fetchAllPairs(_tradingday):
+            return _pair
+        return None
+
+    def fetchDayData(
+            self, _begin_day: str, _end_day: str, _symbol: str
+    ) -> DataStruct:
+        """
+        get the data from _begin_day to _end_day(excluded), pairs are
+        traded every day
+        """
+        ret = DataStruct(self.columns, 'happentime')
+        day = datetime.strptime(_begin_day, '%Y%m%d')
+        end = datetime.strptime(_end_day, '%Y%m%d')
+        while day < end:
+            data = self.fetchData(day.strftime('%Y%m%d'), _symbol)
+            if data is not None:
+                # days are in order, so rows are appended directly
+                for k in self.columns:
+                    ret.data[k].extend(data.data[k])
+            day += timedelta(days=1)
+        return ret
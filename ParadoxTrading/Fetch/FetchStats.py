@@ -0,0 +1,197 @@
+import contextlib
+import logging
+import threading
+import time
+import typing
+from bisect import bisect_left
+
+# record every query and cache access of the process, set it to False
+# to skip the cost
+IO_STATS = True
+# queries and cache accesses slower than it in seconds are logged by
+# logging.warning, None to disable
+SLOW_QUERY_SECONDS: typing.Union[None, float] = None
+# upper bounds of latency buckets in seconds, the last bucket has none
+LATENCY_BUCKETS = (
+    0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005,
+    0.01, 0.05, 0.1, 0.5, 1.0, 5.0,
+)
+# longest query text kept in slow query log
+_DETAIL_LENGTH = 200
+
+_lock = threading.Lock()
+# (family, backend, operation) -> _Record
+_record_dict: typing.Dict[typing.Tuple[str, str, str], '_Record'] = {}
+
+
+class _Record:
+    __slots__ = (
+        'count', 'hits', 'misses', 'bytes', 'rows',
+        'seconds', 'max_seconds', 'buckets',
+    )
+
+    def __init__(self):
+        self.count: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.bytes: int = 0
+        self.rows: int = 0
+        self.seconds: float = 0.0
+        self.max_seconds: float = 0.0
+        self.buckets: typing.List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def percentile(self, _q: float) -> float:
+        """
+        upper bound of the bucket holding _q of accesses, not above max
+        """
+        need = _q * self.count
+        total = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            total += count
+            if total >= need:
+                return min(bound, self.max_seconds)
+        return self.max_seconds
+
+
+def keyFamily(_key: str) -> str:
+    """
+    family of cache key or key template, the part before the first '_',
+    such as ChineseFuturesTradingDay of tradingday_key
+
+    :param _key:
+    :return:
+    """
+    return _key.split('_', 1)[0]
+
+
+def recordIO(
+        _family: str, _backend: str, _operation: str, _seconds: float,
+        _hit: bool = None, _bytes: int = 0, _rows: int = 0,
+        _detail: str = None
+):
+    """
+    record one access
+
+    :param _family: key family, see keyFamily()
+    :param _backend: memory, disk, mongo or psql
+    :param _operation: such as get, set, find_one, copy
+    :param _seconds: latency
+    :param _hit: whether it is found, None if not a lookup
+    :param _bytes: bytes read or written
+    :param _rows: rows or documents read
+    :param _detail: query, key or condition, for slow query log
+    """
+    if not IO_STATS:
+        return
+    key = (_family, _backend, _operation)
+    with _lock:
+        record = _record_dict.get(key)
+        if record is None:
+            record = _record_dict[key] = _Record()
+        record.count += 1
+        if _hit is not None:
+            if _hit:
+                record.hits += 1
+            else:
+                record.misses += 1
+        record.bytes += _bytes
+        record.rows += _rows
+        record.seconds += _seconds
+        if _seconds > record.max_seconds:
+            record.max_seconds = _seconds
+        record.buckets[bisect_left(LATENCY_BUCKETS, _seconds)] += 1
+
+    if SLOW_QUERY_SECONDS is not None and _seconds >= SLOW_QUERY_SECONDS:
+        detail = '' if _detail is None else str(_detail)
+        if len(detail) > _DETAIL_LENGTH:
+            detail = detail[:_DETAIL_LENGTH] + '...'
+        logging.warning('slow {} {} of {}: {:.3f} s {}'.format(
+            _backend, _operation, _family, _seconds, detail
+        ))
+
+
+@contextlib.contextmanager
+def timeIO(
+        _family: str, _backend: str, _operation: str, _detail: str = None
+) -> typing.Iterator[dict]:
+    """
+    time the block and record it, set hit, bytes and rows of the
+    yielded dict to record them as well
+
+        with timeIO('ChineseFuturesTradingDay', 'mongo', 'find_one') as io:
+            data = coll.find_one(...)
+            io['hit'] = data is not None
+
+    """
+    info = {}
+    begin = time.perf_counter()
+    try:
+        yield info
+    finally:
+        recordIO(
+            _family, _backend, _operation, time.perf_counter() - begin,
+            info.get('hit'), info.get('bytes', 0), info.get('rows', 0),
+            _detail
+        )
+
+
+def ioStats() -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    summary of each family, backend and operation, the most time
+    consuming first. Percentiles are upper bounds of latency buckets
+
+    :return: list of dict
+    """
+    ret = []
+    with _lock:
+        for (family, backend, operation), r in _record_dict.items():
+            lookups = r.hits + r.misses
+            ret.append({
+                'family': family,
+                'backend': backend,
+                'operation': operation,
+                'count': r.count,
+                'hits': r.hits,
+                'misses': r.misses,
+                'hit_rate': r.hits / lookups if lookups else None,
+                'bytes': r.bytes,
+                'rows': r.rows,
+                'seconds': r.seconds,
+                'mean': r.seconds / r.count,
+                'p50': r.percentile(0.5),
+                'p95': r.percentile(0.95),
+                'p99': r.percentile(0.99),
+                'max': r.max_seconds,
+            })
+    ret.sort(key=lambda d: -d['seconds'])
+    return ret
+
+
+def formatIOStats(
+        _stats: typing.List[typing.Dict[str, typing.Any]] = None
+) -> str:
+    """
+    ioStats() as a table
+    """
+    if _stats is None:
+        _stats = ioStats()
+    lines = ['{:<36}{:<8}{:<10}{:>9}{:>8}{:>12}{:>10}{:>10}{:>10}'.format(
+        'family', 'backend', 'op', 'count', 'hit', 'bytes',
+        'total s', 'p50 ms', 'p99 ms'
+    )]
+    for d in _stats:
+        lines.append(
+            '{:<36}{:<8}{:<10}{:>9}{:>8}{:>12}{:>10.3f}{:>10.3f}'
+            '{:>10.3f}'.format(
+                d['family'], d['backend'], d['operation'], d['count'],
+                '-' if d['hit_rate'] is None
+                else '{:.1%}'.format(d['hit_rate']),
+                d['bytes'], d['seconds'], d['p50'] * 1e3, d['p99'] * 1e3
+            )
+        )
+    return '\n'.join(lines)
+
+
+def resetIOStats():
+    with _lock:
+        _record_dict.clear()
@@ -0,0 +1,373 @@
+import copy
+import sys
+import threading
+import time
+import typing
+from collections import OrderedDict
+
+from ParadoxTrading.Fetch.CacheCodec import decodeValue, encodeValue, \
+    isEncoded
+from ParadoxTrading.Fetch.CacheStore import SnapshotCache, oldestTag, \
+    openDisk, splitKey, usedVolume
+from ParadoxTrading.Fetch.FetchStats import keyFamily, recordIO
+from ParadoxTrading.Utils import DataStruct
+
+if typing.TYPE_CHECKING:
+    from diskcache import Cache
+
+# default bounds of the memory tier, change them before fetchers are
+# created
+MEMORY_MAX_ENTRIES = 4096
+MEMORY_MAX_BYTES = 512 * 1024 * 1024
+# with a size limit on disk, it is checked once every CULL_INTERVAL
+# tagged writes, and when exceeded tags are removed until the disk is
+# under CULL_TARGET of the limit
+CULL_INTERVAL = 64
+CULL_TARGET = 0.9
+
+# approximate bytes of one value in a column: list slot and the object,
+# numpy array cells count their buffer too
+_CELL_BYTES = 32
+_ARRAY_CELL_BYTES = 112
+
+
+def _is_array_column(_column: list) -> bool:
+    """
+    whether cells of _column are numpy arrays, like depth of order book.
+    Cells of a column are of the same type, so only the first is checked
+    """
+    import numpy as np
+
+    return len(_column) > 0 and isinstance(_column[0], np.ndarray)
+
+
+def _approx_size(_value: typing.Any) -> int:
+    """
+    rough memory used by a cached value, only to bound the memory tier
+    """
+    if isinstance(_value, DataStruct):
+        size = 64
+        for column in _value.data.values():
+            if _is_array_column(column):
+                size += sum(_ARRAY_CELL_BYTES + v.nbytes for v in column)
+            else:
+                size += _CELL_BYTES * len(column)
+        return size
+    size = sys.getsizeof(_value)
+    if isinstance(_value, dict):
+        for k, v in _value.items():
+            size += sys.getsizeof(k) + sys.getsizeof(v)
+            if isinstance(v, (list, tuple)):
+                size += _CELL_BYTES * len(v)
+    elif isinstance(_value, (list, tuple, set)):
+        size += _CELL_BYTES * len(_value)
+    return size
+
+
+def _copy(_value: typing.Any) -> typing.Any:
+    """
+    copy values handed out by memory tier, so that callers changing
+    them, like sorting an instrument list, do not change the cache
+    """
+    if _value is None or isinstance(_value, (str, bytes, int, float, bool)):
+        return _value
+    if isinstance(_value, DataStruct):
+        # other cells are immutable, copying the column lists is enough
+        ret = _value.iloc[:]
+        for k, column in ret.data.items():
+            if _is_array_column(column):
+                ret.data[k] = [v.copy() for v in column]
+        return ret
+    return copy.deepcopy(_value)
+
+
+class TieredCache:
+    """
+    LRU in memory in front of diskcache, recently used items skip sqlite
+    and unpickling. Every value got from it is a private copy, so it is
+    safe to change. DataStruct is stored on disk by CacheCodec.
+
+    :param _disk: the diskcache, or a store of CacheStore. Writes only
+        go to memory if it is a SnapshotCache
+    :param _max_entries: max items kept in memory
+    :param _max_bytes: max approximate bytes kept in memory
+    :param _size_limit: max bytes on disk, None for no limit. When
+        exceeded items tagged by the oldest tradingday are removed
+        first, untagged items are never removed
+    :param _codec: whether to store DataStruct by CacheCodec
+    """
+
+    def __init__(
+            self, _disk: 'Cache',
+            _max_entries: int = None, _max_bytes: int = None,
+            _size_limit: int = None, _codec: bool = True
+    ):
+        self.disk: 'Cache' = _disk
+        self.readonly: bool = isinstance(_disk, SnapshotCache)
+        self.max_entries: int = MEMORY_MAX_ENTRIES \
+            if _max_entries is None else _max_entries
+        self.max_bytes: int = MEMORY_MAX_BYTES \
+            if _max_bytes is None else _max_bytes
+        self.size_limit: int = _size_limit
+        self.codec: bool = _codec
+        if self.readonly:
+            self.size_limit = None
+        if self.size_limit is not None:
+            # evicting by tag needs the index
+            self.disk.create_tag_index()
+
+        self.lock = threading.Lock()
+        # key -> (value, size), the last one is the most recently used
+        self.memory: typing.MutableMapping[
+            str, typing.Tuple[typing.Any, int]
+        ] = OrderedDict()
+        self.memory_bytes: int = 0
+
+        self.memory_hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        # tags removed from disk
+        self.disk_evictions: int = 0
+        # tagged writes since the last check of size limit
+        self.tagged_writes: int = 0
+
+    def _put(self, _key: str, _value: typing.Any):
+        size = _approx_size(_value)
+        with self.lock:
+            old = self.memory.pop(_key, None)
+            if old is not None:
+                self.memory_bytes -= old[1]
+            if size > self.max_bytes:
+                return
+            self.memory[_key] = (_value, size)
+            self.memory_bytes += size
+            while len(self.memory) > self.max_entries or \
+                    self.memory_bytes > self.max_bytes:
+                _, (_, old_size) = self.memory.popitem(last=False)
+                self.memory_bytes -= old_size
+                self.evictions += 1
+
+    def __getitem__(self, _key: str) -> typing.Any:
+        begin = time.perf_counter()
+        with self.lock:
+            try:
+                value, _ = self.memory[_key]
+                self.memory.move_to_end(_key)
+                self.memory_hits += 1
+                hit = True
+            except KeyError:
+                hit = False
+        family = keyFamily(_key)
+        if hit:
+            value = _copy(value)
+            recordIO(
+                family, 'memory', 'get', time.perf_counter() - begin, True
+            )
+            return value
+        recordIO(family, 'memory', 'get', time.perf_counter() - begin, False)
+
+        # time of disk includes unpickling and decoding
+        begin = time.perf_counter()
+        try:
+            raw = self.disk[_key]
+        except KeyError:
+            with self.lock:
+                self.misses += 1
+            recordIO(
+                family, 'disk', 'get', time.perf_counter() - begin, False,
+                _detail=_key
+            )
+            raise
+        value = decodeValue(raw)
+        recordIO(
+            family, 'disk', 'get', time.perf_counter() - begin, True,
+            len(raw) if isinstance(raw, bytes) else 0, _detail=_key
+        )
+        with self.lock:
+            self.disk_hits += 1
+        self._put(_key, value)
+        return _copy(value)
+
+    def __setitem__(self, _key: str, _value: typing.Any):
+        self.set(_key, _value)
+
+    def set(self, _key: str, _value: typing.Any, _tag: str = None):
+        """
+        store one item
+
+        :param _key:
+        :param _value:
+        :param _tag: tradingday of market data, when disk is over size
+            limit, items of the oldest tag are removed first
+        """
+        if not self.readonly:
+            begin = time.perf_counter()
+            value = encodeValue(_value) if self.codec else _value
+            self.disk.set(_key, value, tag=_tag)
+            recordIO(
+                keyFamily(_key), 'disk', 'set', time.perf_counter() - begin,
+                _bytes=len(value) if isinstance(value, bytes) else 0,
+                _detail=_key
+            )
+        # the caller keeps _value, so keep a copy
+        self._put(_key, _copy(_value))
+        if _tag is not None and self.size_limit is not None:
+            with self.lock:
+                self.tagged_writes += 1
+                check = self.tagged_writes >= CULL_INTERVAL
+                if check:
+                    self.tagged_writes = 0
+            if check:
+                self._cull()
+
+    def _cull(self):
+        """
+        if disk is over size limit, remove tags from the oldest one until
+        it is under CULL_TARGET of the limit. Pages freed by sqlite are
+        kept to reuse, so only the used bytes are counted
+        """
+        if usedVolume(self.disk) <= self.size_limit:
+            return
+        target = self.size_limit * CULL_TARGET
+        while True:
+            tag = oldestTag(self.disk)
+            if tag is None:
+                return
+            self.disk.evict(tag)
+            with self.lock:
+                self.disk_evictions += 1
+            if usedVolume(self.disk) <= target:
+                return
+
+    def __delitem__(self, _key: str):
+        with self.lock:
+            old = self.memory.pop(_key, None)
+            if old is not None:
+                self.memory_bytes -= old[1]
+        if not self.readonly:
+            del self.disk[_key]
+
+    def __contains__(self, _key: str) -> bool:
+        with self.lock:
+            if _key in self.memory:
+                return True
+        return _key in self.disk
+
+    def get(self, _key: str, _default: typing.Any = None) -> typing.Any:
+        try:
+            return self[_key]
+        except KeyError:
+            return _default
+
+    def transact(self) -> typing.ContextManager:
+        """
+        group writes into one disk transaction
+        """
+        return self.disk.transact()
+
+    def volume(self) -> int:
+        """
+        bytes used on disk
+        """
+        return self.disk.volume()
+
+    def clearMemory(self):
+        """
+        drop the memory tier, disk is untouched
+        """
+        with self.lock:
+            self.memory.clear()
+            self.memory_bytes = 0
+
+    def stats(self) -> typing.Dict[str, typing.Any]:
+        """
+        hit and miss counts of both tiers
+        """
+        with self.lock:
+            total = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (
+                    (self.memory_hits + self.disk_hits) / total
+                    if total else 0.0
+                ),
+                'evictions': self.evictions,
+                'disk_evictions': self.disk_evictions,
+                'memory_entries': len(self.memory),
+                'memory_bytes': self.memory_bytes,
+            }
+
+    def resetStats(self):
+        with self.lock:
+            self.memory_hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.disk_evictions = 0
+
+    def close(self):
+        self.clearMemory()
+        self.disk.close()
+
+
+def openCache(
+        _path: str, _size_limit: typing.Union[None, int] = None
+) -> TieredCache:
+    """
+    open the cache of fetchers at _path
+
+    :param _path: directory of diskcache, or with prefix of
+        CacheStore.openDisk() to open a sharded cache or a snapshot
+    :param _size_limit: max bytes on disk, default no limit, see
+        TieredCache
+    :return: cache
+    """
+    # eviction of diskcache ignores tradingday and may drop metadata,
+    # TieredCache culls by itself
+    return TieredCache(openDisk(_path), _size_limit=_size_limit)
+
+
+def migrateCache(
+        _path: str, _size_limit: typing.Union[None, int] = None
+) -> typing.Dict[str, int]:
+    """
+    rewrite a cache created by old versions: DataStruct pickled as a
+    whole is stored by CacheCodec and tagged by the tradingday in its
+    key, then it is culled if a size limit is given. Items already migrated are
+    skipped, so it can be run again if interrupted.
+
+    :param _path: same as openCache
+    :param _size_limit: same as openCache
+    :return: counts of items and bytes on disk before and after
+    """
+    cache = openCache(_path, _size_limit)
+    if cache.readonly:
+        cache.close()
+        raise Exception('snapshot cache is read only')
+    ret = {
+        'migrated': 0, 'skipped': 0,
+        'volume_before': cache.volume(),
+    }
+    try:
+        for key in list(cache.disk.iterkeys()):
+            try:
+                value = cache.disk[key]
+            except KeyError:
+                continue
+            if isEncoded(value) or not isinstance(value, DataStruct):
+                ret['skipped'] += 1
+                continue
+            cache.disk.set(
+                key, encodeValue(value),
+                tag=splitKey(key)[1] if isinstance(key, str) else None
+            )
+            ret['migrated'] += 1
+        if cache.size_limit is not None:
+            cache._cull()
+        ret['volume_after'] = cache.volume()
+    finally:
+        cache.close()
+    return ret
@@ -1,2 +1,7 @@
+from .ConnectionPool import closeConnections, getMongoClient, getPsqlPool, \
+    psqlConnection
 from .FetchAbstract import FetchAbstract, RegisterAbstract
+from .FetchStats import formatIOStats, ioStats, resetIOStats
+from .CacheStore import ShardedCache, SnapshotCache, createSnapshot
+from .TieredCache import TieredCache, openCache
 from .FetchLiqui import FetchLiqui, RegisterLiqui
@@ -0,0 +1,119 @@
+import argparse
+import sys
+
+from ParadoxTrading.Fetch import ChineseFutures
+from ParadoxTrading.Fetch.CacheStore import createSnapshot
+from ParadoxTrading.Fetch.TieredCache import migrateCache
+
+FETCHERS = {
+    'tick': ChineseFutures.FetchInstrumentTickData,
+    'min': ChineseFutures.FetchInstrumentMinData,
+    'day': ChineseFutures.FetchInstrumentDayData,
+    'dominant-index': ChineseFutures.FetchDominantIndex,
+    'product-index': ChineseFutures.FetchProductIndex,
+}
+
+
+def migrate_cache(_args):
+    ret = migrateCache(_args.path, _args.size_limit)
+    print('{} migrated, {} skipped, {} -> {} bytes'.format(
+        ret['migrated'], ret['skipped'],
+        ret['volume_before'], ret['volume_after']
+    ))
+    return 0
+
+
+def snapshot_cache(_args):
+    count = createSnapshot(_args.src, _args.dst)
+    print('{} items copied, open it by snapshot:{}'.format(count, _args.dst))
+    return 0
+
+
+def warm_cache(_args):
+    fetcher = FETCHERS[_args.fetcher](
+        _args.mongo_host, _args.psql_host,
+        _args.psql_user, _args.psql_password, _args.cache_path
+    )
+
+    def progress(_tradingday, _done, _total):
+        print('{} done, {}/{}'.format(_tradingday, _done, _total))
+
+    ret = ChineseFutures.warmCache(
+        fetcher, _args.products, _args.begin, _args.end, _args.types,
+        _args.workers, _args.columns, progress
+    )
+    print('{} days, {} symbols, {} cached, {} fetched'.format(
+        ret['days'], ret['symbols'], ret['cached'], ret['fetched']
+    ))
+    print('{} rows in {:.1f} s, {:.0f} rows/s, {:.1f} symbols/s'.format(
+        ret['rows'], ret['seconds'],
+        ret['rows_per_sec'], ret['symbols_per_sec']
+    ))
+    for day, symbol in ret['missing']:
+        print('missing {} {}'.format(day, symbol))
+    for day, error in ret['failed']:
+        print('failed {} {}'.format(day, error))
+    return 1 if ret['failed'] else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m ParadoxTrading.Fetch')
+    sub = parser.add_subparsers(dest='command')
+    sub.required = True
+
+    migrate_parser = sub.add_parser(
+        'migrate-cache',
+        help='store cached data by the columnar codec and tag it by day'
+    )
+    migrate_parser.add_argument('path', help='directory of cache')
+    migrate_parser.add_argument(
+        '--size-limit', type=int, default=None,
+        help='max bytes on disk, default no limit'
+    )
+    migrate_parser.set_defaults(func=migrate_cache)
+
+    snapshot_parser = sub.add_parser(
+        'snapshot-cache',
+        help='copy cache into a read only snapshot for backtest workers'
+    )
+    snapshot_parser.add_argument(
+        'src', help='cache to copy, sharded: before it if sharded'
+    )
+    snapshot_parser.add_argument('dst', help='new directory of snapshot')
+    snapshot_parser.set_defaults(func=snapshot_cache)
+
+    warm_parser = sub.add_parser(
+        'warm-cache', help='fetch a range of data into cache in parallel'
+    )
+    warm_parser.add_argument('fetcher', choices=sorted(FETCHERS.keys()))
+    warm_parser.add_argument('--products', nargs='+', required=True)
+    warm_parser.add_argument('--begin', required=True)
+    warm_parser.add_argument('--end', required=True)
+    warm_parser.add_argument(
+        '--types', type=int, nargs='+', default=[1],
+        help='types of RegisterInstrument, 1 for dominant'
+    )
+    warm_parser.add_argument(
+        '--workers', type=int, default=None,
+        help='threads, default size of postgresql pool'
+    )
+    warm_parser.add_argument(
+        '--columns', nargs='+', default=None,
+        help='only these columns, default all'
+    )
+    warm_parser.add_argument(
+        '--cache-path', default='cache',
+        help='sharded: before it lets several warming processes write'
+    )
+    warm_parser.add_argument('--mongo-host', default='localhost')
+    warm_parser.add_argument('--psql-host', default='localhost')
+    warm_parser.add_argument('--psql-user', default='')
+    warm_parser.add_argument('--psql-password', default='')
+    warm_parser.set_defaults(func=warm_cache)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+import atexit
+import hashlib
+import inspect
+import logging
+import pickle
+import typing
+import weakref
+
+from ParadoxTrading.Indicator.IndicatorAbstract import IndicatorAbstract
+from ParadoxTrading.Utils import DataStruct
+
+if typing.TYPE_CHECKING:
+    from ParadoxTrading.Fetch.TieredCache import TieredCache
+
+# where outputs of indicators are cached by default
+INDICATOR_CACHE_PATH = 'indicator_cache'
+
+# path -> cache, shared by all wrappers
+_cache_dict: typing.Dict[str, 'TieredCache'] = {}
+# wrappers holding rows not saved yet, dropped ones are not kept alive
+_unsaved_set: typing.MutableSet['CachedIndicator'] = weakref.WeakSet()
+# saveIndicators() is registered at exit by the first wrapper
+_exit_registered: bool = False
+# module name -> hash of its source
+_source_hash_dict: typing.Dict[str, str] = {}
+
+
+def _open_cache(_path: str) -> 'TieredCache':
+    from ParadoxTrading.Fetch.TieredCache import openCache
+
+    try:
+        return _cache_dict[_path]
+    except KeyError:
+        cache = _cache_dict[_path] = openCache(_path, None)
+        return cache
+
+
+def _source_hash(_indicator_type: type) -> str:
+    """
+    hash of the source of the module defining _indicator_type, empty if
+    the source can not be found
+    """
+    module = _indicator_type.__module__
+    try:
+        return _source_hash_dict[module]
+    except KeyError:
+        pass
+    try:
+        with open(inspect.getsourcefile(_indicator_type), 'rb') as f:
+            ret = hashlib.sha1(f.read()).hexdigest()[:16]
+    except (OSError, TypeError):
+        ret = ''
+    _source_hash_dict[module] = ret
+    return ret
+
+
+class CachedIndicator(IndicatorAbstract):
+    """
+    wrap an indicator so its output on a series is computed once and
+    kept in a persisted cache. The cache is keyed by class, parameters
+    and version of indicator, _series and the first index fed, and holds
+    the indicator itself with the last index fed. A later run replays
+    cached output until that index, then goes on computing with the
+    cached indicator, so only new rows are computed.
+
+        atr = CachedIndicator('DominantIndex_rb', ATR, 20)
+        atr.addMany(market)
+
+    Rows are matched by index only, so name a different _series when
+    input changes. The version is the hash of the module source of
+    indicator by default, so changing its code computes it again.
+    addMany() saves when it ends, rows of addOne() are saved by save(),
+    saveIndicators() or at exit, call save() before dropping a wrapper.
+
+    :param _series: identity of input, like the symbol of index
+    :param _indicator_type: class of indicator
+    :param args: args of indicator
+    :param _cache_path: path of cache, see Fetch.openCache()
+    :param _version: version of indicator, default the hash of its
+        module source
+    :param kwargs: kwargs of indicator
+    """
+
+    def __init__(
+            self, _series: str,
+            _indicator_type: typing.Type[IndicatorAbstract], *args,
+            _cache_path: str = INDICATOR_CACHE_PATH,
+            _version: str = None, **kwargs
+    ):
+        super().__init__()
+
+        global _exit_registered
+        if not _exit_registered:
+            atexit.register(saveIndicators)
+            _exit_registered = True
+
+        self.series: str = _series
+        self.indicator_name: str = '{}.{}{}'.format(
+            _indicator_type.__module__, _indicator_type.__qualname__,
+            repr((args, sorted(kwargs.items())))
+        )
+        self.version: str = _source_hash(_indicator_type) \
+            if _version is None else _version
+        self.indicator: IndicatorAbstract = _indicator_type(*args, **kwargs)
+        self.data = self.indicator.data
+
+        self.cache: 'TieredCache' = _open_cache(_cache_path)
+        # set by the first row
+        self.key: str = None
+        # last index fed to self.indicator, and the one cached
+        self.last_index = None
+        self.saved_index = None
+        # output of cached indicator, moved into self.data row by row
+        self.replay: DataStruct = None
+        self.replay_pos: int = 0
+
+    def _load(self, _first_index: typing.Any):
+        self.key = 'CachedIndicator_{}_{}'.format(
+            type(self.indicator).__name__, hashlib.sha1(repr((
+                self.indicator_name, self.version,
+                self.series, _first_index
+            )).encode('utf-8')).hexdigest()[:16]
+        )
+        try:
+            last_index, state = self.cache[self.key]
+        except KeyError:
+            return
+        try:
+            indicator = pickle.loads(state)
+        except Exception as e:
+            # compute it again, and drop the broken one so it is saved
+            logging.warning('can not load cached {} of {}: {}'.format(
+                self.indicator_name, self.series, e
+            ))
+            del self.cache[self.key]
+            return
+        logging.info('replay cached {} of {} until {}'.format(
+            self.indicator_name, self.series, last_index
+        ))
+        self.indicator = indicator
+        self.last_index = self.saved_index = last_index
+        self.replay = self.indicator.data
+        self.data = DataStruct(
+            list(self.replay.data.keys()), self.replay.index_name
+        )
+
+    def _addOne(self, _data_struct: DataStruct):
+        index_value = _data_struct.index()[0]
+        if self.key is None:
+            self._load(index_value)
+
+        if self.replay is not None:
+            if index_value <= self.last_index:
+                # never show output after the row fed
+                replay_index = self.replay.index()
+                while self.replay_pos < len(replay_index) and \
+                        replay_index[self.replay_pos] <= index_value:
+                    for k, v in self.replay.data.items():
+                        self.data.data[k].append(v[self.replay_pos])
+                    self.replay_pos += 1
+                return
+            # all cached rows are shown, go on with cached indicator
+            self.data = self.indicator.data
+            self.replay = None
+
+        self.indicator.addOne(_data_struct)
+        self.last_index = index_value
+        _unsaved_set.add(self)
+
+    def addMany(
+            self,
+            _data_list: typing.Union[DataStruct, typing.List[DataStruct]],
+    ) -> "CachedIndicator":
+        super().addMany(_data_list)
+        self.save()
+        return self
+
+    def save(self):
+        """
+        cache the indicator if it is fed beyond the cached one
+        """
+        _unsaved_set.discard(self)
+        if self.key is None or self.last_index == self.saved_index:
+            return
+        cached = self.cache.get(self.key)
+        # another run may have cached a longer one
+        if cached is None or cached[0] < self.last_index:
+            try:
+                state = pickle.dumps(self.indicator, pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                logging.warning('can not cache {}: {}'.format(
+                    self.indicator_name, e
+                ))
+                return
+            self.cache.set(self.key, (self.last_index, state))
+        self.saved_index = self.last_index
+
+
+def saveIndicators():
+    """
+    save every CachedIndicator holding rows not saved
+    """
+    for indicator in list(_unsaved_set):
+        indicator.save()
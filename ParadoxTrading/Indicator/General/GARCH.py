@@ -2,7 +2,6 @@ import math
 import typing
 
 import numpy as np
-from arch import arch_model
 
 from ParadoxTrading.Indicator.IndicatorAbstract import IndicatorAbstract
 from ParadoxTrading.Utils import DataStruct
@@ -54,6 +53,8 @@ class GARCH(IndicatorAbstract):
             if self.fit_count > self.fit_period and \
                     len(self.rate_buf) >= self.fit_begin:
                 # retrain model and reset sigma2
+                from arch import arch_model
+
                 rate_arr = np.array(self.rate_buf)
                 am = arch_model(rate_arr, mean='Zero')
                 res = am.fit(disp='off', show_warning=False)
@@ -1,3 +1,4 @@
+from .CachedIndicator import CachedIndicator, saveIndicators
 from .Bar import OHLC, CloseBar, HighBar, LowBar, OpenBar, SumBar
 from .General import ATR, BIAS, CCI, EFF, EMA, KDJ, MA, MACD, MAX, MIN, RSI, \
     SAR, STD, AdaBBands, AdaKalman, BBands, Diff, FastBBands, FastMA, \
@@ -3,6 +3,7 @@ import typing
 import pymongo
 
 from ParadoxTrading.Engine import EventType, DirectionType, SignalType
+from ParadoxTrading.Fetch import getMongoClient
 from ParadoxTrading.Utils import DataStruct
 
 
@@ -18,8 +19,7 @@ class FetchRecord:
             self, _backtest_key: str, _type: int,
             _strategy: typing.Union[str, None],
     ) -> typing.List[dict]:
-        client = pymongo.MongoClient(self.mongo_host)
-        db = client[self.mongo_database]
+        db = getMongoClient(self.mongo_host)[self.mongo_database]
         coll = db[_backtest_key]
 
         query = {'type': _type}
@@ -31,7 +31,6 @@ class FetchRecord:
             ('datetime', pymongo.ASCENDING)
         ]))
 
-        client.close()
         return ret
 
     def fetchSignalRecords(
@@ -8,6 +8,8 @@ import PyCTP
 import schedule
 
 from ParadoxTrading.Engine import ActionType, DirectionType
+from ParadoxTrading.EngineExt.Futures.InstrumentRegistry import \
+    getInstrumentRegistry
 from ParadoxTrading.Utils.CTP.CTPTraderSpi import CTPTraderSpi
 from ParadoxTrading.Utils.CTP.CTPMarketSpi import CTPMarketSpi
 
@@ -82,6 +84,8 @@ class CTPFileTradeTool:
         self.data_table = {}
         self.instrument_table = {}
         self.commission_table = {}
+        # specs from queries, shared with portfolios and executions
+        self.registry = getInstrumentRegistry()
 
     def delTraderSpi(self):
         self.trader.Release()
@@ -217,6 +221,7 @@ class CTPFileTradeTool:
             self.instrument_table[
                 d.index()[0].lower()
             ] = d.toDict()
+        self.registry.loadCTPInstrument(tmp)
         sleep(1)
         return True
 
@@ -263,6 +268,8 @@ class CTPFileTradeTool:
             if comm_info is False:
                 return
             self.commission_table[order_obj.symbol] = comm_info
+            self.registry.loadCTPCommission(comm_info)
+        spec = self.registry.spec(order_obj.symbol)
 
         for _ in range(quantity_diff):  # order one by one
             # limit price
@@ -284,21 +291,9 @@ class CTPFileTradeTool:
             if trade_info is False:
                 continue
             # !!! trade succeed !!!
-            comm_value = 0
-            if order_obj.action == ActionType.OPEN:
-                comm_value += comm_info['OpenRatioByMoney'] * \
-                    trade_info['Price'] * trade_info['Volume'] * \
-                    inst_info['VolumeMultiple']
-                comm_value += comm_info['OpenRatioByVolume'] * \
-                    trade_info['Volume']
-            elif order_obj.action == ActionType.CLOSE:
-                comm_value += comm_info['CloseRatioByMoney'] * \
-                    trade_info['Price'] * trade_info['Volume'] * \
-                    inst_info['VolumeMultiple']
-                comm_value += comm_info['CloseRatioByVolume'] * \
-                    trade_info['Volume']
-            else:
-                raise Exception('unknown action')
+            comm_value = spec.commission(
+                order_obj.action, trade_info['Price'], trade_info['Volume']
+            )
             fill_obj.add(
                 _quantity=trade_info['Volume'],
                 _price=trade_info['Price'],
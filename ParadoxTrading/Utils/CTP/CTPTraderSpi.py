@@ -161,7 +161,8 @@ class CTPTraderSpi(PyCTP.CThostFtdcTraderSpi):
         self.eventClear()
         self.ret_data = DataStruct([
             'InstrumentID', 'ProductID', 'VolumeMultiple', 'PriceTick',
-            'DeliveryYear', 'DeliveryMonth'
+            'DeliveryYear', 'DeliveryMonth',
+            'LongMarginRatio', 'ShortMarginRatio'
         ], 'InstrumentID')
         logging.info('instrument TRY!')
         if self.api.ReqQryInstrument(qry, self.incRequestID()):
@@ -188,6 +189,8 @@ class CTPTraderSpi(PyCTP.CThostFtdcTraderSpi):
                 'PriceTick': _instrument.PriceTick,
                 'DeliveryYear': _instrument.DeliveryYear,
                 'DeliveryMonth': _instrument.DeliveryMonth,
+                'LongMarginRatio': _instrument.LongMarginRatio,
+                'ShortMarginRatio': _instrument.ShortMarginRatio,
             })
         if _is_last:
             logging.info('instrument DONE! (total: {})'.format(
@@ -631,3 +634,41 @@ class CTPTraderSpi(PyCTP.CThostFtdcTraderSpi):
         if _is_last:
             logging.info('qry commission rate({}) DONE'.format(instrument))
             self.eventSet()
+
+    def ReqQryInstrumentMarginRate(
+            self, _instrument_id: bytes
+    ) -> typing.Union[bool, dict]:
+        req = PyCTP.CThostFtdcQryInstrumentMarginRateField()
+        req.BrokerID = self.broker_id
+        req.InvestorID = self.user_id
+        req.InstrumentID = _instrument_id
+        req.HedgeFlag = PyCTP.THOST_FTDC_HF_Speculation
+
+        self.eventClear()
+        logging.info('qry margin rate({}) TRY!'.format(_instrument_id))
+        if self.api.ReqQryInstrumentMarginRate(req, self.incRequestID()):
+            logging.error('qry margin rate FAILED!')
+            return False
+
+        ret = self.eventWait(self.TIME_OUT)
+        if ret is False:
+            return False
+        return self.ret_data
+
+    def OnRspQryInstrumentMarginRate(
+            self,
+            _rate: PyCTP.CThostFtdcInstrumentMarginRateField,
+            _rsp_info: PyCTP.CThostFtdcRspInfoField,
+            _request_id: int, _is_last: bool
+    ):
+        instrument = _rate.InstrumentID.decode('gb2312')
+        self.ret_data = {
+            'InstrumentID': instrument,
+            'LongMarginRatioByMoney': _rate.LongMarginRatioByMoney,
+            'LongMarginRatioByVolume': _rate.LongMarginRatioByVolume,
+            'ShortMarginRatioByMoney': _rate.ShortMarginRatioByMoney,
+            'ShortMarginRatioByVolume': _rate.ShortMarginRatioByVolume,
+        }
+        if _is_last:
+            logging.info('qry margin rate({}) DONE'.format(instrument))
+            self.eventSet()
@@ -0,0 +1,334 @@
+import typing
+
+import numpy as np
+
+from ParadoxTrading.Utils.DataStruct import DataStruct
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+    from ParadoxTrading.Fetch import FetchAbstract
+
+
+class DataPanel:
+    """
+    one column, like closeprice, of several symbols aligned on the union
+    of their index. Values are a float matrix of (index, symbol), cells
+    a symbol has no value for are nan and False in mask. Operations are
+    vectorized on the matrix and return new panels.
+
+    :param _index: sorted index values
+    :param _symbols: symbols, one column each
+    :param _values: matrix of (len(_index), len(_symbols))
+    :param _mask: True where there is value, default not nan
+    :param _index_name: name of index
+    """
+
+    def __init__(
+            self,
+            _index: typing.Sequence[typing.Any],
+            _symbols: typing.Sequence[str],
+            _values: np.ndarray,
+            _mask: np.ndarray = None,
+            _index_name: str = 'index',
+    ):
+        self.index_name = _index_name
+        self.index: typing.List[typing.Any] = list(_index)
+        self.symbols: typing.List[str] = list(_symbols)
+        self.symbol_pos: typing.Dict[str, int] = {
+            s: i for i, s in enumerate(self.symbols)
+        }
+        self.values: np.ndarray = np.asarray(_values, np.float64)
+        assert self.values.shape == (len(self.index), len(self.symbols))
+        if _mask is None:
+            _mask = ~np.isnan(self.values)
+        self.mask: np.ndarray = np.asarray(_mask, bool)
+
+    @staticmethod
+    def fromDataStructs(
+            _struct_dict: typing.Dict[str, DataStruct], _column: str
+    ) -> 'DataPanel':
+        """
+        align _column of several datastructs by their index
+
+        :param _struct_dict: map symbol to datastruct, all with the
+            same index name. If an index value appears several times
+            in one datastruct, the last row is kept
+        :param _column: column to take
+        :return: panel of _column
+        """
+        index_name = None
+        for struct in _struct_dict.values():
+            if index_name is None:
+                index_name = struct.index_name
+            assert struct.index_name == index_name
+
+        index = sorted(set().union(*(
+            struct.index() for struct in _struct_dict.values()
+        )))
+        index_pos = {v: i for i, v in enumerate(index)}
+        values = np.full((len(index), len(_struct_dict)), np.nan)
+        for i, struct in enumerate(_struct_dict.values()):
+            rows = [index_pos[v] for v in struct.index()]
+            column = [
+                np.nan if v is None else v for v in struct.data[_column]
+            ]
+            values[rows, i] = column
+
+        return DataPanel(
+            index, list(_struct_dict.keys()), values,
+            _index_name=index_name or 'index'
+        )
+
+    @staticmethod
+    def fromFetcher(
+            _fetcher: 'FetchAbstract',
+            _begin_day: str, _end_day: str,
+            _symbols: typing.Iterable[str],
+            _column: str = 'closeprice', **kwargs
+    ) -> 'DataPanel':
+        """
+        fetchDayData() of each symbol, like instruments or products for
+        product index fetchers, and align _column of them
+
+        :param _fetcher:
+        :param _begin_day: the begin day, included
+        :param _end_day: the end day, excluded
+        :param _symbols:
+        :param _column: column to take
+        :param kwargs: args of fetchDayData
+        :return: panel of _column
+        """
+        return DataPanel.fromDataStructs({
+            s.lower(): _fetcher.fetchDayData(
+                _begin_day, _end_day, _symbol=s, **kwargs
+            ) for s in _symbols
+        }, _column)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, _symbol: str) -> np.ndarray:
+        """
+        column of _symbol, a view of values
+        """
+        return self.values[:, self.symbol_pos[_symbol]]
+
+    def __repr__(self):
+        return repr(self.toDataStruct())
+
+    def _new(
+            self, _values: np.ndarray, _mask: np.ndarray = None,
+            _index: typing.Sequence[typing.Any] = None
+    ) -> 'DataPanel':
+        return DataPanel(
+            self.index if _index is None else _index,
+            self.symbols, _values, _mask, self.index_name
+        )
+
+    def toDataStruct(self) -> DataStruct:
+        """
+        one column for each symbol, missing values are None
+        """
+        ret = DataStruct(
+            [self.index_name] + self.symbols, self.index_name
+        )
+        ret.data[self.index_name] = list(self.index)
+        for i, s in enumerate(self.symbols):
+            ret.data[s] = [
+                v if m else None
+                for v, m in zip(self.values[:, i].tolist(), self.mask[:, i])
+            ]
+        return ret
+
+    def toPandas(self) -> 'pd.DataFrame':
+        import pandas as pd
+
+        return pd.DataFrame(
+            np.where(self.mask, self.values, np.nan),
+            index=pd.Index(self.index, name=self.index_name),
+            columns=self.symbols,
+        )
+
+    def iloc(self, _begin: int = None, _end: int = None) -> 'DataPanel':
+        """
+        rows from _begin to _end(excluded), by position
+        """
+        s = slice(_begin, _end)
+        return self._new(
+            self.values[s], self.mask[s], self.index[s]
+        )
+
+    def select(self, _symbols: typing.Sequence[str]) -> 'DataPanel':
+        """
+        panel of some symbols
+        """
+        pos = [self.symbol_pos[s] for s in _symbols]
+        return DataPanel(
+            self.index, _symbols, self.values[:, pos],
+            self.mask[:, pos], self.index_name
+        )
+
+    def dropMissing(self) -> 'DataPanel':
+        """
+        only keep rows all symbols have value
+        """
+        keep = self.mask.all(axis=1)
+        return self._new(
+            self.values[keep], self.mask[keep],
+            [v for v, k in zip(self.index, keep) if k]
+        )
+
+    def fillForward(self) -> 'DataPanel':
+        """
+        fill missing cells with the last value of the symbol, cells
+        before the first value stay missing
+        """
+        rows = np.arange(len(self.index))[:, None]
+        last_pos = np.maximum.accumulate(
+            np.where(self.mask, rows, -1), axis=0
+        )
+        mask = last_pos >= 0
+        cols = np.arange(len(self.symbols))[None, :]
+        values = np.where(
+            mask, self.values[np.maximum(last_pos, 0), cols], np.nan
+        )
+        return self._new(values, mask)
+
+    def returns(self, _period: int = 1, _log: bool = False) -> 'DataPanel':
+        """
+        return of each symbol over _period rows, missing if either end
+        is missing. Use fillForward() first to skip missing rows.
+
+        :param _period: rows between two values
+        :param _log: log return instead of simple return
+        """
+        values = np.full_like(self.values, np.nan)
+        mask = np.zeros_like(self.mask)
+        if _period < len(self.index):
+            cur, prev = self.values[_period:], self.values[:-_period]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                if _log:
+                    values[_period:] = np.log(cur / prev)
+                else:
+                    values[_period:] = cur / prev - 1.0
+            mask[_period:] = self.mask[_period:] & self.mask[:-_period]
+        # zero or negative prices give no return
+        mask &= np.isfinite(values)
+        return self._new(np.where(mask, values, np.nan), mask)
+
+    def rolling(
+            self, _window: int,
+            _func: typing.Callable[..., np.ndarray] = np.mean
+    ) -> 'DataPanel':
+        """
+        apply _func on the last _window rows of each symbol, missing if
+        any of them is missing
+
+        :param _window: rows in window
+        :param _func: reduction with axis arg, like np.mean or np.std
+        """
+        values = np.full_like(self.values, np.nan)
+        mask = np.zeros_like(self.mask)
+        if _window <= len(self.index):
+            # (rows - _window + 1, symbols, _window) view, no copy
+            windows = np.lib.stride_tricks.sliding_window_view(
+                self.values, _window, axis=0
+            )
+            values[_window - 1:] = _func(windows, axis=-1)
+            # a window is complete when it has no missing cell
+            missing = np.zeros(
+                (len(self.index) + 1, len(self.symbols)), np.int64
+            )
+            np.cumsum(~self.mask, axis=0, out=missing[1:])
+            mask[_window - 1:] = missing[_window:] == missing[:-_window]
+        return self._new(np.where(mask, values, np.nan), mask)
+
+    def _masked(self) -> np.ndarray:
+        return np.where(self.mask, self.values, np.nan)
+
+    def crossMean(self) -> np.ndarray:
+        """
+        mean of symbols on each row, nan if none has value
+        """
+        count = self.mask.sum(axis=1)
+        total = np.where(self.mask, self.values, 0.0).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(count > 0, total / count, np.nan)
+
+    def crossStd(self) -> np.ndarray:
+        """
+        population std of symbols on each row, nan if none has value
+        """
+        count = self.mask.sum(axis=1)
+        mean = self.crossMean()
+        dev = np.where(self.mask, self.values - mean[:, None], 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(
+                count > 0, np.sqrt((dev ** 2).sum(axis=1) / count), np.nan
+            )
+
+    def demean(self) -> 'DataPanel':
+        """
+        minus the cross-sectional mean of each row
+        """
+        return self._new(
+            self._masked() - self.crossMean()[:, None], self.mask
+        )
+
+    def zscore(self) -> 'DataPanel':
+        """
+        cross-sectional z-score of each row, missing where std is 0
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = (self._masked() - self.crossMean()[:, None]) / \
+                self.crossStd()[:, None]
+        return self._new(values, self.mask & np.isfinite(values))
+
+    def rank(self) -> 'DataPanel':
+        """
+        cross-sectional rank of each row from 0 to 1, ties get the
+        same rank of their first position, a single value gets 0.5 and
+        missing cells are not ranked
+        """
+        count = self.mask.sum(axis=1, keepdims=True)
+        # missing cells sort last
+        masked = np.where(self.mask, self.values, np.inf)
+        order = np.argsort(masked, axis=1, kind='stable')
+        sorted_values = np.take_along_axis(masked, order, axis=1)
+        # position of the first one of each run of ties
+        pos = np.broadcast_to(
+            np.arange(len(self.symbols)), sorted_values.shape
+        )
+        first = np.maximum.accumulate(np.where(
+            np.concatenate((
+                np.ones((len(self.index), 1), bool),
+                sorted_values[:, 1:] != sorted_values[:, :-1]
+            ), axis=1), pos, 0
+        ), axis=1)
+        ranks = np.empty_like(self.values)
+        np.put_along_axis(ranks, order, first, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.where(
+                count > 1, ranks / (count - 1), 0.5
+            )
+        return self._new(np.where(self.mask, values, np.nan), self.mask)
+
+    def corr(self) -> np.ndarray:
+        """
+        correlation matrix of symbols, each pair on the rows both have
+        value, nan if less than 2 rows
+
+        :return: matrix of (symbol, symbol)
+        """
+        m = self.mask.astype(np.float64)
+        x = np.where(self.mask, self.values, 0.0)
+        n = m.T @ m
+        sum_x = x.T @ m  # sum of i on rows both have value
+        sum_y = m.T @ x
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = x.T @ x - sum_x * sum_y / n
+            var_x = (x ** 2).T @ m - sum_x ** 2 / n
+            var_y = m.T @ (x ** 2) - sum_y ** 2 / n
+            ret = cov / np.sqrt(var_x * var_y)
+        ret[n < 2] = np.nan
+        return ret
@@ -1,10 +1,11 @@
 from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
 
-import pandas as pd
-import tabulate
 import typing
 
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
 
 class DataStruct:
     """
@@ -76,6 +77,8 @@ class DataStruct:
 
         :return: the str of this table
         """
+        import tabulate
+
         if len(self) > 20:
             tmp_rows, tmp_keys = self.iloc[:8].toRows()
             tmp_rows.append(['...' for _ in tmp_keys])
@@ -282,14 +285,16 @@ class DataStruct:
 
         return new_struct
 
-    def toPandas(self) -> pd.DataFrame:
+    def toPandas(self) -> 'pd.DataFrame':
+        import pandas as pd
+
         df = pd.DataFrame(data=self.data, index=self.index())
         del df[self.index_name]
         df.index.name = self.index_name
         return df
 
     @staticmethod
-    def fromPandas(df: pd.DataFrame) -> 'DataStruct':
+    def fromPandas(df: 'pd.DataFrame') -> 'DataStruct':
         columns = list(df)
         index_name = df.index.name
         columns.append(index_name)
@@ -1,8 +1,6 @@
 import typing
 from datetime import datetime, timedelta
 
-import arrow
-
 from ParadoxTrading.Utils.DataStruct import DataStruct
 
 DATETIME_TYPE = typing.Union[str, datetime]
@@ -152,6 +150,8 @@ class SplitIntoMonth(SplitAbstract):
     def _get_begin_end_time(
             self, _cur_time: DATETIME_TYPE
     ) -> (DATETIME_TYPE, DATETIME_TYPE):
+        import arrow
+
         cur_date = arrow.get(_cur_time, 'YYYYMMDD')
         begin_datetime = cur_date.replace(day=1)
         end_datetime = begin_datetime.shift(months=1)
@@ -165,6 +165,8 @@ class SplitIntoYear(SplitAbstract):
     def _get_begin_end_time(
             self, _cur_time: DATETIME_TYPE
     ) -> (DATETIME_TYPE, DATETIME_TYPE):
+        import arrow
+
         cur_date = arrow.get(_cur_time, 'YYYYMMDD')
         begin_datetime = cur_date.replace(day=1)
         end_datetime = begin_datetime.shift(years=1)
@@ -1,4 +1,5 @@
 from .CommoditySim import CommoditySim
+from .DataPanel import DataPanel
 from .DataStruct import DataStruct
 from .Serializable import Serializable
 from .Split import SplitIntoHour, SplitIntoMinute, SplitIntoSecond, \
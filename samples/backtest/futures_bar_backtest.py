@@ -18,7 +18,7 @@ class MAStrategy(StrategyAbstract):
     def __init__(self):
         super().__init__('ma_rb')
 
-        self.addMarketRegister(RegisterInstrument('rb'))
+        self.addMarketRegister(RegisterInstrument('rb'), ['closeprice'])
         self.ema: EMA = EMA(20)
         self.last_status: int = SignalType.EMPTY
         self.empty_time: datetime = None
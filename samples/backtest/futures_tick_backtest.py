@@ -2,8 +2,8 @@ import logging
 from datetime import datetime, timedelta
 
 from ParadoxTrading.Chart import Wizard
-from ParadoxTrading.Engine import MarketEvent, SettlementEvent, SignalType, \
-    StrategyAbstract
+from ParadoxTrading.Engine import EventJournal, MarketEvent, \
+    SettlementEvent, SignalType, StrategyAbstract
 from ParadoxTrading.EngineExt.Futures import BacktestEngine, \
     BacktestMarketSupply, TickBacktestExecution, TickPortfolio
 from ParadoxTrading.Fetch.ChineseFutures import FetchInstrumentDayData, \
@@ -18,7 +18,11 @@ class RangeStrategy(StrategyAbstract):
     def __init__(self):
         super().__init__('range_rb')
 
-        self.addMarketRegister(RegisterInstrument('rb'))
+        # only these columns are fetched, with the ones execution uses
+        self.addMarketRegister(
+            RegisterInstrument('rb'),
+            ['lastprice', 'askprice', 'bidprice']
+        )
         self.ask_ema: EMA = EMA(60, _use_key='askprice')
         self.bid_ema: EMA = EMA(60, _use_key='bidprice')
         self.last_status: int = SignalType.EMPTY
@@ -87,7 +91,10 @@ engine = BacktestEngine(
     portfolio,
     strategy,
 )
+journal = EventJournal(_path='futures_tick_backtest.journal')
+engine.setJournal(journal)
 engine.run()
+journal.close()
 
 portfolio.storeRecords('futures_tick_backtest')
 daily_returns = dailyReturn('futures_tick_backtest')
@@ -0,0 +1,65 @@
+import logging
+import os
+
+from ParadoxTrading.Engine import MarketEvent, StrategyAbstract
+from ParadoxTrading.EngineExt.Futures import BacktestEngine, \
+    BacktestMarketSupply, MarketRecorder, ReplayMarketSupply, \
+    TickBacktestExecution, TickPortfolio
+from ParadoxTrading.Fetch.ChineseFutures import FetchInstrumentDayData, \
+    FetchInstrumentTickData, RegisterInstrument
+from ParadoxTrading.Indicator import EMA
+
+logging.basicConfig(level=logging.WARNING)
+
+
+class EMAStrategy(StrategyAbstract):
+    def __init__(self):
+        super().__init__('ema_rb')
+
+        self.addMarketRegister(RegisterInstrument('rb'))
+        self.ema: EMA = EMA(60, _use_key='lastprice')
+        self.last_strength: int = 0
+
+    def deal(self, _market_event: MarketEvent):
+        data = _market_event.data
+        ema_value = self.ema.addOne(data).getLastData()['ema'][0]
+        if len(self.ema) < 60:
+            return
+
+        strength = 1 if data['lastprice'][0] > ema_value else -1
+        if strength != self.last_strength:
+            self.addEvent(_market_event.symbol, strength)
+            self.last_strength = strength
+
+    def settlement(self, _settlement_event):
+        pass
+
+
+RECORD_PATH = 'futures_tick_replay.record'
+
+fetcher_day = FetchInstrumentDayData()
+
+if not os.path.exists(RECORD_PATH):
+    # first run: fetch from database and record the market stream
+    market_supply = BacktestMarketSupply(
+        '20171016', '20171017', FetchInstrumentTickData()
+    )
+    recorder = MarketRecorder(RECORD_PATH)
+    market_supply.setRecorder(recorder)
+else:
+    # later runs: replay the stream without touching tick data
+    market_supply = ReplayMarketSupply(RECORD_PATH)
+    recorder = None
+
+portfolio = TickPortfolio(fetcher_day, 50_0000, 0.15, 'closeprice')
+engine = BacktestEngine(
+    market_supply,
+    TickBacktestExecution(3e-4),
+    portfolio,
+    EMAStrategy(),
+)
+engine.run()
+if recorder is not None:
+    recorder.close()
+
+print(portfolio.portfolio_mgr.getPositionTable())
@@ -0,0 +1,7 @@
+import sys
+
+from ParadoxTrading.Engine import readJournal, renderRecord
+
+# usage: python render_journal.py futures_tick_backtest.journal
+for record in readJournal(sys.argv[1]):
+    print(renderRecord(record))
@@ -0,0 +1,74 @@
+"""
+measure the import time of ParadoxTrading packages in fresh interpreters,
+and show which heavy optional dependencies each import pulls in.
+
+the last column is the cost of importing those dependencies eagerly,
+which is what every worker paid before they were deferred
+"""
+
+import statistics
+import subprocess
+import sys
+
+REPEAT = 5
+
+PACKAGES = [
+    'ParadoxTrading.Utils',
+    'ParadoxTrading.Indicator',
+    'ParadoxTrading.Engine',
+    'ParadoxTrading.Fetch.ChineseFutures',
+    'ParadoxTrading.EngineExt.Futures',
+]
+
+HEAVY_MODULES = [
+    'arch', 'pymongo', 'psycopg2', 'diskcache',
+    'tabulate', 'pandas', 'arrow',
+]
+
+CODE = """
+import sys, time
+t = time.perf_counter()
+import {}
+t = time.perf_counter() - t
+heavy = [m for m in {!r} if m in sys.modules]
+print(t, ','.join(heavy))
+"""
+
+
+def measure(_module: str) -> (float, str):
+    """
+    import _module in a new interpreter REPEAT times,
+    return the median seconds and loaded heavy modules
+    """
+    cost_list = []
+    heavy = ''
+    for _ in range(REPEAT):
+        out = subprocess.check_output([
+            sys.executable, '-c', CODE.format(_module, HEAVY_MODULES)
+        ]).decode().split()
+        cost_list.append(float(out[0]))
+        heavy = out[1] if len(out) > 1 else ''
+    return statistics.median(cost_list), heavy
+
+
+def main():
+    available = []
+    for m in HEAVY_MODULES:
+        try:
+            __import__(m)
+            available.append(m)
+        except ImportError:
+            pass
+    eager_cost, _ = measure(', '.join(available))
+
+    print('{:<40}{:>12}  {}'.format('PACKAGE', 'IMPORT(ms)', 'HEAVY LOADED'))
+    for p in PACKAGES:
+        cost, heavy = measure(p)
+        print('{:<40}{:>12.1f}  {}'.format(p, cost * 1000, heavy or '-'))
+    print('{:<40}{:>12.1f}  {}'.format(
+        '(eager heavy deps)', eager_cost * 1000, ','.join(available)
+    ))
+
+
+if __name__ == '__main__':
+    main()
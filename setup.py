@@ -6,6 +6,7 @@ setup(
     author='hantian.pang',
     packages=[
         'ParadoxTrading',
+        'ParadoxTrading/Benchmark',
         'ParadoxTrading/Chart',
         'ParadoxTrading/Database',
         'ParadoxTrading/Database/ChineseFutures',
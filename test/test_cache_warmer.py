@@ -0,0 +1,71 @@
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from ParadoxTrading.Fetch.ChineseFutures import FetchDominantIndex, \
+    FetchProductIndex
+from ParadoxTrading.Fetch.ChineseFutures.CacheWarmer import warmCache
+from ParadoxTrading.Utils import DataStruct
+
+
+def offline(_fetcher_type):
+    """
+    index fetcher answering metadata and market data without databases
+    """
+
+    class OfflineFetch(_fetcher_type):
+        def __init__(self, _cache_path):
+            super().__init__(_cache_path=_cache_path)
+            self.fetched = []
+
+        def preloadMetadata(self, _begin_day, _end_day, _products=None):
+            pass
+
+        def buildSymbolTable(self, *args, **kwargs):
+            raise AssertionError('index symbols need no table')
+
+        def isTradingDay(self, _tradingday):
+            return datetime.strptime(_tradingday, '%Y%m%d').weekday() < 5
+
+        def productIsAvailable(self, _product, _tradingday):
+            return True
+
+        def isCached(self, _tradingday, _symbol, _columns=None):
+            return False
+
+        def fetchDataMany(self, _tradingday, _symbols, **kwargs):
+            ret = {}
+            for symbol in _symbols:
+                self.fetched.append((_tradingday, symbol))
+                ret[symbol] = DataStruct(
+                    ['tradingday', 'closeprice'], 'tradingday',
+                    [[_tradingday, 1.0]]
+                )
+            return ret
+
+    return OfflineFetch
+
+
+class WarmIndexCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_index_fetchers(self):
+        for fetcher_type in (FetchDominantIndex, FetchProductIndex):
+            fetcher = offline(fetcher_type)(self.path)
+            ret = warmCache(
+                fetcher, ['rb', 'HC'], '20170102', '20170109', _workers=2
+            )
+            self.assertEqual(ret['days'], 5)
+            self.assertEqual(ret['symbols'], 10)
+            self.assertEqual(ret['failed'], [])
+            self.assertEqual(sorted(set(d[1] for d in fetcher.fetched)),
+                             ['hc', 'rb'])
+
+
+if __name__ == '__main__':
+    unittest.main()
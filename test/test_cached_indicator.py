@@ -0,0 +1,70 @@
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from ParadoxTrading.Indicator import CachedIndicator
+from ParadoxTrading.Indicator.General.MA import MA
+from ParadoxTrading.Indicator.CachedIndicator import _cache_dict
+from ParadoxTrading.Utils import DataStruct
+
+
+def market(_count: int) -> DataStruct:
+    ret = DataStruct(['time', 'closeprice'], 'time')
+    for i in range(_count):
+        ret.addDict({'time': i, 'closeprice': float(i % 7)})
+    return ret
+
+
+class CachedIndicatorTest(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        cache = _cache_dict.pop(self.path, None)
+        if cache is not None:
+            cache.close()
+        shutil.rmtree(self.path)
+
+    def cached(self, **kwargs) -> CachedIndicator:
+        return CachedIndicator(
+            'test', MA, 3, _cache_path=self.path, **kwargs
+        )
+
+    def test_replay(self):
+        expected = MA(3).addMany(market(20)).getAllData()
+        self.cached().addMany(market(10))
+        with self.assertLogs(level='INFO') as logs:
+            indicator = self.cached().addMany(market(20))
+        self.assertIn('replay cached', logs.output[0])
+        self.assertEqual(indicator.getAllData().data, expected.data)
+
+    def test_version(self):
+        first = self.cached(_version='1')
+        first.addMany(market(10))
+        second = self.cached(_version='2')
+        second.addMany(market(10))
+        self.assertNotEqual(first.key, second.key)
+        self.assertIsNone(second.replay)
+        # the default version is the hash of the module source
+        self.assertTrue(self.cached().version)
+
+    def test_broken_state(self):
+        indicator = self.cached().addMany(market(10))
+        self.assertIsInstance(
+            pickle.loads(indicator.cache[indicator.key][1]), MA
+        )
+        indicator.cache[indicator.key] = (9, b'broken')
+        with self.assertLogs(level='WARNING'):
+            again = self.cached().addMany(market(10))
+        self.assertEqual(
+            again.getAllData().data, indicator.getAllData().data
+        )
+        # computed again and saved over the broken one
+        self.assertIsInstance(
+            pickle.loads(again.cache[again.key][1]), MA
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
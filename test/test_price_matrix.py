@@ -0,0 +1,57 @@
+import unittest
+
+from ParadoxTrading.Benchmark.SimFetch import SimFetch
+from ParadoxTrading.EngineExt.Futures import PriceMatrix
+
+
+class LastDayFetch(SimFetch):
+    """
+    SimFetch with instrumentLastTradingDay() of FetchBase
+    """
+
+    def instrumentLastTradingDay(self, _instrument, _tradingday):
+        day_list = [
+            d for d in self.fetchTradingDayList('20170101', _tradingday)
+            if self.fetchData(d, _instrument) is not None
+        ]
+        return day_list[-1] if day_list else None
+
+
+class PriceMatrixTest(unittest.TestCase):
+    def setUp(self):
+        self.fetcher = LastDayFetch('day', '20170101', '20171231')
+        self.matrix = PriceMatrix(self.fetcher, '20170105', '20170301')
+
+    def expected(self, _tradingday, _symbol, _column='closeprice'):
+        return self.fetcher.fetchData(_tradingday, _symbol)[_column][0]
+
+    def test_lazy_read(self):
+        # no preload(), every symbol is loaded by its first read, and
+        # more than 16 symbols grow the matrix more than once
+        symbols = [
+            symbol for product in ('rb', 'hc')
+            for symbol in self.fetcher.fetchAvailableInstrument(
+                product, '20170105'
+            )
+        ]
+        self.assertGreater(len(symbols), 16)
+        for symbol in symbols:
+            self.assertEqual(
+                self.matrix.getPrice('20170105', symbol, 'closeprice'),
+                self.expected('20170105', symbol)
+            )
+
+    def test_last_price_before_begin_day(self):
+        # no data in range before 20170105, fetched from 20170104
+        self.assertEqual(
+            self.matrix.getLastPrice('20170105', 'rb1705', 'closeprice'),
+            self.expected('20170104', 'rb1705')
+        )
+        self.assertEqual(
+            self.matrix.getLastPrice('20170106', 'rb1705', 'closeprice'),
+            self.expected('20170105', 'rb1705')
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()